@@ -0,0 +1,32 @@
+import time
+
+from fastapi import HTTPException, Request
+
+from app.services.admission_service import AdmissionRejected, get_admission_controller
+
+
+def admission_error(e: AdmissionRejected) -> HTTPException:
+    """HTTP error for a shed request, telling the client when to come back."""
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": e.retry_after_header})
+
+
+async def admit_client(request: Request) -> None:
+    """Charge the calling client's token bucket for an expensive request (429 when empty)."""
+    try:
+        get_admission_controller().check_client(request.client.host if request.client else "unknown")
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+
+async def chat_turn_slot():
+    """Hold one of the global chat turn slots while the request is handled (503 when saturated)."""
+    turns = get_admission_controller().turns
+    try:
+        await turns.acquire()
+    except AdmissionRejected as e:
+        raise admission_error(e)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        turns.release(time.monotonic() - started)
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, WebSocket, HTTPException, status
-from fastapi.responses import FileResponse
-from app.models.chat import ChatRequest, ChatResponse, ChatMessage, ToolCall
+from fastapi import APIRouter, Depends, WebSocket, HTTPException, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.models.chat import ChatRequest, ChatResponse, ChatMessage, ToolCall, CHAT_MESSAGES_ADAPTER
 from app.services.openai_service import (
     get_chat_completion,
+    stream_chat_completion,
     ChatError,
     ModelNotAvailableError,
     APIConnectionError,
-    RateLimitExceededError
+    RateLimitExceededError,
+    prompt_cache_stats
 )
 from app.services.linkedin_service import (
     linkedin_highlight_and_extract,
@@ -15,17 +17,59 @@ from app.services.linkedin_service import (
     save_structured_profile
 )
 from app.services.response_formatter_service import ResponseFormatter
+from app.services.profile_store_service import latest_profile_id
+from app.services.download_service import download_url
+from app.services.admission_service import AdmissionRejected, get_admission_controller
+from app.services.rate_limit_service import get_scheduler
+from app.services.response_cache_service import get_response_cache
+from app.api.dependencies import admit_client, chat_turn_slot
 from app.core.config import get_settings
+from app.core.serialization import FastJSONResponse, dumps
+import contextlib
 import json
 import os
-from typing import Dict, Any
+import re
+import time
+import asyncio
+from typing import Dict, Any, List
 import datetime
+import uuid
 
 router = APIRouter()
 
+# Conversations waiting for a streamed follow-up after a fast-path answer:
+# followup_id -> (created_at, messages). Kept server-side so tool call
+# arguments (credentials) never travel back to the browser.
+FOLLOWUP_TTL_SECONDS = 300
+pending_followups: Dict[str, Any] = {}
+
+def store_followup(messages: List[ChatMessage]) -> str:
+    """Remember a conversation for a later follow-up and return its id."""
+    now = time.monotonic()
+    for followup_id, (created_at, _) in list(pending_followups.items()):
+        if now - created_at > FOLLOWUP_TTL_SECONDS:
+            del pending_followups[followup_id]
+    followup_id = uuid.uuid4().hex
+    pending_followups[followup_id] = (now, messages)
+    return followup_id
+
+# The extraction tool needs a profile URL, which the assistant collects last
+PROFILE_URL = re.compile(r"linkedin\.com/in/", re.IGNORECASE)
+
+def may_call_tools(messages: List[ChatMessage]) -> bool:
+    """Whether a turn is likely to start an extraction: its latest user message has a LinkedIn profile URL."""
+    latest = next((msg for msg in reversed(messages) if msg.role == "user"), None)
+    return bool(latest and latest.content and PROFILE_URL.search(latest.content))
+
 def handle_chat_error(e: Exception) -> Dict[str, Any]:
     """Handle different types of chat errors and return appropriate status codes and messages"""
-    if isinstance(e, ModelNotAvailableError):
+    if isinstance(e, AdmissionRejected):
+        return {
+            "status_code": e.status_code,
+            "detail": str(e),
+            "headers": {"Retry-After": e.retry_after_header}
+        }
+    elif isinstance(e, ModelNotAvailableError):
         return {
             "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
             "detail": str(e)
@@ -56,7 +100,9 @@ async def execute_tool_call(tool_call: ToolCall) -> Dict[str, Any]:
     try:
         if tool_call.function["name"] == "linkedin_highlight_and_extract":
             args = json.loads(tool_call.function["arguments"])
-            profile = linkedin_highlight_and_extract(
+            # The extraction drives a browser synchronously; run it off the event loop
+            profile = await asyncio.to_thread(
+                linkedin_highlight_and_extract,
                 email=args["email"],
                 password=args["password"],
                 profile_url=args["profile_url"]
@@ -64,7 +110,7 @@ async def execute_tool_call(tool_call: ToolCall) -> Dict[str, Any]:
             # Convert Pydantic model to dict for JSON serialization
             return {
                 "success": True,
-                "data": profile.dict() if profile else None
+                "data": profile.model_dump() if profile else None
             }
         return {
             "success": False,
@@ -76,37 +122,90 @@ async def execute_tool_call(tool_call: ToolCall) -> Dict[str, Any]:
             "error": str(e)
         }
 
-@router.post("/chat", response_model=ChatResponse)
+async def execute_tool_calls(tool_calls: List[ToolCall]) -> List[Dict[str, Any]]:
+    """
+    Execute the tool calls of one turn concurrently, at most MAX_PARALLEL_TOOL_CALLS
+    at a time. Results come back in the same order as ``tool_calls`` and carry
+    the call's ``tool_call_id`` and ``duration_ms``.
+    """
+    semaphore = asyncio.Semaphore(get_settings().MAX_PARALLEL_TOOL_CALLS)
+
+    async def run(tool_call: ToolCall) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await execute_tool_call(tool_call)
+            result["tool_call_id"] = tool_call.id
+            result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            print(f"Tool call {tool_call.id} ({tool_call.function['name']}) finished in {result['duration_ms']} ms")
+            return result
+
+    return await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(admit_client), Depends(chat_turn_slot)])
 async def chat(request: ChatRequest):
-    """Handle chat requests with function calling support."""
+    """
+    Handle chat requests with function calling support. Responses are already
+    validated ChatResponse objects and are returned as FastJSONResponse, so
+    FastAPI does not dump, re-validate and re-encode them against ``response_model``.
+    """
     try:
-        # Get initial response from OpenAI
-        response = await get_chat_completion(request.messages)
-        
-        # Format the initial response content
-        if response.message.content:
-            response.message.content = ResponseFormatter.format_response(response.message.content)
+        # Repeated informational turns are answered from the response cache
+        settings = get_settings()
+        cache = get_response_cache() if settings.RESPONSE_CACHE_ENABLED else None
+        cache_key = cache.key_for(request.messages) if cache else None
+        if cache_key:
+            body = cache.get(cache_key)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
         
-        # If no tool calls, return the formatted response directly
-        if not response.message.tool_calls:
-            return response
+        # A turn that is about to start an extraction reserves its tool slot before
+        # the first completion, so under overload it is shed before a model call is
+        # paid for. Other turns rarely call tools; they only take a slot if they do.
+        tool_slot = contextlib.AsyncExitStack()
+        try:
+            reserved = may_call_tools(request.messages)
+            if reserved:
+                await tool_slot.enter_async_context(get_admission_controller().tool_slot())
+
+            # Get initial response from OpenAI
+            response = await get_chat_completion(request.messages)
             
-        # Initialize messages with the original messages and the assistant's response
-        messages = list(request.messages)
-        messages.append(response.message)  # Assistant message with tool_calls
+            # Format the initial response content
+            if response.message.content:
+                response.message.content = ResponseFormatter.format_response(response.message.content)
+            
+            # If no tool calls, return the formatted response directly
+            if not response.message.tool_calls:
+                if cache_key:
+                    # Token usage belongs to the original completion, not to later hits
+                    body = dumps(response.model_copy(update={"usage": None}))
+                    cache.put(cache_key, body)
+                return FastJSONResponse(response)
+                
+            # Initialize messages with the original messages and the assistant's response
+            messages = list(request.messages)
+            messages.append(response.message)  # Assistant message with tool_calls
+            
+            # Execute all tool calls of this turn concurrently; results keep tool call order.
+            # Browser extractions are the scarcest resource, so tool turns have their own limit.
+            if not reserved:
+                await tool_slot.enter_async_context(get_admission_controller().tool_slot())
+            turn_started = time.perf_counter()
+            results = await execute_tool_calls(response.message.tool_calls)
+        finally:
+            await tool_slot.aclose()
+        print(f"Executed {len(results)} tool call(s) in {(time.perf_counter() - turn_started) * 1000:.1f} ms")
         
-        # Process each tool call
-        for tool_call in response.message.tool_calls:
-            # Execute the tool call
-            result = await execute_tool_call(tool_call)
+        # Process each tool call result
+        for tool_call, result in zip(response.message.tool_calls, results):
             if not result["success"]:
                 raise ChatError(f"Tool call failed: {result['error']}")
             
-            # Format the tool response if it's a profile
+            # Tool output goes back to the model in a compact form; HTML is for the browser only
             if tool_call.function["name"] == "linkedin_highlight_and_extract" and result["data"]:
-                formatted_content = ResponseFormatter.format_profile_summary(result["data"])
+                formatted_content = ResponseFormatter.format_profile_for_model(result["data"])
             else:
-                formatted_content = json.dumps(result["data"]) if result["data"] else ""
+                formatted_content = json.dumps(result["data"], separators=(",", ":")) if result["data"] else ""
             
             # Add the tool response message with proper formatting
             tool_response = ChatMessage(
@@ -119,8 +218,24 @@ async def chat(request: ChatRequest):
             
             print(f"Tool response added: {tool_response}")  # Debug logging
         
+        # Fast path: a successful extraction is confirmed from a template instead
+        # of a second model round-trip; the model's follow-up can be streamed later.
+        if settings.CHAT_FAST_PATH and all(
+            tool_call.function["name"] == "linkedin_highlight_and_extract" and result["data"]
+            for tool_call, result in zip(response.message.tool_calls, results)
+        ):
+            return FastJSONResponse(ChatResponse(
+                message=ChatMessage(
+                    role="assistant",
+                    content=ResponseFormatter.format_extraction_result([result["data"] for result in results])
+                ),
+                profile_data=results[0]["data"],
+                usage=response.usage,
+                followup_id=store_followup(messages) if settings.CHAT_FAST_PATH_FOLLOWUP else None
+            ))
+        
         # Get final response after all tool calls are processed
-        print("Getting final response with messages:", json.dumps(messages, default=str))  # Debug logging
+        print("Getting final response with messages:", CHAT_MESSAGES_ADAPTER.dump_json(messages).decode())  # Debug logging
         final_response = await get_chat_completion(messages)
         
         # Format the final response content
@@ -132,16 +247,36 @@ async def chat(request: ChatRequest):
         else:
             final_response.message.content = ResponseFormatter.format_response(final_response.message.content)
             
-        return final_response
+        return FastJSONResponse(final_response)
         
     except Exception as e:
         print(f"Chat error: {str(e)}")
         error_info = handle_chat_error(e)
         raise HTTPException(
             status_code=error_info["status_code"],
-            detail=error_info["detail"]
+            detail=error_info["detail"],
+            headers=error_info.get("headers")
         )
 
+@router.get("/chat/followup/{followup_id}", dependencies=[Depends(admit_client)])
+async def chat_followup(followup_id: str):
+    """Stream the model's follow-up to a fast-path answer as plain text."""
+    entry = pending_followups.pop(followup_id, None)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired follow-up")
+    _, messages = entry
+
+    async def generate():
+        try:
+            async for text in stream_chat_completion(messages):
+                yield text
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            print(f"Follow-up stream error: {str(e)}")
+            yield "\n\n" + handle_chat_error(e)["detail"]
+
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8")
+
 @router.post("/test_completion")
 async def test_completion():
     """Test endpoint to verify OpenAI chat completion is working."""
@@ -196,6 +331,7 @@ async def health_check():
             "status": "healthy",
             "api_key_configured": api_key_configured,
             "model": settings.OPENAI_MODEL,
+            "prompt_cache": prompt_cache_stats,
             "timestamp": datetime.datetime.now().isoformat()
         }
     except Exception as e:
@@ -205,6 +341,18 @@ async def health_check():
             "timestamp": datetime.datetime.now().isoformat()
         }
 
+@router.get("/metrics")
+async def metrics():
+    """Admission queue depths and rejections, the model call scheduler's backlog and response cache hit rate."""
+    scheduler = get_scheduler()
+    return {
+        "admission": get_admission_controller().metrics(),
+        "model_calls": {"queue_depth": scheduler.queue_depth(), **scheduler.stats},
+        "response_cache": get_response_cache().metrics(),
+        "prompt_cache": prompt_cache_stats,
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+
 @router.get("/profile")
 async def get_profile():
     """Get the latest generated profile content."""
@@ -221,9 +369,12 @@ async def get_profile():
             
         print(f"Successfully read profile content (length: {len(content)})")
         
+        profile_id = latest_profile_id()
         # Return just the inner HTML content
         return {
             "content": content.strip(),  # Remove any extra whitespace
+            "profile_id": profile_id,
+            "download_url": download_url(profile_id, "docx") if profile_id else None,
             "timestamp": datetime.datetime.now().isoformat()
         }
         
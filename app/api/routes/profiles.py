@@ -0,0 +1,200 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import Response, StreamingResponse
+from app.services.profile_store_service import (
+    load_profile,
+    iter_latest_versions,
+    is_valid_profile_id
+)
+from app.services.profile_index_service import (
+    ProfileSearchError,
+    MAX_PAGE_SIZE,
+    search_profiles
+)
+from app.services.profile_match_service import (
+    ProfileMatchError,
+    match_profiles
+)
+from app.services.pdf_render_service import PdfUnicodeError
+from app.models.profiles import ProfileMatchRequest
+from app.core.serialization import FastJSONResponse
+from app.core.config import get_settings
+from app.api.dependencies import admit_client
+from app.services.download_service import (
+    CONTENT_TYPES,
+    COMPRESSIBLE_FORMATS,
+    RangeNotSatisfiableError,
+    etag_for,
+    etag_matches,
+    render_version,
+    render_to_buffer,
+    choose_encoding,
+    compress,
+    parse_range,
+    iter_buffer,
+    iter_zip
+)
+from typing import Optional
+import re
+
+router = APIRouter()
+
+# Stored profiles are content-addressed, so a URL carrying the current renderer
+# version never changes content. Without it, a renderer upgrade would be hidden
+# behind year-long caches; those responses are revalidated against the ETag.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=300"
+
+def get_profile_or_404(profile_id: str):
+    data = load_profile(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return data
+
+def download_filename(data, profile_id: str, fmt: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", data.get("name", "")).strip("_") or "profile"
+    return f"{slug}_{profile_id[:8]}.{fmt}"
+
+@router.get("/profiles/search")
+def search_profile_index(
+    q: Optional[str] = Query(None, description="Free text: names, headlines, skills, companies, titles, schools, about and experience"),
+    skill: Optional[str] = Query(None),
+    company: Optional[str] = Query(None),
+    title: Optional[str] = Query(None),
+    school: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Search all extracted profiles, best matches first. Defined without async
+    so the SQLite query runs in the threadpool instead of blocking the event loop.
+    """
+    try:
+        return FastJSONResponse(search_profiles(q, skill=skill, company=company, title=title, school=school,
+                                                page=page, page_size=page_size))
+    except ProfileSearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/profiles/match", dependencies=[Depends(admit_client)])
+def match_job_description(request: ProfileMatchRequest):
+    """
+    Rank all extracted profiles against a job description (local BM25 matching,
+    no model calls). Defined without async so the matrix work runs in the
+    threadpool instead of blocking the event loop.
+    """
+    try:
+        results = match_profiles(request.job_description, top_k=request.top_k)
+    except ProfileMatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not results["profiles_considered"]:
+        raise HTTPException(status_code=404, detail="No profiles have been generated yet")
+    return FastJSONResponse(results)
+
+@router.get("/profiles/{profile_id}/download")
+def download_profile_version(
+    profile_id: str,
+    request: Request,
+    format: str = Query("docx", pattern="^(docx|html|md|pdf)$"),
+    v: Optional[str] = Query(None, description="Renderer version; the response is immutable when it is current")
+):
+    """
+    Download one stored profile version, generated on demand.
+    Supports conditional requests (ETag), single byte ranges, and gzip/brotli
+    for the HTML and markdown variants. Defined without async so rendering
+    runs in the threadpool instead of blocking the event loop.
+    """
+    data = get_profile_or_404(profile_id)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if format in COMPRESSIBLE_FORMATS else None
+    etag = etag_for(profile_id, format, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == render_version(format) else REVALIDATE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{download_filename(data, profile_id, format)}"',
+    }
+    if format in COMPRESSIBLE_FORMATS:
+        headers["Vary"] = "Accept-Encoding"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        buffer, size = render_to_buffer(data, format)
+    except PdfUnicodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if encoding:
+        # Text variants are small; compress the whole body. Ranges then apply
+        # to the encoded bytes, as with any Content-Encoding.
+        body = compress(buffer.read(), encoding)
+        buffer.close()
+        headers["Content-Encoding"] = encoding
+        return _ranged_bytes_response(body, CONTENT_TYPES[format], headers, request)
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiableError:
+        buffer.close()
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_buffer(buffer), media_type=CONTENT_TYPES[format], headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_buffer(buffer, start, end - start + 1),
+        status_code=206,
+        media_type=CONTENT_TYPES[format],
+        headers=headers
+    )
+
+def _ranged_bytes_response(body: bytes, media_type: str, headers, request: Request) -> Response:
+    try:
+        byte_range = parse_range(request.headers.get("range"), len(body))
+    except RangeNotSatisfiableError:
+        headers["Content-Range"] = f"bytes */{len(body)}"
+        return Response(status_code=416, headers=headers)
+    if byte_range is None:
+        return Response(content=body, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+    return Response(content=body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+@router.get("/profiles/archive", dependencies=[Depends(admit_client)])
+async def download_profiles_archive(
+    ids: Optional[str] = Query(None, description="Comma-separated profile ids (default: the latest version of every person)"),
+    format: str = Query("docx", pattern="^(docx|html|md|pdf)$")
+):
+    """Stream many resumes as a single ZIP, rendered and zipped on the fly."""
+    if ids:
+        profile_ids = list(dict.fromkeys(profile_id.strip() for profile_id in ids.split(",") if profile_id.strip()))
+        invalid = [profile_id for profile_id in profile_ids if not is_valid_profile_id(profile_id)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid profile ids: {', '.join(invalid)}")
+    else:
+        profile_ids = sorted(profile_id for _, profile_id in iter_latest_versions())
+    if not profile_ids:
+        raise HTTPException(status_code=404, detail="No profiles have been generated yet")
+    max_profiles = get_settings().ARCHIVE_MAX_PROFILES
+    if len(profile_ids) > max_profiles:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(profile_ids)} profiles requested; an archive holds at most {max_profiles}. "
+                   f"Select profiles with `ids`."
+        )
+
+    def entries():
+        for profile_id in profile_ids:
+            data = load_profile(profile_id)
+            if data is not None:
+                yield download_filename(data, profile_id, format), data
+
+    return StreamingResponse(
+        iter_zip(entries(), format),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="profiles_{format}.zip"'}
+    )
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -7,6 +8,23 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     OPENAI_MODEL: str = "gpt-4o"  # Using the latest model as of April 2024
     OPENAI_API_KEY: str
+    MODEL_MAX_CONCURRENCY: int = 8  # Simultaneous model calls per process
+    MODEL_MAX_RETRIES: int = 5  # Retries for rate-limited/transient model call failures
+    MAX_PARALLEL_TOOL_CALLS: int = 4  # Tool calls executed concurrently within one chat turn
+    CHAT_FAST_PATH: bool = True  # Answer successful extractions from a template, skipping the second completion
+    CHAT_FAST_PATH_FOLLOWUP: bool = False  # Offer a model follow-up after a fast-path answer, streamed only if the user asks
+    CLIENT_RATE_PER_MINUTE: float = 30  # Expensive requests per client per minute (token bucket refill)
+    CLIENT_BURST: int = 10  # Requests a client can send at once before being rate limited
+    MAX_CONCURRENT_TURNS: int = 16  # Chat turns in progress per process
+    MAX_CONCURRENT_TOOL_TURNS: int = 2  # Chat turns running tool calls (browser extractions) at once
+    ADMISSION_MAX_QUEUE: int = 16  # Chat turns allowed to wait for a slot before new ones are shed
+    ADMISSION_MAX_TOOL_QUEUE: int = 4  # Tool turns allowed to wait for a slot before new ones are shed
+    ADMISSION_MAX_WAIT_SECONDS: float = 10.0  # Longest a queued request waits before it is shed
+    RESPONSE_CACHE_ENABLED: bool = True  # Answer repeated informational turns from the response cache
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    ARCHIVE_MAX_PROFILES: int = 200  # Most profiles one ZIP download may contain
+    PDF_UNICODE_FONT: Optional[str] = None  # TrueType font embedded in PDFs with text outside WinAnsi (e.g. DejaVuSans.ttf)
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,56 @@
+"""
+Fast JSON serialization for API responses.
+
+A route that returns a pydantic model or a dict makes FastAPI dump it,
+re-validate the dump against the response_model, and walk the result with
+jsonable_encoder before json.dumps runs. Routes that return a
+FastJSONResponse skip all of that: models are serialized straight from their
+attributes by pydantic-core, and plain data by orjson (stdlib json when orjson
+is not installed).
+"""
+
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Anything orjson cannot encode natively (nested models, sets, Decimals, ...)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        """Compact UTF-8 JSON bytes of ``content``."""
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        """Compact UTF-8 JSON bytes of ``content``."""
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that accepts pydantic models as well as plain data and
+    encodes them with dumps. Returned from a route, it bypasses FastAPI's
+    response_model validation and jsonable_encoder pass.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
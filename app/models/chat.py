@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Optional, Dict, Any, Literal
 
 class ToolCall(BaseModel):
@@ -24,4 +24,9 @@ class ChatResponse(BaseModel):
     """Chat response model with enhanced features."""
     message: ChatMessage
     profile_data: Optional[Dict[str, Any]] = None
-    requires_tool: bool = False 
\ No newline at end of file
+    requires_tool: bool = False
+    usage: Optional[Dict[str, int]] = None  # Token usage, including cached prompt tokens
+    followup_id: Optional[str] = None  # Set when a model follow-up can be streamed from /chat/followup/{id}
+
+# Built once: creating a TypeAdapter compiles its validator and serializer
+CHAT_MESSAGES_ADAPTER = TypeAdapter(List[ChatMessage])
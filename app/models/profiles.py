@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+from app.services.profile_match_service import MAX_TOP_K
+
+class ProfileMatchRequest(BaseModel):
+    """Job description to rank the stored profiles against."""
+    job_description: str = Field(..., min_length=1)
+    top_k: int = Field(20, ge=1, le=MAX_TOP_K)
@@ -0,0 +1,229 @@
+"""
+Admission control and load shedding for expensive endpoints.
+
+A chat turn can hold a browser for a full extraction plus two model calls, so
+accepting every request under a burst only makes everyone wait past their
+timeouts. The `AdmissionController` decides up front what to take on:
+
+- a token bucket per client limits how fast one client can send expensive
+  requests (rejected with 429),
+- a concurrency limiter bounds chat turns in progress, and a tighter one bounds
+  turns that run tool calls (browser extractions). Each has a short, bounded
+  queue; when the queue is full, or a queued request waits longer than
+  ``max_wait``, the request is shed with 503,
+
+and every rejection carries a `Retry-After` estimate. `metrics()` reports queue
+depths, in-flight counts and rejections for the metrics endpoint.
+"""
+
+import asyncio
+import contextlib
+import math
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Dict
+
+from app.core.config import get_settings
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; carries the status code and Retry-After seconds"""
+
+    def __init__(self, message: str, status_code: int, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+# ------------------------------
+# 1. Per-client token buckets
+# ------------------------------
+class TokenBucket:
+    """``rate`` tokens per second, up to ``capacity`` banked for bursts."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """Spend ``cost`` tokens. Returns 0 if admitted, else seconds until it would be."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Token buckets keyed by client, the least recently seen dropped beyond ``max_clients``."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.stats = {"admitted": 0, "rate_limited": 0}
+
+    def check(self, client: str, cost: float = 1.0) -> None:
+        """Admit one request from ``client`` or raise `AdmissionRejected` (429)."""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take(now, cost)
+        if wait > 0:
+            self.stats["rate_limited"] += 1
+            raise AdmissionRejected("Too many requests from this client. Please slow down.", 429, wait)
+        self.stats["admitted"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"clients": len(self._buckets), "rate_per_minute": self.rate * 60, "burst": self.burst,
+                **self.stats}
+
+
+# ------------------------------
+# 2. Concurrency limits
+# ------------------------------
+class ConcurrencyLimiter:
+    """
+    At most ``limit`` holders at once, with a FIFO queue of at most ``max_queue``
+    waiters who give up after ``max_wait`` seconds. Used from the event loop only.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._service_time = 1.0  # Moving average of how long a slot is held, for Retry-After
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> float:
+        """Seconds until the current queue has likely drained through the slots."""
+        return self._service_time * (self.queue_depth() + 1) / self.limit
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.stats[f"rejected_{reason}"] += 1
+        return AdmissionRejected("The server is busy. Please try again shortly.", 503, self.retry_after())
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self.queue_depth():
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+        if self.queue_depth() >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            # A released slot is handed straight to the waiter, so in_flight is unchanged
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(waiter)
+        self.stats["admitted"] += 1
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def release(self, held_seconds: float) -> None:
+        self._service_time = 0.8 * self._service_time + 0.2 * held_seconds
+        self._release()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold one slot for the duration of the block, or raise `AdmissionRejected` (503)."""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth(),
+            "max_queue": self.max_queue,
+            "avg_hold_ms": round(self._service_time * 1000, 1),
+            **self.stats,
+        }
+
+
+# ------------------------------
+# 3. Controller
+# ------------------------------
+class AdmissionController:
+    """Per-client rate limits plus global limits on chat turns and tool-running turns."""
+
+    def __init__(self, rate_per_minute: float = 30, burst: int = 10,
+                 max_turns: int = 16, max_tool_turns: int = 2,
+                 max_queue: int = 16, max_tool_queue: int = 4, max_wait: float = 10.0,
+                 max_clients: int = 10000):
+        self.clients = ClientRateLimiter(rate_per_minute, burst, max_clients)
+        self.turns = ConcurrencyLimiter("chat_turns", max_turns, max_queue, max_wait)
+        self.tool_turns = ConcurrencyLimiter("tool_turns", max_tool_turns, max_tool_queue, max_wait)
+
+    def check_client(self, client: str, cost: float = 1.0) -> None:
+        self.clients.check(client, cost)
+
+    def turn_slot(self):
+        return self.turns.slot()
+
+    def tool_slot(self):
+        return self.tool_turns.slot()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "clients": self.clients.metrics(),
+            "chat_turns": self.turns.metrics(),
+            "tool_turns": self.tool_turns.metrics(),
+        }
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    """The process-wide admission controller, sized from the settings."""
+    settings = get_settings()
+    return AdmissionController(
+        rate_per_minute=settings.CLIENT_RATE_PER_MINUTE,
+        burst=settings.CLIENT_BURST,
+        max_turns=settings.MAX_CONCURRENT_TURNS,
+        max_tool_turns=settings.MAX_CONCURRENT_TOOL_TURNS,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_tool_queue=settings.ADMISSION_MAX_TOOL_QUEUE,
+        max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+    )
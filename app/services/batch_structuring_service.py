@@ -0,0 +1,306 @@
+"""
+Batch-API mode for profile structuring.
+
+Instead of one synchronous `structure_profile_data` call per raw dump, many
+structuring requests are packed into a single OpenAI Batch job file, submitted,
+polled until the job finishes, and mapped back to `LinkedInProfile` objects by
+`custom_id`. Requests that fail for a transient reason (rate limit, server
+error, expiry, or no result at all) are resubmitted in a smaller follow-up
+batch; refusals, invalid output and other client errors are final.
+
+`LocalBatchClient` implements the subset of the files/batches endpoints used
+here, so the whole flow can run offline with a canned responder.
+"""
+
+import copy
+import itertools
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from openai import OpenAI
+
+from app.services.linkedin_service import LinkedInProfile, STRUCTURING_MODEL, STRUCTURING_PROMPT
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# Per-request error codes worth resubmitting; HTTP 429 and 5xx responses are too
+RETRYABLE_ERROR_CODES = {"batch_expired", "batch_cancelled", "rate_limit_exceeded", "server_error"}
+
+
+class BatchStructuringError(Exception):
+    """Raised when a batch job cannot be submitted or ends without output"""
+    pass
+
+
+# ------------------------------
+# 1. Request file
+# ------------------------------
+def _make_strict(schema: Dict[str, Any]) -> None:
+    """Adapt a pydantic JSON schema in place to Structured Outputs strict mode."""
+    if isinstance(schema, dict):
+        schema.pop("default", None)
+        if schema.get("type") == "object" and "properties" in schema:
+            schema["additionalProperties"] = False
+            schema["required"] = list(schema["properties"])
+        for value in schema.values():
+            _make_strict(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            _make_strict(item)
+
+
+def profile_response_format() -> Dict[str, Any]:
+    """The `response_format` equivalent of `response_format=LinkedInProfile`."""
+    schema = copy.deepcopy(LinkedInProfile.model_json_schema())
+    _make_strict(schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "LinkedInProfile", "schema": schema, "strict": True},
+    }
+
+
+def build_batch_file(raw_texts: Dict[str, str], model: str = STRUCTURING_MODEL) -> bytes:
+    """Build the JSONL input file for a batch, one chat completion request per raw dump."""
+    response_format = profile_response_format()
+    lines = []
+    for custom_id, raw_text in raw_texts.items():
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": STRUCTURING_PROMPT},
+                    {"role": "user", "content": raw_text},
+                ],
+                "response_format": response_format,
+            },
+        }))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ------------------------------
+# 2. Result parsing
+# ------------------------------
+def _retryable_status(status_code: Any) -> bool:
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+def parse_batch_output(output_text: str) -> Tuple[Dict[str, LinkedInProfile], Dict[str, str], Set[str]]:
+    """
+    Map batch output lines back to profiles.
+    Returns (profiles by custom_id, error message by custom_id, the custom_ids
+    whose error is transient and worth resubmitting).
+    """
+    profiles: Dict[str, LinkedInProfile] = {}
+    errors: Dict[str, str] = {}
+    retryable: Set[str] = set()
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record["custom_id"]
+        response = record.get("response") or {}
+        if record.get("error"):
+            errors[custom_id] = str(record["error"].get("message", record["error"]))
+            if record["error"].get("code") in RETRYABLE_ERROR_CODES:
+                retryable.add(custom_id)
+            continue
+        if response.get("status_code") != 200:
+            errors[custom_id] = f"HTTP {response.get('status_code')}: {response.get('body')}"
+            if _retryable_status(response.get("status_code")):
+                retryable.add(custom_id)
+            continue
+        try:
+            message = response["body"]["choices"][0]["message"]
+            if message.get("refusal"):
+                errors[custom_id] = f"Refused: {message['refusal']}"
+                continue
+            profiles[custom_id] = LinkedInProfile.model_validate_json(message["content"])
+        except Exception as e:
+            errors[custom_id] = f"Invalid structured output: {e}"
+    return profiles, errors, retryable
+
+
+# ------------------------------
+# 3. Submission & polling
+# ------------------------------
+def run_batch(client, raw_texts: Dict[str, str], model: str = STRUCTURING_MODEL,
+              poll_interval: float = 30.0,
+              timeout: Optional[float] = None) -> Tuple[Dict[str, LinkedInProfile], Dict[str, str], Set[str]]:
+    """
+    Submit one batch job, wait for it to finish and parse its results.
+    Returns (profiles, errors, retryable ids) as `parse_batch_output` does.
+    """
+    input_file = client.files.create(
+        file=("structuring_batch.jsonl", build_batch_file(raw_texts, model)),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(raw_texts)} structuring requests")
+
+    started = time.monotonic()
+    while batch.status not in TERMINAL_STATUSES:
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise BatchStructuringError(f"Batch {batch.id} did not finish within {timeout}s")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    profiles: Dict[str, LinkedInProfile] = {}
+    errors: Dict[str, str] = {}
+    retryable: Set[str] = set()
+    if batch.output_file_id:
+        profiles, errors, retryable = parse_batch_output(client.files.content(batch.output_file_id).text)
+    if batch.error_file_id:
+        _, file_errors, file_retryable = parse_batch_output(client.files.content(batch.error_file_id).text)
+        errors.update(file_errors)
+        retryable.update(file_retryable)
+
+    # Requests that appear in neither file (e.g. the whole batch expired)
+    for custom_id in raw_texts:
+        if custom_id not in profiles and custom_id not in errors:
+            errors[custom_id] = f"No result (batch status: {batch.status})"
+            retryable.add(custom_id)
+    return profiles, errors, retryable
+
+
+def structure_profiles_batch(raw_texts: Dict[str, str], client=None, model: str = STRUCTURING_MODEL,
+                             max_attempts: int = 3, poll_interval: float = 30.0,
+                             timeout: Optional[float] = None) -> Tuple[Dict[str, LinkedInProfile], Dict[str, str]]:
+    """
+    Structure many raw profile dumps through the Batch API.
+
+    ``raw_texts`` maps a caller-chosen id (e.g. the dump path) to raw text.
+    Requests that failed for a transient reason are resubmitted in a follow-up
+    batch, up to ``max_attempts`` times in total; the others are final at once.
+    Returns (profiles by id, last error by id for the rest).
+    If a batch job itself fails, the profiles structured by earlier attempts are
+    still returned and only the ids still pending are reported as failed.
+    """
+    client = client or OpenAI()
+    profiles: Dict[str, LinkedInProfile] = {}
+    errors: Dict[str, str] = {}
+    pending = dict(raw_texts)
+
+    for attempt in range(1, max_attempts + 1):
+        if not pending:
+            break
+        try:
+            done, attempt_errors, retryable = run_batch(client, pending, model=model, poll_interval=poll_interval,
+                                                        timeout=timeout)
+        except Exception as e:
+            print(f"Batch attempt {attempt} failed: {e}")
+            errors.update({custom_id: f"Batch failed: {e}" for custom_id in pending})
+            break
+        profiles.update(done)
+        for custom_id in done:
+            errors.pop(custom_id, None)
+        errors.update(attempt_errors)
+        pending = {custom_id: pending[custom_id] for custom_id in retryable}
+        print(f"Batch attempt {attempt}: {len(done)} structured, {len(retryable)} to retry, "
+              f"{len(attempt_errors) - len(retryable)} failed permanently")
+
+    return profiles, errors
+
+
+# ------------------------------
+# 4. Local stub of the batch endpoints
+# ------------------------------
+class LocalBatchClient:
+    """
+    Offline stand-in for the `files` and `batches` endpoints of an OpenAI client.
+
+    ``responder(custom_id, body)`` returns the assistant message content (a JSON
+    string) for one request; raising an exception marks that request as failed
+    and it is written to the batch's error file, like the real API does, with
+    the exception's ``status_code`` attribute (default 500) as its HTTP status.
+    Batches complete after ``polls_until_complete`` calls to `batches.retrieve`.
+    """
+
+    def __init__(self, responder: Callable[[str, Dict[str, Any]], str], polls_until_complete: int = 1):
+        self.responder = responder
+        self.polls_until_complete = polls_until_complete
+        self._files: Dict[str, bytes] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+        self._polls: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file, purpose: str):
+        data = file[1] if isinstance(file, tuple) else file.read()
+        file_id = f"file-local-{next(self._ids)}"
+        self._files[file_id] = data if isinstance(data, bytes) else data.encode("utf-8")
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(self._files[file_id]))
+
+    def _file_content(self, file_id: str):
+        data = self._files[file_id]
+        return SimpleNamespace(content=data, text=data.decode("utf-8"))
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str, metadata=None):
+        batch_id = f"batch-local-{next(self._ids)}"
+        self._batches[batch_id] = SimpleNamespace(
+            id=batch_id, status="validating", input_file_id=input_file_id, endpoint=endpoint,
+            output_file_id=None, error_file_id=None, request_counts=None,
+        )
+        self._polls[batch_id] = 0
+        return self._batches[batch_id]
+
+    def _retrieve_batch(self, batch_id: str):
+        batch = self._batches[batch_id]
+        self._polls[batch_id] += 1
+        if batch.status == "validating":
+            batch.status = "in_progress"
+        if batch.status == "in_progress" and self._polls[batch_id] >= self.polls_until_complete:
+            self._run(batch)
+        return batch
+
+    def _run(self, batch: SimpleNamespace) -> None:
+        outputs, failures = [], []
+        for line in self._files[batch.input_file_id].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            try:
+                content = self.responder(custom_id, request["body"])
+                outputs.append({
+                    "id": f"resp-{custom_id}",
+                    "custom_id": custom_id,
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content, "refusal": None}}]},
+                    },
+                    "error": None,
+                })
+            except Exception as e:
+                failures.append({
+                    "id": f"resp-{custom_id}",
+                    "custom_id": custom_id,
+                    "response": {
+                        "status_code": getattr(e, "status_code", 500),
+                        "body": {"error": {"message": str(e), "type": type(e).__name__}},
+                    },
+                    "error": None,
+                })
+
+        if outputs:
+            batch.output_file_id = self._store_jsonl(outputs)
+        if failures:
+            batch.error_file_id = self._store_jsonl(failures)
+        batch.request_counts = SimpleNamespace(
+            total=len(outputs) + len(failures), completed=len(outputs), failed=len(failures),
+        )
+        batch.status = "completed"
+
+    def _store_jsonl(self, records) -> str:
+        file_id = f"file-local-{next(self._ids)}"
+        self._files[file_id] = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+        return file_id
@@ -0,0 +1,257 @@
+"""
+Near-duplicate detection with MinHash and locality-sensitive hashing.
+
+Repeated extractions of the same LinkedIn profile produce raw dumps (and
+structured profiles) that differ only in a few words: a new endorsement count,
+a reordered section, a changed "2 yrs 3 mos". Exact hashes miss these, and
+comparing every pair does not scale. Instead:
+
+- content is reduced to a set of hashed shingles: word 5-grams of raw text,
+  or the normalized fields of a structured profile,
+- a MinHash signature (one minimum per hash permutation, computed with NumPy)
+  estimates the Jaccard similarity of two sets from the fraction of equal
+  signature slots,
+- the LSH index splits signatures into bands and buckets each band, so a
+  lookup only compares against items sharing at least one bucket.
+
+The band/row split is derived from the similarity threshold, so items above
+it are very likely to collide and items well below it rarely do.
+"""
+
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.normalization_service import normalize_key
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+# Estimated Jaccard similarity at or above which two items are duplicates
+RAW_DUPLICATE_THRESHOLD = 0.85
+PROFILE_DUPLICATE_THRESHOLD = 0.9
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a < 2^31
+# keeps a * x + b within uint64
+_PRIME = (1 << 32) + 15
+_MAX_A = 1 << 31
+_MIX = np.uint64(1000003)
+_MASK32 = np.uint64(0xFFFFFFFF)
+# Caps the (permutations x shingles) intermediate array at about 16 MB
+_SHINGLE_CHUNK = 16384
+
+
+# ------------------------------
+# 1. Shingling
+# ------------------------------
+def _hash_strings(strings: List[str]) -> np.ndarray:
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in strings), dtype=np.uint64, count=len(strings)
+    )
+
+
+def text_shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hashes of the distinct word ``size``-grams of ``text`` (case and whitespace insensitive)."""
+    words = text.lower().split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    word_hashes = _hash_strings(words)
+    size = min(size, len(words))
+    count = len(words) - size + 1
+    shingles = word_hashes[:count].copy()
+    for offset in range(1, size):
+        # Wrapping uint64 arithmetic, folded to 32 bits below
+        shingles = shingles * _MIX + word_hashes[offset:offset + count]
+    return np.unique(shingles & _MASK32)
+
+
+def profile_shingles(data: Dict[str, Any], size: int = 3) -> np.ndarray:
+    """
+    Hashes of a structured profile's normalized fields: name, headline, each
+    skill, each (title, company) and (school, degree) pair, plus word
+    ``size``-grams of the about section and experience descriptions.
+    """
+    experience = data.get("experience") or []
+    education = data.get("education") or []
+    features = [
+        f"name:{normalize_key(data.get('name') or '')}",
+        f"headline:{normalize_key(data.get('headline') or '')}",
+    ]
+    features.extend(f"skill:{normalize_key(skill)}" for skill in data.get("skills") or [])
+    features.extend(
+        f"exp:{normalize_key(exp.get('title') or '')}|{normalize_key(exp.get('company') or '')}"
+        for exp in experience
+    )
+    features.extend(
+        f"edu:{normalize_key(edu.get('school') or '')}|{normalize_key(edu.get('degree') or '')}"
+        for edu in education
+    )
+    text = [data.get("about") or ""]
+    text.extend(exp.get("description") or "" for exp in experience)
+    return np.union1d(_hash_strings(features), text_shingles("\n".join(text), size))
+
+
+# ------------------------------
+# 2. MinHash signatures
+# ------------------------------
+class MinHasher:
+    """Computes fixed-length MinHash signatures from arrays of shingle hashes."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MAX_A, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        signature = np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        for start in range(0, len(shingles), _SHINGLE_CHUNK):
+            chunk = shingles[start:start + _SHINGLE_CHUNK]
+            hashed = (self._a * chunk + self._b) % np.uint64(_PRIME)
+            np.minimum(signature, hashed.min(axis=1), out=signature)
+        return signature
+
+
+@lru_cache(maxsize=None)
+def get_minhasher(num_perm: int = NUM_PERM) -> MinHasher:
+    return MinHasher(num_perm)
+
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the fraction of equal signature slots."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+@lru_cache(maxsize=None)
+def lsh_parameters(threshold: float, num_perm: int = NUM_PERM,
+                   false_positive_weight: float = 0.1) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows <= num_perm minimizing the weighted false
+    positive and false negative probability mass around ``threshold``. Two
+    items with similarity s share a bucket with probability
+    1 - (1 - s^rows)^bands. False positives are weighted low by default: every
+    candidate is verified against its signature, so they only cost a
+    comparison, while a false negative is a missed duplicate.
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    step = similarity[1]
+    below = similarity < threshold
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            collide = 1.0 - (1.0 - similarity ** rows) ** bands
+            error = (false_positive_weight * collide[below].sum()
+                     + (1.0 - false_positive_weight) * (1.0 - collide[~below]).sum()) * step
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+# ------------------------------
+# 3. LSH index
+# ------------------------------
+class LSHIndex:
+    """Banded LSH over MinHash signatures, keyed by caller-chosen string keys."""
+
+    def __init__(self, threshold: float, num_perm: int = NUM_PERM):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_parameters(threshold, num_perm)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def query(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Indexed keys at or above the threshold, most similar first."""
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket:
+                candidates.update(bucket)
+        matches = []
+        for key in candidates:
+            similarity = estimate_similarity(signature, self._signatures[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+
+# ------------------------------
+# 4. Detectors
+# ------------------------------
+class DuplicateDetector:
+    """
+    Remembers content by key and flags new content that is a near-duplicate of
+    something already seen. ``shingler`` turns content (raw text, a profile
+    dict) into shingle hashes.
+    """
+
+    def __init__(self, shingler: Callable[[Any], np.ndarray], threshold: float, num_perm: int = NUM_PERM):
+        self.shingler = shingler
+        self.hasher = get_minhasher(num_perm)
+        self.index = LSHIndex(threshold, num_perm)
+
+    def signature(self, content: Any) -> Optional[np.ndarray]:
+        shingles = self.shingler(content)
+        return self.hasher.signature(shingles) if len(shingles) else None
+
+    def check(self, key: str, content: Any) -> Optional[Tuple[str, float]]:
+        """
+        Return (key, similarity) of the closest earlier near-duplicate, or None
+        after remembering ``content`` under ``key``. Empty content is never a
+        duplicate.
+        """
+        signature = self.signature(content)
+        if signature is None:
+            return None
+        matches = self.index.query(signature)
+        if matches:
+            return matches[0]
+        self.index.insert(key, signature)
+        return None
+
+    def add(self, key: str, content: Any) -> None:
+        """Remember ``content`` without checking it (e.g. dumps finished in an earlier run)."""
+        signature = self.signature(content)
+        if signature is not None:
+            self.index.insert(key, signature)
+
+    def forget(self, key: str) -> None:
+        self.index.remove(key)
+
+
+def raw_dump_detector(threshold: float = RAW_DUPLICATE_THRESHOLD) -> DuplicateDetector:
+    return DuplicateDetector(text_shingles, threshold)
+
+
+def profile_detector(threshold: float = PROFILE_DUPLICATE_THRESHOLD) -> DuplicateDetector:
+    return DuplicateDetector(profile_shingles, threshold)
@@ -0,0 +1,221 @@
+"""
+DOCX themes built from a ResumeStyle.
+
+Most of the cost of a DOCX render is not the profile content but the package
+around it: python-docx unzips and parses its default template, looks styles
+up among ~160 definitions for every paragraph, and on save re-serializes and
+deflates every part, including two ~400 KB style parts. A theme does that work
+once per ResumeStyle:
+
+- the base document is styled up front: fonts, sizes and colors of the body,
+  name, heading and bullet styles, line spacing, margins, and the bullet
+  numbering definition; the style part is pruned to the styles the renderer
+  uses,
+- the styled package is kept as ZIP bytes without its main document part, so
+  a render only serializes its own body and appends it as one ZIP member,
+- each thread keeps a parsed scratch document per theme whose body is cleared
+  for every render, so no template is re-opened.
+
+Themes are cached per distinct ResumeStyle. The body XML of a render does not
+depend on the theme (paragraphs only reference style ids), so one profile can
+be packaged in several themes from a single render.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import zipfile
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt, RGBColor
+from lxml import etree
+from pydantic import BaseModel
+
+DOCUMENT_PART = "word/document.xml"
+STYLES_WITH_EFFECTS_RELTYPE = "http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects"
+
+# Styles the markdown renderer uses (see add_markdown_lines); everything they
+# are based on or linked to is kept as well
+RENDER_STYLES = ("Normal", "Title", "Heading 1", "Heading 2", "Heading 3", "List Bullet")
+
+_THEME_FONT_ATTRIBUTES = ("w:asciiTheme", "w:hAnsiTheme", "w:eastAsiaTheme", "w:cstheme")
+
+
+class ResumeStyle(BaseModel):
+    """Defines the styling options for the DOCX resume (optional)"""
+    font_name: str = "Calibri"
+    name_size: int = 18
+    heading_size: int = 14
+    normal_size: int = 11
+    heading_color: tuple = (0, 0, 0)  # RGB
+    text_color: tuple = (0, 0, 0)     # RGB
+    margins: float = 1.0              # inches
+    line_spacing: float = 1.15
+
+
+# ------------------------------
+# 1. Styling the base document
+# ------------------------------
+def _style_font(style, font_name: str, size: float, color: Tuple[int, int, int]) -> None:
+    font = style.font
+    font.name = font_name
+    # Theme font references (the template's headings use them) win over
+    # explicit names in Word, so drop them
+    rfonts = style.element.rPr.rFonts
+    for attribute in _THEME_FONT_ATTRIBUTES:
+        rfonts.attrib.pop(qn(attribute), None)
+    rfonts.set(qn("w:eastAsia"), font_name)
+    font.size = Pt(size)
+    font.color.rgb = RGBColor(*color)
+
+
+def _prune_styles(doc) -> None:
+    """Remove style definitions the renderer never references."""
+    styles = doc.styles.element
+    by_id = {style.styleId: style for style in styles.style_lst}
+    pending = [doc.styles[name].style_id for name in RENDER_STYLES]
+    pending.extend(style.styleId for style in styles.style_lst if style.default)
+    keep = set()
+    while pending:
+        style_id = pending.pop()
+        if style_id in keep or style_id not in by_id:
+            continue
+        keep.add(style_id)
+        style = by_id[style_id]
+        for reference in ("w:basedOn", "w:link", "w:next"):
+            element = style.find(qn(reference))
+            if element is not None:
+                pending.append(element.get(qn("w:val")))
+    for style_id, style in by_id.items():
+        if style_id not in keep:
+            styles.remove(style)
+
+
+def build_base_document(style: ResumeStyle):
+    """A blank python-docx Document with ``style`` applied to everything the renderer uses."""
+    doc = Document()
+    styles = doc.styles
+
+    normal = styles["Normal"]
+    _style_font(normal, style.font_name, style.normal_size, style.text_color)
+    normal.paragraph_format.line_spacing = style.line_spacing
+    _style_font(styles["Title"], style.font_name, style.name_size, style.heading_color)
+    _style_font(styles["Heading 1"], style.font_name, style.heading_size, style.heading_color)
+    _style_font(styles["Heading 2"], style.font_name, style.heading_size, style.heading_color)
+    _style_font(styles["Heading 3"], style.font_name, style.normal_size + 1, style.heading_color)
+    _style_font(styles["List Bullet"], style.font_name, style.normal_size, style.text_color)
+
+    for section in doc.sections:
+        section.top_margin = section.bottom_margin = Inches(style.margins)
+        section.left_margin = section.right_margin = Inches(style.margins)
+
+    # List Bullet points at a numbering definition; make sure the part is loaded
+    doc.part.numbering_part
+    _prune_styles(doc)
+    # Word 2010 duplicate of the style part; unused once styles are defined above
+    for r_id, rel in list(doc.part.rels.items()):
+        if rel.reltype == STYLES_WITH_EFFECTS_RELTYPE:
+            doc.part.drop_rel(r_id)
+    return doc
+
+
+# ------------------------------
+# 2. Themes
+# ------------------------------
+class DocxTheme:
+    """A precompiled base package for one ResumeStyle."""
+
+    def __init__(self, style: ResumeStyle):
+        self.style = style
+        # Identifies the theme's output, e.g. to tell whether a rendered file is current
+        self.fingerprint = hashlib.sha256(
+            json.dumps(style.model_dump(), sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+        buffer = io.BytesIO()
+        build_base_document(style).save(buffer)
+        self._base = buffer.getvalue()
+
+        # Every part except the main document, already deflated
+        package = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(self._base)) as source, \
+                zipfile.ZipFile(package, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename != DOCUMENT_PART:
+                    target.writestr(info.filename, source.read(info.filename))
+            document_xml = source.read(DOCUMENT_PART)
+        self._package = package.getvalue()
+
+        # Main document split around the body content; the section properties
+        # (margins) stay at the end of the body
+        split = document_xml.index(b"<w:sectPr")
+        self._document_head = document_xml[:split]
+        self._document_tail = document_xml[split:]
+
+        self._local = threading.local()
+
+    def document(self):
+        """
+        This thread's scratch document for the theme, with an empty body. It is
+        reused by the next call, so finish with one document before asking for
+        another.
+        """
+        doc = getattr(self._local, "doc", None)
+        if doc is None:
+            doc = self._local.doc = Document(io.BytesIO(self._base))
+        body = doc.element.body
+        for element in list(body.iterchildren()):
+            if element.tag != qn("w:sectPr"):
+                body.remove(element)
+        return doc
+
+    def build(self, body_xml: Iterable[Union[str, bytes]]) -> bytes:
+        """A complete .docx package whose body consists of the given block-level XML fragments."""
+        parts = [self._document_head]
+        parts.extend(xml.encode("utf-8") if isinstance(xml, str) else xml for xml in body_xml)
+        parts.append(self._document_tail)
+        buffer = io.BytesIO(self._package)
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as package:
+            package.writestr(DOCUMENT_PART, b"".join(parts))
+        return buffer.getvalue()
+
+    def save(self, doc, target: Any) -> None:
+        """Package ``doc`` (from document()) into a path or writable binary stream."""
+        data = self.build(body_xml(doc))
+        if isinstance(target, str):
+            with open(target, "wb") as f:
+                f.write(data)
+        else:
+            target.write(data)
+
+
+def body_xml(doc) -> List[bytes]:
+    """
+    Serialized block-level content of a document body, excluding the section
+    properties. The body is serialized as a whole, so namespace declarations
+    are not repeated on every paragraph.
+    """
+    xml = etree.tostring(doc.element.body, encoding="UTF-8")
+    start = xml.index(b">") + 1
+    end = xml.rfind(b"<w:sectPr")
+    if end == -1:
+        end = xml.rindex(b"</w:body>")
+    return [xml[start:end]]
+
+
+def theme_key(style: Optional[ResumeStyle]) -> Tuple[Tuple[str, Any], ...]:
+    """Hashable identity of a style's settings."""
+    return tuple(sorted((style or ResumeStyle()).model_dump().items()))
+
+
+@lru_cache(maxsize=32)
+def _cached_theme(key: Tuple[Tuple[str, Any], ...]) -> DocxTheme:
+    return DocxTheme(ResumeStyle(**dict(key)))
+
+
+def get_theme(style: Optional[ResumeStyle] = None) -> DocxTheme:
+    """The cached theme for ``style`` (the default ResumeStyle if None)."""
+    return _cached_theme(theme_key(style))
@@ -0,0 +1,215 @@
+"""
+On-demand generation of profile downloads.
+
+Documents are rendered from the profile store into spooled buffers (in memory
+up to a limit, then a temporary file), so nothing is staged in the output
+directory. Helpers cover HTTP range requests, gzip/brotli for the text formats
+and streaming several documents as one ZIP built on the fly.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+import zipfile
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.pdf_render_service import PDF_RENDER_VERSION, render_pdf
+from app.services.profile_render_service import RENDER_VERSION, render_docx, render_html, render_markdown
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "html": "text/html; charset=utf-8",
+    "md": "text/markdown; charset=utf-8",
+    "pdf": "application/pdf",
+}
+# DOCX is already a deflated ZIP container and PDF page streams are deflated
+COMPRESSIBLE_FORMATS = {"html", "md"}
+
+SPOOL_MAX_BYTES = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when a Range header cannot be served for the representation size"""
+    pass
+
+
+def render_version(fmt: str) -> str:
+    """Version of the renderer behind a format; bumping it changes ETags and download URLs."""
+    if fmt != "pdf":
+        return RENDER_VERSION
+    version = f"{RENDER_VERSION}.{PDF_RENDER_VERSION}"
+    unicode_font = get_settings().PDF_UNICODE_FONT
+    if unicode_font:
+        # PDFs that embed glyphs change with the font file
+        try:
+            stat = os.stat(unicode_font)
+        except OSError:
+            return version
+        version += "." + hashlib.sha1(f"{unicode_font}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")).hexdigest()[:8]
+    return version
+
+
+def download_url(profile_id: str, fmt: str) -> str:
+    """Versioned URL of a stored profile download, cacheable for as long as the renderer is unchanged."""
+    return f"/api/profiles/{profile_id}/download?format={fmt}&v={render_version(fmt)}"
+
+
+def etag_for(profile_id: str, fmt: str, encoding: Optional[str] = None) -> str:
+    """Strong ETag: stored profiles are immutable, so id + format + renderer version is exact."""
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{profile_id}-{fmt}-r{render_version(fmt)}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def render_to_buffer(data, fmt: str) -> Tuple[BinaryIO, int]:
+    """Render a profile into a spooled buffer positioned at 0. Returns (buffer, size)."""
+    buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    if fmt == "docx":
+        render_docx(data, buffer)
+    elif fmt == "pdf":
+        render_pdf(data, buffer, unicode_font=get_settings().PDF_UNICODE_FONT)
+    elif fmt == "html":
+        buffer.write(render_html(data).encode("utf-8"))
+    elif fmt == "md":
+        buffer.write(render_markdown(data).encode("utf-8"))
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    size = buffer.tell()
+    buffer.seek(0)
+    return buffer, size
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick brotli or gzip from an Accept-Encoding header (ignoring q-values of 0)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header into an inclusive (start, end).
+    Returns None when the header is absent or not a single byte range (the full
+    body is served then); raises RangeNotSatisfiableError when out of bounds.
+    """
+    if not range_header:
+        return None
+    match = _RANGE.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":  # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiableError()
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiableError()
+    return start, end
+
+
+def iter_buffer(buffer: BinaryIO, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """Yield ``length`` bytes of ``buffer`` from ``start`` in chunks, then close it."""
+    try:
+        buffer.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = buffer.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        buffer.close()
+
+
+# ------------------------------
+# Streaming ZIP
+# ------------------------------
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable sink; zipfile then writes data descriptors instead of seeking back."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, dict]], fmt: str) -> Iterator[bytes]:
+    """
+    Stream a ZIP of rendered documents. ``entries`` yields (filename, profile
+    data); each document is rendered, written and flushed before the next one,
+    so at most one document is buffered at a time. A document that fails to
+    render is replaced by ``<filename>.error.txt`` with the error, since the
+    response has already started and the archive must stay readable.
+    """
+    sink = _ZipSink()
+    compression = zipfile.ZIP_DEFLATED if fmt in COMPRESSIBLE_FORMATS else zipfile.ZIP_STORED
+    with zipfile.ZipFile(sink, mode="w", compression=compression) as archive:
+        for filename, data in entries:
+            try:
+                buffer, _ = render_to_buffer(data, fmt)
+            except Exception as e:
+                print(f"Could not render {filename} for the archive: {e}")
+                archive.writestr(f"{filename}.error.txt", f"{filename} could not be rendered: {e}\n",
+                                 compress_type=zipfile.ZIP_DEFLATED)
+                pending = sink.drain()
+                if pending:
+                    yield pending
+                continue
+            with archive.open(filename, mode="w") as entry:
+                for chunk in iter_buffer(buffer):
+                    entry.write(chunk)
+                    pending = sink.drain()
+                    if pending:
+                        yield pending
+            pending = sink.drain()
+            if pending:
+                yield pending
+    # Central directory
+    yield sink.drain()
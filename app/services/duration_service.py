@@ -0,0 +1,373 @@
+"""
+Parsing of experience durations and education years, and career analytics.
+
+`Experience.duration` and `Education.years` are free text as LinkedIn shows
+it: "Jan 2019 - Present · 5 yrs 2 mos", "Mar 2016 – Aug 2018", "2012 - 2016",
+"Sep 2015". parse_duration turns one string into month indices (year * 12 +
+month - 1; the end is exclusive, so "Jan 2019 - Mar 2019" spans 3 months)
+and is memoized per string: the same few thousand spellings repeat across
+profiles.
+
+For many profiles, duration_columns / experience_columns parse each distinct
+string once and fill NumPy columns, and career_stats / career_analytics
+aggregate over them without a Python loop per profile: total experience with
+overlapping roles merged, tenure distributions and gaps between roles.
+
+Summarize the profile store with:
+    python -m app.services.duration_service [--as-of 2024-06] [--json]
+"""
+
+import argparse
+import json
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+UNKNOWN = -1
+# Gaps between roles shorter than this are treated as job changes, not career breaks
+GAP_MONTHS = 3
+TENURE_BUCKETS = ((0, 12, "<1y"), (12, 24, "1-2y"), (24, 36, "2-3y"), (36, 60, "3-5y"), (60, None, "5y+"))
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_MONTHS = {
+    "jan": 0, "feb": 1, "mar": 2, "apr": 3, "may": 4, "jun": 5,
+    "jul": 6, "aug": 7, "sep": 8, "oct": 9, "nov": 10, "dec": 11,
+}
+_DATE = re.compile(r"\b(?:([a-z]{3,9})\.?\s+)?((?:19|20)\d{2})\b")
+_PRESENT = re.compile(r"\b(?:present|current|currently|now|today|ongoing)\b")
+_YEARS = re.compile(r"(\d+)\s*(?:yrs?|years?)\b")
+_MONTHS_SPAN = re.compile(r"(\d+)\s*(?:mos?|months?)\b")
+_LESS_THAN_A_YEAR = re.compile(r"less than (?:a|one) year")
+# Month indices stay well below this, so adding profile * _PROFILE_STRIDE keeps profiles apart when sorted
+_PROFILE_STRIDE = 1 << 20
+
+
+# ------------------------------
+# 1. Parsing
+# ------------------------------
+def month_index(year: int, month: int) -> int:
+    """Month index of a calendar month (``month`` is 1-12)."""
+    return year * 12 + month - 1
+
+
+def format_month(index: int) -> Optional[str]:
+    """"YYYY-MM" for a month index, None if unknown."""
+    if index < 0:
+        return None
+    year, month = divmod(int(index), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def current_month_index(as_of: Optional[date] = None) -> int:
+    as_of = as_of or date.today()
+    return month_index(as_of.year, as_of.month)
+
+
+@lru_cache(maxsize=65536)
+def parse_duration(text: Optional[str]) -> Optional[Tuple[int, int, int, bool]]:
+    """
+    Parse a duration into (start, end, stated_months, current):
+
+    - ``start`` / ``end``: month indices, ``end`` exclusive; UNKNOWN (-1) when
+      the text has no such date, and ``end`` is UNKNOWN for current roles
+      (it depends on the date of the analysis),
+    - ``stated_months``: the length LinkedIn printed ("5 yrs 2 mos"), or
+      UNKNOWN,
+    - ``current``: the span runs to the present.
+
+    Year-only dates cover whole years ("2012 - 2016" is 48 months). Returns
+    None when nothing could be recognized.
+    """
+    if not text:
+        return None
+    lowered = text.lower()
+
+    stated = UNKNOWN
+    years, months = _YEARS.search(lowered), _MONTHS_SPAN.search(lowered)
+    if years or months:
+        stated = (int(years.group(1)) * 12 if years else 0) + (int(months.group(1)) if months else 0)
+    elif _LESS_THAN_A_YEAR.search(lowered):
+        stated = 0
+
+    dates = []
+    for match in _DATE.finditer(lowered):
+        month = _MONTHS.get((match.group(1) or "")[:3])
+        dates.append((int(match.group(2)), month))
+        if len(dates) == 2:
+            break
+    current = bool(_PRESENT.search(lowered))
+
+    start = end = UNKNOWN
+    if dates:
+        year, month = dates[0]
+        start = year * 12 + (month if month is not None else 0)
+        if len(dates) == 2:
+            year, month = dates[1]
+            end = year * 12 + (month + 1 if month is not None else 0)
+            current = False
+        elif not current:
+            # A single date: that month, or that whole year
+            end = start + (1 if month is not None else 12)
+        if end != UNKNOWN and end <= start:
+            # "2016 - 2016" or reversed dates: keep the start, trust the stated length if any
+            end = start + stated if stated > 0 else start + 1
+
+    if start == UNKNOWN and stated == UNKNOWN:
+        return None
+    return start, end, stated, current
+
+
+def duration_info(text: Optional[str], as_of: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    One duration as a dict: {"start": "2019-01", "end": "2024-03" or None,
+    "months": 62, "current": True}. ``as_of`` (default today) closes current
+    spans. Returns None if the text could not be parsed.
+    """
+    parsed = parse_duration(text)
+    if parsed is None:
+        return None
+    start, end, stated, current = parsed
+    months = _span_months(start, end, stated, current, current_month_index(as_of))
+    return {
+        "start": format_month(start),
+        "end": None if current else format_month(end - 1) if end >= 0 else None,
+        "months": months if months >= 0 else None,
+        "current": current,
+    }
+
+
+def _span_months(start: int, end: int, stated: int, current: bool, now: int) -> int:
+    if stated >= 0:
+        return stated
+    if current and start >= 0:
+        return max(now - start + 1, 0)
+    if start >= 0 and end >= 0:
+        return end - start
+    return UNKNOWN
+
+
+# ------------------------------
+# 2. Columnar batches
+# ------------------------------
+def duration_columns(texts: Sequence[Optional[str]], as_of: Optional[date] = None) -> Dict[str, np.ndarray]:
+    """
+    Parse many durations into NumPy columns of equal length:
+
+    - ``start``, ``end`` (int32 month indices, end exclusive; current spans
+      end after the ``as_of`` month; UNKNOWN where missing),
+    - ``months`` (int32: stated length, else computed from the dates; UNKNOWN
+      if neither),
+    - ``current`` and ``parsed`` (bool).
+
+    Each distinct string is parsed once.
+    """
+    codes: Dict[Optional[str], int] = {}
+    rows = np.fromiter((codes.setdefault(text, len(codes)) for text in texts), dtype=np.int64, count=len(texts))
+
+    table = np.full((len(codes) + 1, 4), UNKNOWN, dtype=np.int32)
+    for text, code in codes.items():
+        parsed = parse_duration(text)
+        if parsed is not None:
+            table[code] = parsed
+    table = table[rows]
+
+    start, end, stated = table[:, 0], table[:, 1], table[:, 2]
+    current = table[:, 3] == 1
+    parsed = (start != UNKNOWN) | (stated != UNKNOWN)
+    now = current_month_index(as_of)
+
+    end = np.where(current & (start != UNKNOWN), np.maximum(now + 1, start + 1), end)
+    months = np.where(stated != UNKNOWN, stated, np.where((start != UNKNOWN) & (end != UNKNOWN), end - start, UNKNOWN))
+    return {
+        "start": start,
+        "end": end.astype(np.int32),
+        "months": months.astype(np.int32),
+        "current": current & parsed,
+        "parsed": parsed,
+    }
+
+
+def experience_columns(profiles: Iterable[Dict[str, Any]], as_of: Optional[date] = None,
+                       section: str = "experience") -> Dict[str, np.ndarray]:
+    """
+    duration_columns over every entry of a section ("experience" durations or
+    "education" years) of many profile dicts, plus a ``profile`` column with
+    the index of the profile each row belongs to and ``profile_count``.
+    """
+    field = "years" if section == "education" else "duration"
+    texts: List[Optional[str]] = []
+    owners: List[int] = []
+    count = 0
+    for count, data in enumerate(profiles, start=1):
+        for entry in data.get(section) or []:
+            texts.append(entry.get(field))
+            owners.append(count - 1)
+    columns = duration_columns(texts, as_of)
+    columns["profile"] = np.asarray(owners, dtype=np.int32)
+    columns["profile_count"] = np.int64(count)
+    return columns
+
+
+# ------------------------------
+# 3. Career analytics
+# ------------------------------
+def career_stats(columns: Dict[str, np.ndarray], gap_months: int = GAP_MONTHS) -> Dict[str, np.ndarray]:
+    """
+    Per-profile columns from experience_columns:
+
+    - ``roles``: entries with a parsed duration,
+    - ``first_start``, ``last_end``: month indices (UNKNOWN without dated roles),
+    - ``total_months``: months covered by at least one role (concurrent roles
+      counted once),
+    - ``gap_months``: uncovered months between the first and last role,
+    - ``longest_gap``, ``gaps``: the longest gap and the number of gaps of at
+      least ``gap_months``,
+    - ``current``: holds a current role.
+    """
+    count = int(columns["profile_count"])
+    profile = columns["profile"]
+    parsed = columns["parsed"]
+    roles = np.bincount(profile[parsed], minlength=count)
+    current = np.bincount(profile[columns["current"]], minlength=count) > 0
+
+    first_start = np.full(count, UNKNOWN, dtype=np.int64)
+    last_end = np.full(count, UNKNOWN, dtype=np.int64)
+    total = np.zeros(count, dtype=np.int64)
+    gap_total = np.zeros(count, dtype=np.int64)
+    longest_gap = np.zeros(count, dtype=np.int64)
+    gaps = np.zeros(count, dtype=np.int64)
+
+    dated = (columns["start"] != UNKNOWN) & (columns["end"] != UNKNOWN)
+    if dated.any():
+        owner = profile[dated].astype(np.int64)
+        start = columns["start"][dated].astype(np.int64)
+        end = columns["end"][dated].astype(np.int64)
+        order = np.lexsort((start, owner))
+        owner, start, end = owner[order], start[order], end[order]
+
+        # Merge intervals per profile: the running maximum of the end so far,
+        # offset per profile so it never carries over from the previous one
+        reach = np.maximum.accumulate(end + owner * _PROFILE_STRIDE) - owner * _PROFILE_STRIDE
+        first = np.ones(len(owner), dtype=bool)
+        first[1:] = owner[1:] != owner[:-1]
+        gap = np.zeros(len(owner), dtype=np.int64)
+        gap[1:] = np.maximum(start[1:] - reach[:-1], 0)
+        gap[first] = 0
+
+        heads = np.flatnonzero(first)
+        owners = owner[heads]
+        first_start[owners] = start[heads]
+        last_end[owners] = np.maximum.reduceat(end, heads)
+        gap_total[owners] = np.add.reduceat(gap, heads)
+        longest_gap[owners] = np.maximum.reduceat(gap, heads)
+        gaps[owners] = np.add.reduceat((gap >= gap_months).astype(np.int64), heads)
+        total[owners] = last_end[owners] - first_start[owners] - gap_total[owners]
+
+    # Profiles whose roles only state a length ("2 yrs") get the sum of those lengths
+    undated = (roles > 0) & (first_start == UNKNOWN)
+    if undated.any():
+        months = np.where(parsed & (columns["months"] > 0), columns["months"], 0)
+        summed = np.bincount(profile, weights=months, minlength=count).astype(np.int64)
+        total[undated] = summed[undated]
+
+    return {
+        "roles": roles,
+        "first_start": first_start,
+        "last_end": last_end,
+        "total_months": total,
+        "gap_months": gap_total,
+        "longest_gap": longest_gap,
+        "gaps": gaps,
+        "current": current,
+    }
+
+
+def _distribution(values: np.ndarray, scale: float = 1.0) -> Dict[str, float]:
+    if not len(values):
+        return {}
+    points = np.percentile(values, PERCENTILES) / scale
+    summary = {"mean": round(float(values.mean()) / scale, 2)}
+    summary.update({f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, points)})
+    return summary
+
+
+def career_analytics(profiles: Iterable[Dict[str, Any]], as_of: Optional[date] = None,
+                     gap_months: int = GAP_MONTHS) -> Dict[str, Any]:
+    """Aggregate experience statistics over many profile dicts."""
+    columns = experience_columns(profiles, as_of)
+    stats = career_stats(columns, gap_months)
+    count = int(columns["profile_count"])
+    with_roles = stats["roles"] > 0
+
+    tenure = columns["months"][columns["parsed"] & (columns["months"] >= 0)]
+    histogram = {}
+    for low, high, label in TENURE_BUCKETS:
+        selected = tenure >= low if high is None else (tenure >= low) & (tenure < high)
+        histogram[label] = int(np.count_nonzero(selected))
+
+    with_gaps = stats["gaps"] > 0
+    gap_profiles = int(np.count_nonzero(with_gaps))
+    return {
+        "profiles": count,
+        "profiles_with_experience": int(np.count_nonzero(with_roles)),
+        "roles": int(len(columns["parsed"])),
+        "parsed_fraction": round(float(columns["parsed"].mean()), 4) if len(columns["parsed"]) else 0.0,
+        "roles_per_profile": round(float(stats["roles"][with_roles].mean()), 2) if with_roles.any() else 0.0,
+        "currently_employed": round(float(stats["current"][with_roles].mean()), 4) if with_roles.any() else 0.0,
+        "total_experience_years": _distribution(stats["total_months"][with_roles], 12.0),
+        "tenure_months": {**_distribution(tenure), "histogram": histogram},
+        "gaps": {
+            "min_gap_months": gap_months,
+            "profiles_with_gap": gap_profiles,
+            "share": round(gap_profiles / max(int(np.count_nonzero(with_roles)), 1), 4),
+            "longest_gap_months": _distribution(stats["longest_gap"][with_gaps]),
+        },
+    }
+
+
+# --------------------------------
+# 4. Main Entry Point
+# --------------------------------
+def main():
+    from app.services.profile_store_service import PROFILE_STORE_DIR, iter_profile_ids, load_profile
+
+    parser = argparse.ArgumentParser(description="Career analytics over the stored profiles.")
+    parser.add_argument("--store", default=PROFILE_STORE_DIR, help="Profile store directory")
+    parser.add_argument("--as-of", default=None, help="Close current roles at this month (YYYY-MM, default: now)")
+    parser.add_argument("--gap-months", type=int, default=GAP_MONTHS, help="Shortest gap counted as a career break")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    as_of = None
+    if args.as_of:
+        year, month = args.as_of.split("-")
+        as_of = date(int(year), int(month), 1)
+
+    def profiles():
+        for profile_id in iter_profile_ids(args.store):
+            data = load_profile(profile_id, args.store)
+            if data is not None:
+                yield data
+
+    report = career_analytics(profiles(), as_of, args.gap_months)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['profiles']} profiles, {report['roles']} roles "
+          f"({report['parsed_fraction']:.1%} with a parsed duration)")
+    experience = report["total_experience_years"]
+    if experience:
+        print(f"Total experience (years): median {experience['p50']}, p10 {experience['p10']}, p90 {experience['p90']}")
+    tenure = report["tenure_months"]
+    if "p50" in tenure:
+        print(f"Tenure per role (months): median {tenure['p50']}, p90 {tenure['p90']}; {tenure['histogram']}")
+    print(f"Currently employed: {report['currently_employed']:.1%}; "
+          f"profiles with a gap of {args.gap_months}+ months: {report['gaps']['profiles_with_gap']} "
+          f"({report['gaps']['share']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
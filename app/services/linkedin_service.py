@@ -9,10 +9,10 @@ This script uses Selenium (Python) to:
    - If a verification puzzle appears, it pauses, allows the user to solve it manually,
      and continues once the user presses Enter.
 4. Navigate to the specified profile URL.
-5. Locate & click "see more" buttons to expand hidden sections.
-6. Programmatically "highlight everything" on the page (simulating Ctrl + A).
-7. Extract all visible text from the entire page post-expansion.
-8. Save it into an 'output/profile.marathon' file.
+5. Expand hidden sections and extract the page, section by section, with one
+   injected script (see page_extraction_service).
+6. Save the text into an 'output/profile.marathon' file (and the sections
+   into 'output/profile.sections.json').
 
 It also includes optional logic to parse the raw text into a structured format
 using GPT-4o. If you want just the raw text extraction, you can remove or ignore
@@ -27,6 +27,7 @@ DISCLAIMER:
 import os
 import time
 import getpass
+import threading
 from typing import List, Optional, Dict, Any
 
 # Selenium imports
@@ -42,11 +43,18 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # Optional: For Word/Markdown conversions
-from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
 
+from app.services.docx_theme_service import ResumeStyle, get_theme
+from app.services.profile_render_service import add_markdown_lines, render_profile_files, profile_to_dict
+from app.services.profile_store_service import person_key, save_profile
+from app.services.profile_index_service import index_profile
+from app.services.snapshot_service import get_snapshot_archive
+from app.services.page_extraction_service import extract_profile_sections, sections_to_text, save_sections
+from app.services.rate_limit_service import get_scheduler, estimate_tokens, PRIORITY_BACKGROUND
+
 load_dotenv()
 
 # ------------------------------
@@ -92,284 +100,101 @@ class LinkedInProfile(BaseModel):
     volunteer: Optional[List[Volunteer]] = None
     recommendations: Optional[List[Recommendation]] = None
 
-# Optional styling class
-class ResumeStyle(BaseModel):
-    """Defines the styling options for the DOCX resume (optional)"""
-    font_name: str = "Calibri"
-    name_size: int = 18
-    heading_size: int = 14
-    normal_size: int = 11
-    heading_color: tuple = (0, 0, 0)  # RGB
-    text_color: tuple = (0, 0, 0)     # RGB
-    margins: float = 1.0              # inches
-    line_spacing: float = 1.15
-
 # ------------------------------------
 # 2. GPT-based Structuring (Optional)
 # ------------------------------------
+STRUCTURING_MODEL = "gpt-4o"
+STRUCTURING_PROMPT = "Extract the LinkedIn profile information into a structured format."
+
 def structure_profile_data(raw_text: str) -> LinkedInProfile:
     """
     Uses GPT-4o (example usage) to structure the raw LinkedIn profile text.
     Customize if you're not actually using GPT-4o or a similar approach.
+
+    The call goes through the shared model-call scheduler as background work,
+    so it yields to interactive chat and is retried with backoff on 429s.
     """
-    client = OpenAI()
-    
-    completion = client.beta.chat.completions.parse(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "system",
-                "content": "Extract the LinkedIn profile information into a structured format."
-            },
-            {
-                "role": "user",
-                "content": raw_text
-            }
-        ],
-        response_format=LinkedInProfile,
+    # Retries are handled by the scheduler
+    client = OpenAI(max_retries=0)
+    messages = [
+        {
+            "role": "system",
+            "content": STRUCTURING_PROMPT
+        },
+        {
+            "role": "user",
+            "content": raw_text
+        }
+    ]
+
+    completion = get_scheduler().call(
+        lambda: client.beta.chat.completions.with_raw_response.parse(
+            model=STRUCTURING_MODEL,
+            messages=messages,
+            response_format=LinkedInProfile,
+        ),
+        priority=PRIORITY_BACKGROUND,
+        estimated_tokens=estimate_tokens(messages, max_output_tokens=2000),
     )
 
     return completion.choices[0].message.parsed
 
-def markdown_to_docx(markdown_file: str, output_file: str) -> str:
+def markdown_to_docx(markdown_file: str, output_file: str, style: Optional[ResumeStyle] = None) -> str:
     """
-    Converts the markdown resume to a simple DOCX file.
+    Converts the markdown resume to a DOCX file styled with ``style``
+    (the default ResumeStyle if None).
     """
-    doc = Document()
+    theme = get_theme(style)
+    doc = theme.document()
     with open(markdown_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    lines = content.split('\n')
-    for line in lines:
-        if line.startswith('# '):  # Name
-            doc.add_heading(line[2:], 0)
-        elif line.startswith('## '):  # Headline
-            doc.add_heading(line[3:], 1)
-        elif line.startswith('### '):  # Section headers
-            doc.add_heading(line[4:], 2)
-        elif line.startswith('#### '):  # Subsections
-            doc.add_heading(line[5:], 3)
-        elif line.startswith('- '):  # List items
-            doc.add_paragraph(line[2:], style='List Bullet')
-        elif line.startswith('*') and line.endswith('*'):  # Italic text
-            p = doc.add_paragraph()
-            p.add_run(line.strip('*')).italic = True
-        elif line.startswith('**') and line.endswith('**'):  # Bold text
-            p = doc.add_paragraph()
-            p.add_run(line.strip('**')).bold = True
-        elif '**' in line:  # Handle inline bold text
-            p = doc.add_paragraph()
-            parts = line.split('**')
-            for i, part in enumerate(parts):
-                if part:  # Skip empty parts
-                    run = p.add_run(part)
-                    run.bold = (i % 2 == 1)  # Bold for odd-indexed parts
-        elif line.strip():
-            doc.add_paragraph(line)
-
-    doc.save(output_file)
+    add_markdown_lines(doc, content.split('\n'))
+
+    theme.save(doc, output_file)
     return output_file
 
-def save_structured_profile(profile: LinkedInProfile, output_dir: str):
+def save_structured_profile(profile: LinkedInProfile, output_dir: str, style: Optional[ResumeStyle] = None,
+                            profile_url: Optional[str] = None):
     """
     Saves the structured profile as markdown, HTML, and DOCX formats.
-    """
-    # ------------------------
-    # Generate Markdown
-    # ------------------------
-    markdown = f"""# {profile.name}
-
-## {profile.headline}
-**Location:** {profile.location}
 
-### About
-{profile.about}
-
-### Experience
-"""
-    
-    for exp in profile.experience:
-        markdown += f"""
-#### {exp.title} at {exp.company}
-*{exp.duration}*
-
-{exp.description if exp.description else ''}
-"""
-
-    markdown += "\n### Education\n"
-    for edu in profile.education:
-        markdown += f"""
-#### {edu.school}
-{edu.degree}{f' in {edu.field}' if edu.field else ''}
-{f'*{edu.years}*' if edu.years else ''}
-"""
-
-    if profile.skills:
-        markdown += "\n### Skills\n"
-        for skill in profile.skills:
-            markdown += f"- {skill}\n"
-
-    if profile.certifications:
-        markdown += "\n### Certifications\n"
-        for cert in profile.certifications:
-            markdown += f"""
-#### {cert.name}
-Issued by {cert.issuer}{f' ({cert.date})' if cert.date else ''}
-"""
-
-    if profile.languages:
-        markdown += "\n### Languages\n"
-        for lang in profile.languages:
-            markdown += f"- {lang}\n"
-
-    if profile.recommendations:
-        markdown += "\n### Recommendations\n"
-        for rec in profile.recommendations:
-            markdown += f"""
-#### From {rec.author} ({rec.relationship})
-{rec.text}
-"""
+    Rendering is incremental: the previous profile is kept next to the outputs
+    as JSON, and only sections that changed since then are re-rendered; the
+    rest are reassembled from the fragment cache in ``output_dir``. The DOCX
+    is styled with ``style`` (the default ResumeStyle if None).
 
-    # ------------------------
-    # Generate HTML (Optional)
-    # ------------------------
-    html = f"""
-    <div class="profile-container">
-        <header class="profile-header">
-            <h1 class="profile-name">{profile.name}</h1>
-            <h2 class="profile-headline">{profile.headline}</h2>
-            <div class="profile-location">
-                <i class="fas fa-map-marker-alt"></i> {profile.location}
-            </div>
-        </header>
-
-        <section class="profile-section">
-            <h3>About</h3>
-            <div class="profile-about">
-                {profile.about}
-            </div>
-        </section>
-
-        <section class="profile-section">
-            <h3>Experience</h3>
-            <div class="experience-list">
-                {''.join([f'''
-                <div class="experience-item">
-                    <div class="experience-header">
-                        <h4>{exp.title}</h4>
-                        <div class="company-name">{exp.company}</div>
-                        <div class="duration">{exp.duration}</div>
-                    </div>
-                    <div class="experience-description">
-                        {exp.description if exp.description else ''}
-                    </div>
-                </div>
-                ''' for exp in profile.experience])}
-            </div>
-        </section>
-
-        <section class="profile-section">
-            <h3>Education</h3>
-            <div class="education-list">
-                {''.join([f'''
-                <div class="education-item">
-                    <div class="education-header">
-                        <h4>{edu.school}</h4>
-                        <div class="degree">
-                            {edu.degree}{f' in {edu.field}' if edu.field else ''}
-                        </div>
-                        {f'<div class="years">{edu.years}</div>' if edu.years else ''}
-                    </div>
-                </div>
-                ''' for edu in profile.education])}
-            </div>
-        </section>
+    The profile is also added to the content-addressed profile store, from
+    which versioned downloads are generated on demand, and to the search index,
+    where it replaces the previous version of the same person (identified by
+    ``profile_url``; without a URL it is indexed as a person of its own).
     """
-
-    if profile.skills:
-        html += f"""
-        <section class="profile-section">
-            <h3>Skills</h3>
-            <div class="skills-list">
-                {''.join([f'<span class="skill-tag">{skill}</span>' for skill in profile.skills])}
-            </div>
-        </section>
-        """
-
-    if profile.certifications:
-        html += f"""
-        <section class="profile-section">
-            <h3>Certifications</h3>
-            <div class="certifications-list">
-                {''.join([f'''
-                <div class="certification-item">
-                    <h4>{cert.name}</h4>
-                    <div class="certification-meta">
-                        <span class="issuer">Issued by {cert.issuer}</span>
-                        {f'<span class="date">{cert.date}</span>' if cert.date else ''}
-                    </div>
-                </div>
-                ''' for cert in profile.certifications])}
-            </div>
-        </section>
-        """
-
-    if profile.languages:
-        html += f"""
-        <section class="profile-section">
-            <h3>Languages</h3>
-            <div class="languages-list">
-                {''.join([f'<span class="language-tag">{lang}</span>' for lang in profile.languages])}
-            </div>
-        </section>
-        """
-
-    if profile.recommendations:
-        html += f"""
-        <section class="profile-section recommendations-section">
-            <h3>Recommendations</h3>
-            <div class="recommendations-list">
-                {''.join([f'''
-                <div class="recommendation-item">
-                    <div class="recommendation-header">
-                        <div class="recommender">
-                            <span class="recommender-name">{rec.author}</span>
-                            <span class="relationship">({rec.relationship})</span>
-                        </div>
-                    </div>
-                    <div class="recommendation-content">
-                        "{rec.text}"
-                    </div>
-                </div>
-                ''' for rec in profile.recommendations])}
-            </div>
-        </section>
-        """
-
-    html += "</div>"
-
-    # ------------------------
-    # Save All Files
-    # ------------------------
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir, exist_ok=True)
-
-    markdown_file = os.path.join(output_dir, "structured_profile.md")
-    with open(markdown_file, "w", encoding="utf-8") as f:
-        f.write(markdown)
-    
-    html_file = os.path.join(output_dir, "structured_profile.html")
-    with open(html_file, "w", encoding="utf-8") as f:
-        f.write(html)
-    
-    docx_file = os.path.join(output_dir, "structured_profile.docx")
-    markdown_to_docx(markdown_file, docx_file)
-    
-    return markdown_file, html_file, docx_file
+    data = profile_to_dict(profile)
+    person = person_key(data, profile_url)
+    profile_id = save_profile(data, person=person)
+    # Search is an extra: the resume files are still rendered without it
+    try:
+        index_profile(profile_id, data, person)
+    except Exception as e:
+        print(f"Warning: Could not index profile {profile_id} for search: {e}")
+    return render_profile_files(profile, output_dir, style=style)
 
 # ------------------------------------
 # 3. Main Extraction Logic
 # ------------------------------------
+# Extractions run concurrently (one worker thread per tool call). Writes into a
+# shared output directory are serialized, and only one captcha prompt at a time
+# can wait on the console.
+_output_dir_locks: Dict[str, threading.Lock] = {}
+_output_dir_locks_guard = threading.Lock()
+_console_lock = threading.Lock()
+
+def output_dir_lock(output_dir: str) -> threading.Lock:
+    """The lock that guards writes into ``output_dir``."""
+    key = os.path.abspath(output_dir)
+    with _output_dir_locks_guard:
+        return _output_dir_locks.setdefault(key, threading.Lock())
+
 def linkedin_highlight_and_extract(
     email: str,
     password: str,
@@ -433,9 +258,10 @@ def linkedin_highlight_and_extract(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".captcha__prompt, .rc-imageselect-tile"))  # Example CSS
             )
             if puzzle_element:
-                print("\nA verification puzzle has appeared.")
-                print("Please solve it in the browser window. Then press Enter here to continue.")
-                input("Press Enter once the puzzle is solved...")
+                with _console_lock:
+                    print("\nA verification puzzle has appeared.")
+                    print(f"Please solve it in the browser window for {profile_url}. Then press Enter here to continue.")
+                    input("Press Enter once the puzzle is solved...")
         except:
             # If no puzzle is found within 5s, we assume no captcha is needed
             pass
@@ -450,59 +276,58 @@ def linkedin_highlight_and_extract(
         time.sleep(3)  # Additional wait after login
         driver.get(profile_url)
 
-        time.sleep(5)  # Wait for the profile page to load
-
-        # -------------------------------------------------------
-        # 4. Locate & Click "see more" Buttons to Expand Sections
-        # -------------------------------------------------------
-        see_more_selectors = [
-            ".inline-show-more-text__button.inline-show-more-text__button--light.link"
-        ]
-        for selector in see_more_selectors:
-            buttons = driver.find_elements(By.CSS_SELECTOR, selector)
-            for btn in buttons:
-                try:
-                    driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(1)
-                except Exception as e:
-                    print(f"Warning: Could not click a 'see more' button: {e}")
-
-        # -------------------------
-        # 5. "Highlight Everything"
-        # -------------------------
-        # Simulate Ctrl + A in the browser
-        driver.execute_script("window.getSelection().removeAllRanges();")
-        driver.execute_script("const range = document.createRange(); range.selectNode(document.body); window.getSelection().addRange(range);")
-
-        # -------------------------------
-        # 6. Extract All Visible Text
-        # -------------------------------
-        page_text = driver.execute_script("return document.body.innerText")
+        # Wait for the profile to render; the extraction script then waits for it to settle
+        try:
+            WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "main")))
+        except Exception:
+            print("Warning: Profile page did not render a <main> element in time")
 
-        # ---------------------------------
-        # 7. Save the text into .marathon
-        # ---------------------------------
+        # ------------------------------------------------------------
+        # 4. Expand & Extract All Sections (one in-page script call)
+        # ------------------------------------------------------------
         if not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
+        extracted = None
+        try:
+            extracted = extract_profile_sections(driver)
+            page_text = sections_to_text(extracted)
+            stats = extracted["stats"]
+            print(f"Extracted {len(extracted['sections'])} sections "
+                  f"({stats['clicked']} expanded, {stats['waitedMs']} ms in page)")
+        except Exception as e:
+            print(f"Warning: In-page extraction failed ({e}); falling back to the page text")
+            page_text = driver.execute_script("return document.body.innerText")
+
+        # ---------------------------------
+        # 5. Save the text into .marathon
+        # ---------------------------------
         marathon_file = os.path.join(output_dir, "profile.marathon")
 
-        with open(marathon_file, "w", encoding="utf-8") as f:
-            f.write(page_text)
+        with output_dir_lock(output_dir):
+            if extracted is not None:
+                save_sections(extracted, os.path.join(output_dir, "profile.sections.json"))
+            with open(marathon_file, "w", encoding="utf-8") as f:
+                f.write(page_text)
 
         print(f"Entire expanded profile text saved to: {marathon_file}")
 
+        # Keep every capture: profile.marathon only holds the latest one
+        try:
+            archive = get_snapshot_archive(os.path.join(output_dir, "snapshots"))
+            version = archive.append(profile_url, page_text)
+            print(f"Capture archived as version {version} of {profile_url}")
+        except Exception as e:
+            print(f"Warning: Could not archive the capture: {e}")
+
         # ------------------------------------------------
-        # 8. (Optional) Parse & Save Structured Versions
+        # 6. (Optional) Parse & Save Structured Versions
         # ------------------------------------------------
         try:
             structured_profile = structure_profile_data(page_text)
-            
-            raw_file = os.path.join(output_dir, "profile.marathon")
-            with open(raw_file, "w", encoding="utf-8") as f:
-                f.write(page_text)
-            
+
             # Save structured as MD/HTML/DOCX
-            structured_files = save_structured_profile(structured_profile, output_dir)
+            with output_dir_lock(output_dir):
+                structured_files = save_structured_profile(structured_profile, output_dir, profile_url=profile_url)
 
             print(f"\nStructured profile saved. Files generated:")
             print(f"1) {structured_files[0]} (Markdown)")
@@ -0,0 +1,338 @@
+"""
+Skill and title normalization.
+
+Structured profiles come back from the model with free-form skills and job
+titles ("JS", "Javascript", "JavaScript (ES6)"; "Sr. SWE"). This stage maps
+them to one canonical spelling for the search index and job matching, so that
+different spellings find each other. Profiles themselves, and every document
+rendered from them, keep the spelling as written (`search_skills` and
+`search_title` add the canonical forms next to it):
+
+- a compiled alias dictionary resolves whole strings in one lookup,
+- a word trie finds multi-word aliases ("amazon web services", "front end")
+  with longest-match scanning, to split compound skills ("Python / Django")
+  and to expand title abbreviations,
+- an optional fuzzy fallback (difflib) catches typos ("Kubernets"); its
+  results are cached, like all per-string results.
+
+Unknown skills and title words are kept as written.
+"""
+
+import difflib
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# ------------------------------
+# 1. Alias tables
+# ------------------------------
+# Canonical skill -> aliases (matching is case-insensitive; the canonical
+# spelling itself is always an alias)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "JavaScript": ["js", "javascript es6", "es6", "ecmascript", "vanilla js"],
+    "TypeScript": ["ts"],
+    "Python": ["python3", "python 3"],
+    "Java": [],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["c sharp", "csharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": [],
+    "Ruby": [],
+    "Ruby on Rails": ["rails", "ror"],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "R": [],
+    "SQL": [],
+    "PostgreSQL": ["postgres", "postgre sql", "psql"],
+    "MySQL": ["my sql"],
+    "MongoDB": ["mongo", "mongo db"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "React": ["react.js", "reactjs", "react js"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["springboot"],
+    "GraphQL": ["graph ql"],
+    "REST APIs": ["rest", "rest api", "restful apis", "restful api", "restful services"],
+    "Microservices": ["micro services", "microservice architecture"],
+    "Docker": ["docker containers"],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": [],
+    "AWS": ["amazon web services"],
+    "Google Cloud Platform": ["gcp", "google cloud"],
+    "Microsoft Azure": ["azure"],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": [],
+    "Linux": ["unix"],
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Artificial Intelligence": [],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["tensor flow", "tf"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Apache Spark": ["spark", "pyspark"],
+    "Apache Kafka": ["kafka"],
+    "Data Analysis": ["data analytics"],
+    "Data Engineering": [],
+    "Data Science": [],
+    "Statistics": [],
+    "Agile": ["agile methodologies", "agile development"],
+    "Scrum": [],
+    "Project Management": ["pm"],
+    "Product Management": [],
+    "Leadership": ["team leadership"],
+    "Communication": ["communication skills"],
+    "Figma": [],
+    "UX Research": ["user research"],
+    "UX Design": ["user experience", "ux"],
+    "UI Design": ["user interface design", "ui"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+}
+
+# Title words and phrases -> expansion
+TITLE_ALIASES: Dict[str, str] = {
+    "sr": "Senior",
+    "snr": "Senior",
+    "jr": "Junior",
+    "swe": "Software Engineer",
+    "sde": "Software Development Engineer",
+    "sre": "Site Reliability Engineer",
+    "ml": "Machine Learning",
+    "ai": "AI",
+    "engr": "Engineer",
+    "mgr": "Manager",
+    "mngr": "Manager",
+    "pm": "Product Manager",
+    "tpm": "Technical Program Manager",
+    "em": "Engineering Manager",
+    "vp": "VP",
+    "cto": "CTO",
+    "ceo": "CEO",
+    "qa": "QA",
+    "ux": "UX",
+    "ui": "UI",
+    "devops": "DevOps",
+    "front end": "Frontend",
+    "front-end": "Frontend",
+    "back end": "Backend",
+    "back-end": "Backend",
+    "full-stack": "Full Stack",
+    "fullstack": "Full Stack",
+    "tech lead": "Technical Lead",
+    "assoc": "Associate",
+    "mts": "Member of Technical Staff",
+}
+
+# Words that may join several skills in one entry ("Python and Django")
+_JOINER_WORDS = {"and", "&", "with", "plus"}
+_LIST_SEPARATORS = re.compile(r"\s*[,;|]\s*")
+_JOINERS = re.compile(r"\s*(?:/|\s+and\s+|\s+&\s+|\s+plus\s+)\s*", re.IGNORECASE)
+_PARENTHETICAL = re.compile(r"\s*[(\[][^)\]]*[)\]]\s*")
+_WORD = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*")
+_TITLE_TOKEN = re.compile(r"(\s+|[,|@()/])")
+_TRIE_END = ""
+
+
+def normalize_key(text: str) -> str:
+    """Case-insensitive lookup key: lowercase, single spaces, no surrounding punctuation."""
+    return " ".join(text.lower().split()).strip(" .,:;-")
+
+
+def _build_trie(phrases: Iterable[Tuple[List[str], Any]]) -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    for words, value in phrases:
+        node = root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[_TRIE_END] = value
+    return root
+
+
+def _longest_match(trie: Dict[str, Any], words: List[str], start: int) -> Tuple[int, Any]:
+    """Longest phrase in ``trie`` starting at ``words[start]``: (end index, value), or (start, None)."""
+    node = trie
+    best = (start, None)
+    for i in range(start, len(words)):
+        node = node.get(words[i])
+        if node is None:
+            break
+        if _TRIE_END in node:
+            best = (i + 1, node[_TRIE_END])
+    return best
+
+
+# ------------------------------
+# 2. Normalizer
+# ------------------------------
+class Normalizer:
+    """Compiled alias tables plus cached per-string normalization."""
+
+    def __init__(self, skill_aliases: Dict[str, List[str]] = SKILL_ALIASES,
+                 title_aliases: Dict[str, str] = TITLE_ALIASES,
+                 fuzzy_cutoff: float = 0.88, cache_size: int = 65536):
+        self.skills: Dict[str, str] = {}
+        for canonical, aliases in skill_aliases.items():
+            for alias in [canonical, *aliases]:
+                self.skills[normalize_key(alias)] = canonical
+        self.skill_trie = _build_trie((_WORD.findall(key), canonical) for key, canonical in self.skills.items())
+        self.title_trie = _build_trie((_WORD.findall(normalize_key(alias)), expansion)
+                                      for alias, expansion in title_aliases.items())
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._fuzzy_keys = [key for key in self.skills if len(key) >= 4]
+
+        # Per-string caches: the same raw skills and titles recur across profiles
+        self._skill = lru_cache(maxsize=cache_size)(self._normalize_skill)
+        self.normalize_title = lru_cache(maxsize=cache_size)(self._normalize_title)
+        self.fuzzy_lookup = lru_cache(maxsize=cache_size)(self._fuzzy_lookup)
+
+    # ---- Skills ----
+    def _lookup(self, text: str) -> Optional[str]:
+        key = normalize_key(text)
+        canonical = self.skills.get(key)
+        if canonical is None and ("(" in key or "[" in key):
+            # "JavaScript (ES6)" -> "javascript"
+            canonical = self.skills.get(normalize_key(_PARENTHETICAL.sub(" ", key)))
+        return canonical
+
+    def _scan(self, text: str) -> Optional[List[str]]:
+        """Split a part into known skills, if it consists of nothing else ("Python Django")."""
+        words = _WORD.findall(_PARENTHETICAL.sub(" ", text.lower()))
+        found, i = [], 0
+        while i < len(words):
+            end, canonical = _longest_match(self.skill_trie, words, i)
+            if canonical is not None:
+                found.append(canonical)
+                i = end
+            elif words[i] in _JOINER_WORDS:
+                i += 1
+            else:
+                return None
+        return found or None
+
+    def _fuzzy_lookup(self, key: str) -> Optional[str]:
+        if len(key) < 5:
+            return None
+        matches = difflib.get_close_matches(key, self._fuzzy_keys, n=1, cutoff=self.fuzzy_cutoff)
+        return self.skills[matches[0]] if matches else None
+
+    def _normalize_part(self, text: str, fuzzy: bool) -> Tuple[str, ...]:
+        canonical = self._lookup(text)
+        if canonical:
+            return (canonical,)
+        # "Python / Django", "AWS and GCP": split only if every piece is a known skill
+        pieces = [piece for piece in _JOINERS.split(text) if piece]
+        if len(pieces) > 1:
+            known = [self._lookup(piece) for piece in pieces]
+            if all(known):
+                return tuple(known)
+        scanned = self._scan(text)
+        if scanned:
+            return tuple(scanned)
+        canonical = self.fuzzy_lookup(normalize_key(text)) if fuzzy else None
+        return (canonical or text,)
+
+    def _normalize_skill(self, raw: str, fuzzy: bool) -> Tuple[str, ...]:
+        text = " ".join(raw.split())
+        if not text:
+            return ()
+        canonical = self._lookup(text)
+        if canonical:
+            return (canonical,)
+        # Comma/semicolon separated lists are always split
+        results: List[str] = []
+        for part in _LIST_SEPARATORS.split(text):
+            if part:
+                results.extend(self._normalize_part(part, fuzzy))
+        return tuple(results)
+
+    def normalize_skill(self, raw: str, fuzzy: bool = False) -> Tuple[str, ...]:
+        """Canonical skill(s) for one raw entry; compound entries may yield several."""
+        return self._skill(raw, fuzzy)
+
+    def normalize_skills(self, skills: Iterable[str], fuzzy: bool = False) -> List[str]:
+        """Normalize a skill list, dropping duplicates (case-insensitive) while keeping order."""
+        seen = set()
+        result = []
+        for raw in skills:
+            for skill in self._skill(raw, fuzzy):
+                key = skill.lower()
+                if key not in seen:
+                    seen.add(key)
+                    result.append(skill)
+        return result
+
+    # ---- Titles ----
+    def _normalize_title(self, raw: str) -> str:
+        """Expand abbreviations word by word ("Sr. SWE" -> "Senior Software Engineer")."""
+        tokens = [token for token in _TITLE_TOKEN.split(raw.strip()) if token]
+        # Word tokens with their index in ``tokens``; separators stay in place
+        positions = [i for i, token in enumerate(tokens) if not token.isspace() and not _TITLE_TOKEN.fullmatch(token)]
+        words = [normalize_key(tokens[i]) for i in positions]
+
+        output = list(tokens)
+        i = 0
+        while i < len(words):
+            end, expansion = _longest_match(self.title_trie, words, i)
+            if expansion is None:
+                i += 1
+                continue
+            first, last = positions[i], positions[end - 1]
+            output[first] = expansion
+            for j in range(first + 1, last + 1):
+                output[j] = ""
+            i = end
+        return " ".join("".join(output).split())
+
+    # ---- Profiles ----
+    def normalize_profile(self, data: Dict[str, Any], fuzzy: bool = False) -> Dict[str, Any]:
+        """Return a copy of a profile dict with normalized skills and experience titles."""
+        normalized = dict(data)
+        normalized["skills"] = self.normalize_skills(data.get("skills") or [], fuzzy)
+        normalized["experience"] = [
+            {**exp, "title": self.normalize_title(exp["title"])} if exp.get("title") else exp
+            for exp in data.get("experience") or []
+        ]
+        return normalized
+
+
+@lru_cache()
+def get_normalizer() -> Normalizer:
+    """The process-wide normalizer, compiled once from the built-in alias tables."""
+    return Normalizer()
+
+
+def normalize_profiles(profiles: Iterable[Dict[str, Any]], fuzzy: bool = False) -> Iterator[Dict[str, Any]]:
+    """Normalize many profile dicts, sharing the compiled tables and caches."""
+    normalizer = get_normalizer()
+    for data in profiles:
+        yield normalizer.normalize_profile(data, fuzzy)
+
+
+def normalize_linkedin_profile(profile, fuzzy: bool = False):
+    """Normalize a `LinkedInProfile` (or any pydantic model of the same shape)."""
+    data = get_normalizer().normalize_profile(profile.model_dump(), fuzzy)
+    return type(profile).model_validate(data)
+
+
+def search_skills(skills: Iterable[str]) -> List[str]:
+    """Skills as written, followed by canonical spellings not already among them: index and match keys."""
+    written = [skill for skill in skills if skill]
+    seen = {skill.lower() for skill in written}
+    return written + [skill for skill in get_normalizer().normalize_skills(written) if skill.lower() not in seen]
+
+
+def search_title(title: str) -> str:
+    """A title as written, plus its expanded form on a second line when that differs."""
+    expanded = get_normalizer().normalize_title(title)
+    return title if normalize_key(expanded) == normalize_key(title) else f"{title}\n{expanded}"
@@ -1,12 +1,16 @@
-from openai import OpenAI, OpenAIError, APIError, APIConnectionError, RateLimitError
-from typing import List, Dict, Any
+from openai import OpenAI, AsyncOpenAI, OpenAIError, APIError, RateLimitError
+from openai import APIConnectionError as OpenAIConnectionError
+from typing import List, Dict, Any, Optional, AsyncIterator
 from app.models.chat import ChatMessage, ChatResponse, ToolCall
 from app.core.config import get_settings
 from app.tools.linkedin_tools import LINKEDIN_TOOLS
+from app.services.rate_limit_service import get_scheduler, estimate_tokens, PRIORITY_INTERACTIVE
 import json
 
 settings = get_settings()
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# Retries are handled by the shared scheduler, which also tracks rate-limit budgets
+client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
 
 class ChatError(Exception):
     """Base class for chat-related errors"""
@@ -24,19 +28,8 @@ class RateLimitExceededError(ChatError):
     """Raised when rate limit is exceeded"""
     pass
 
-async def get_chat_completion(messages: List[ChatMessage]) -> ChatResponse:
-    """
-    Get a chat completion from OpenAI using the latest model and methods.
-    Uses the new developer role and function calling features from December 2024.
-    """
-    try:
-        # Convert messages to OpenAI format
-        openai_messages = []
-        
-        # Add developer message first (new role type as of December 2024)
-        openai_messages.append({
-            "role": "developer",
-            "content": """You are a helpful LinkedIn Profile Assistant that helps users extract and convert their LinkedIn profiles.
+# Developer prompt (new role type as of December 2024)
+DEVELOPER_PROMPT = """You are a helpful LinkedIn Profile Assistant that helps users extract and convert their LinkedIn profiles.
 
 Your main capabilities:
 1. Guide users through providing their LinkedIn credentials safely
@@ -60,34 +53,75 @@ After tool execution:
 - If the tool succeeded, explain what was extracted/processed
 - If there were any issues, explain what went wrong
 - Ask if the user needs anything else"""
-        })
-        
-        # Add the rest of the messages
-        for msg in messages:
-            message_dict = {"role": msg.role, "content": msg.content}
-            if msg.tool_call_id:  # For tool response messages
-                message_dict["tool_call_id"] = msg.tool_call_id
-                message_dict["name"] = msg.name  # Add function name for tool messages
-            if msg.tool_calls:  # For assistant messages with tool calls
-                message_dict["tool_calls"] = [
-                    {
-                        "id": tool.id,
-                        "type": tool.type,
-                        "function": {
-                            "name": tool.function["name"],
-                            "arguments": tool.function["arguments"]
-                        }
-                    } for tool in msg.tool_calls
-                ]
-            openai_messages.append(message_dict)
+
+# Built once at import so every request starts with a byte-identical prefix
+# (developer prompt, then the same tool schema object). Provider-side prompt
+# caching matches on exact prefixes, so nothing per-request may go in here.
+PROMPT_PREFIX = ({"role": "developer", "content": DEVELOPER_PROMPT},)
+TOOLS = LINKEDIN_TOOLS
+
+# Running totals of prompt-cache usage across completions
+prompt_cache_stats = {"completions": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+def to_openai_message(msg: ChatMessage) -> Dict[str, Any]:
+    """Convert a ChatMessage to the OpenAI message format, with a stable key order."""
+    message_dict = {"role": msg.role, "content": msg.content}
+    if msg.tool_call_id:  # For tool response messages
+        message_dict["tool_call_id"] = msg.tool_call_id
+        message_dict["name"] = msg.name  # Add function name for tool messages
+    if msg.tool_calls:  # For assistant messages with tool calls
+        message_dict["tool_calls"] = [
+            {
+                "id": tool.id,
+                "type": tool.type,
+                "function": {
+                    "name": tool.function["name"],
+                    "arguments": tool.function["arguments"]
+                }
+            } for tool in msg.tool_calls
+        ]
+    return message_dict
+
+def build_openai_messages(messages: List[ChatMessage]) -> List[Dict[str, Any]]:
+    """Precomputed prefix followed by the conversation history."""
+    return [*PROMPT_PREFIX, *(to_openai_message(msg) for msg in messages)]
+
+def usage_summary(usage) -> Optional[Dict[str, int]]:
+    """Token usage of a completion, including prompt tokens served from the provider cache."""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    prompt_cache_stats["completions"] += 1
+    prompt_cache_stats["prompt_tokens"] += usage.prompt_tokens
+    prompt_cache_stats["cached_tokens"] += cached_tokens
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": cached_tokens,
+    }
+
+async def get_chat_completion(messages: List[ChatMessage]) -> ChatResponse:
+    """
+    Get a chat completion from OpenAI using the latest model and methods.
+    Uses the new developer role and function calling features from December 2024.
+    """
+    try:
+        # Convert messages to OpenAI format behind the cached prompt prefix
+        openai_messages = build_openai_messages(messages)
             
         try:
-            # Call OpenAI with the latest model and features
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=openai_messages,
-                tools=LINKEDIN_TOOLS,
-                tool_choice="auto"  # Let the model decide when to use tools
+            # Call OpenAI with the latest model and features. Interactive chat is
+            # queued ahead of background work and retried with backoff on 429s.
+            response = await get_scheduler().acall(
+                lambda: client.chat.completions.with_raw_response.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=openai_messages,
+                    tools=TOOLS,
+                    tool_choice="auto"  # Let the model decide when to use tools
+                ),
+                priority=PRIORITY_INTERACTIVE,
+                estimated_tokens=estimate_tokens(openai_messages)
             )
             
             # Extract the assistant's message
@@ -108,29 +142,69 @@ After tool execution:
                     for tool in assistant_message.tool_calls
                 ]
             
+            usage = usage_summary(response.usage)
+            if usage:
+                print(f"Completion usage: {usage['prompt_tokens']} prompt tokens "
+                      f"({usage['cached_tokens']} cached), {usage['completion_tokens']} completion tokens")
+            
             # Create and return ChatResponse
             return ChatResponse(
                 message=ChatMessage(
                     role="assistant",
                     content=assistant_message.content if assistant_message.content else "",
                     tool_calls=tool_calls
-                )
+                ),
+                usage=usage
             )
             
+        except RateLimitError as e:
+            # Only reached once the scheduler has exhausted its retries
+            raise RateLimitExceededError(f"Rate limit exceeded: {e}")
+            
+        except OpenAIConnectionError as e:
+            raise APIConnectionError(f"Failed to connect to OpenAI API: {e}")
+            
         except APIError as e:
             if "model not found" in str(e).lower():
                 raise ModelNotAvailableError(f"Model {settings.OPENAI_MODEL} is not available. Error: {e}")
             raise ChatError(f"OpenAI API error: {e}")
             
-        except APIConnectionError as e:
-            raise APIConnectionError(f"Failed to connect to OpenAI API: {e}")
-            
-        except RateLimitError as e:
-            raise RateLimitExceededError(f"Rate limit exceeded: {e}")
-            
         except Exception as e:
             raise ChatError(f"Unexpected error during chat completion: {e}")
         
+    except ChatError:
+        raise
     except Exception as e:
         # Log the error in production
-        raise ChatError(f"Chat service error: {str(e)}") 
\ No newline at end of file
+        raise ChatError(f"Chat service error: {str(e)}")
+
+async def stream_chat_completion(messages: List[ChatMessage]) -> AsyncIterator[str]:
+    """
+    Stream the text of a chat completion as it is generated.
+    Tools are still sent (keeping the cached prompt prefix intact) but cannot be called.
+    """
+    openai_messages = build_openai_messages(messages)
+    try:
+        async with get_scheduler().aslot(PRIORITY_INTERACTIVE, estimate_tokens(openai_messages)):
+            stream = await async_client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=openai_messages,
+                tools=TOOLS,
+                tool_choice="none",
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                if chunk.usage:
+                    usage_summary(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+    except RateLimitError as e:
+        raise RateLimitExceededError(f"Rate limit exceeded: {e}")
+    except OpenAIConnectionError as e:
+        raise APIConnectionError(f"Failed to connect to OpenAI API: {e}")
+    except ChatError:
+        raise
+    except Exception as e:
+        raise ChatError(f"Streaming chat error: {str(e)}")
@@ -0,0 +1,205 @@
+"""
+Single-round-trip extraction of a LinkedIn profile page.
+
+Instead of locating "see more" buttons, clicking them one WebDriver call at a
+time and reading `document.body.innerText` at the end, one asynchronous
+script is injected that, inside the page:
+
+1. waits until the profile stops changing (no text or element changes under
+   `main` for ``quiet_ms``, and at most ``quiet_max_ms`` per wait, since live
+   widgets such as the messaging overlay or presence badges never go quiet),
+2. clicks every expander it finds, then waits for quiescence again, for a
+   few rounds (expanding a section can reveal more buttons),
+3. returns the page as section-keyed JSON: for every profile section, its
+   heading, its text and its list items, plus the top card.
+
+Screen-reader duplicates of visible text and button labels are dropped.
+sections_to_text turns the result into headed plain text, so the structuring
+stage receives input that is already split by section.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+# "see more" links, truncated text, and collapsed sub-lists
+EXPAND_SELECTORS = [
+    ".inline-show-more-text__button",
+    "button.lt-line-clamp__more",
+    "button.pv-profile-section__see-more-inline",
+    "button.pvs-list__footer-button[aria-expanded='false']",
+    "button[aria-expanded='false'][aria-label*='see more' i]",
+]
+QUIET_MS = 400
+QUIET_MAX_MS = 2500  # Longest single wait for quiescence
+TIMEOUT_SECONDS = 20.0
+MAX_EXPAND_ROUNDS = 5
+
+EXTRACTION_SCRIPT = r"""
+const options = arguments[0] || {};
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+const quietMs = options.quietMs;
+const quietMaxMs = options.quietMaxMs;
+const deadline = started + options.timeoutMs;
+const stats = {clicked: 0, rounds: 0, mutations: 0, quietCapped: 0, timedOut: false};
+const NOISE = /^(…?\s*see (more|less)|show (all|more|less)\b.*|…more|see all|edit|follow|message|connect|more|\d+ of \d+|visible to anyone.*)$/i;
+
+function waitForQuiet() {
+  return new Promise(resolve => {
+    let quietTimer = null;
+    let hardTimer = null;
+    const observer = new MutationObserver(records => {
+      stats.mutations += records.length;
+      clearTimeout(quietTimer);
+      quietTimer = setTimeout(finish, quietMs);
+    });
+    function finish(capped) {
+      observer.disconnect();
+      clearTimeout(quietTimer);
+      clearTimeout(hardTimer);
+      if (capped === true) {
+        stats.quietCapped++;
+        if (Date.now() >= deadline) stats.timedOut = true;
+      }
+      resolve();
+    }
+    // Attribute changes (animations, hover and focus state) are not content
+    observer.observe(document.querySelector('main') || document.body,
+      {childList: true, subtree: true, characterData: true});
+    quietTimer = setTimeout(finish, quietMs);
+    hardTimer = setTimeout(() => finish(true), Math.max(0, Math.min(quietMaxMs, deadline - Date.now())));
+  });
+}
+
+function expand() {
+  let clicked = 0;
+  for (const selector of options.expandSelectors) {
+    for (const button of document.querySelectorAll(selector)) {
+      // Toggles collapse again on a second click
+      if (button.dataset.ltrExpanded || button.getAttribute('aria-expanded') === 'true') continue;
+      button.dataset.ltrExpanded = '1';
+      try { button.click(); clicked++; } catch (e) {}
+    }
+  }
+  return clicked;
+}
+
+function cleanLines(text) {
+  const lines = [];
+  for (let line of (text || '').split('\n')) {
+    line = line.replace(/\s+/g, ' ').trim();
+    // Visible text is followed by a visually hidden copy for screen readers
+    if (!line || NOISE.test(line) || line === lines[lines.length - 1]) continue;
+    lines.push(line);
+  }
+  return lines;
+}
+
+function textOf(element) {
+  return cleanLines(element.innerText).join('\n');
+}
+
+function outermost(elements, tag) {
+  return elements.filter(element => !element.parentElement.closest(tag) ||
+    !elements.includes(element.parentElement.closest(tag)));
+}
+
+function slug(text) {
+  return text.toLowerCase().replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '') || 'section';
+}
+
+function extract() {
+  const root = document.querySelector('main') || document.body;
+  const sections = {};
+  function add(name, entry) {
+    let key = name;
+    for (let n = 2; key in sections; n++) key = `${name}_${n}`;
+    sections[key] = entry;
+  }
+  for (const section of outermost(Array.from(root.querySelectorAll('section')), 'section')) {
+    const heading = section.querySelector('h1, h2');
+    const headingText = heading ? (cleanLines(heading.innerText)[0] || '') : '';
+    const anchor = section.querySelector(':scope > div[id]');
+    const topCard = Boolean(section.querySelector('h1'));
+    const name = topCard ? 'top_card' : anchor ? anchor.id : slug(headingText);
+    const lines = cleanLines(section.innerText);
+    // The top card's heading is the member's name, which stays part of its text
+    if (!topCard && headingText && lines[0] === headingText) lines.shift();
+    if (!lines.length) continue;
+    const items = outermost(Array.from(section.querySelectorAll('li')), 'li')
+      .map(textOf).filter(text => text);
+    add(name, {heading: headingText, text: lines.join('\n'), items: items});
+  }
+  const result = {url: location.href, title: document.title, sections: sections, stats: stats};
+  if (!Object.keys(sections).length) result.text = textOf(document.body);
+  return result;
+}
+
+(async () => {
+  try {
+    await waitForQuiet();
+    while (stats.rounds < options.maxRounds && Date.now() < deadline) {
+      const clicked = expand();
+      if (!clicked) break;
+      stats.clicked += clicked;
+      stats.rounds++;
+      await waitForQuiet();
+    }
+    stats.waitedMs = Date.now() - started;
+    done(extract());
+  } catch (e) {
+    done({error: String(e && e.stack || e)});
+  }
+})();
+"""
+
+
+class PageExtractionError(Exception):
+    """Raised when the in-page extraction script fails"""
+    pass
+
+
+def extract_profile_sections(driver, quiet_ms: int = QUIET_MS, timeout: float = TIMEOUT_SECONDS,
+                             expand_selectors: Optional[List[str]] = None,
+                             quiet_max_ms: int = QUIET_MAX_MS) -> Dict[str, Any]:
+    """
+    Expand and extract the loaded profile page in one WebDriver call. Returns
+    {"url", "title", "sections": {name: {"heading", "text", "items"}}, "stats"}
+    (plus "text" with the whole page when no sections were found).
+    """
+    # Leave the script its own deadline before WebDriver gives up on it
+    driver.set_script_timeout(timeout + 10)
+    result = driver.execute_async_script(EXTRACTION_SCRIPT, {
+        "quietMs": quiet_ms,
+        "quietMaxMs": quiet_max_ms,
+        "timeoutMs": int(timeout * 1000),
+        "maxRounds": MAX_EXPAND_ROUNDS,
+        "expandSelectors": expand_selectors or EXPAND_SELECTORS,
+    })
+    if not isinstance(result, dict) or "error" in result:
+        raise PageExtractionError((result or {}).get("error", "No result from the extraction script"))
+    return result
+
+
+def sections_to_text(result: Dict[str, Any]) -> str:
+    """
+    Headed plain text of an extraction result: the top card first, then
+    "## Heading" and the section's items (or text) for every section.
+    """
+    sections = result.get("sections") or {}
+    if not sections:
+        return result.get("text", "")
+    parts = []
+    for name, section in sections.items():
+        if name == "top_card":
+            parts.append(section["text"])
+            continue
+        heading = section.get("heading") or name.replace("_", " ").title()
+        body = "\n\n".join(section["items"]) if section.get("items") else section["text"]
+        parts.append(f"## {heading}\n{body}")
+    return "\n\n".join(parts)
+
+
+def save_sections(result: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,307 @@
+"""
+TrueType fonts for the PDF renderer.
+
+The standard PDF fonts only cover WinAnsi. For text outside it (Polish,
+Turkish, Greek, Cyrillic, CJK names, ...), a TrueType font is embedded as a
+CIDFontType2 with Identity-H encoding:
+
+- `TrueTypeFont` parses the tables the PDF needs (character map, advance
+  widths, glyph outlines, vertical metrics) once per font file,
+- only the glyphs a document uses are kept (plus the components of composite
+  glyphs); glyph ids are preserved, so text is written as 2-byte glyph ids,
+- a ToUnicode CMap maps the glyph ids back to characters, so text in the PDF
+  can still be searched and copied.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Tables copied into the embedded subset (glyf, loca and head are rewritten)
+_SUBSET_TABLES = ("head", "hhea", "maxp", "hmtx", "loca", "glyf", "cvt ", "fpgm", "prep")
+
+# Composite glyph component flags
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+class FontError(Exception):
+    """Raised for font files that cannot be read or may not be embedded"""
+    pass
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+class TrueTypeFont:
+    """The parts of a TrueType font needed to measure text and embed a subset."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.path = path
+        try:
+            self._parse()
+        except (struct.error, KeyError, IndexError) as e:
+            raise FontError(f"Not a usable TrueType font: {path} ({e})")
+
+    def _parse(self) -> None:
+        data = self.data
+        if data[:4] not in (b"\x00\x01\x00\x00", b"true"):
+            raise FontError(f"Not a TrueType font (CFF outlines and collections are not supported): {self.path}")
+        num_tables = struct.unpack_from(">H", data, 4)[0]
+        self.tables: Dict[str, bytes] = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+            self.tables[tag.decode("latin-1")] = data[offset:offset + length]
+
+        head = self.tables["head"]
+        self.units_per_em = struct.unpack_from(">H", head, 18)[0]
+        self.bbox = struct.unpack_from(">4h", head, 36)
+        self.long_loca = struct.unpack_from(">h", head, 50)[0] == 1
+        hhea = self.tables["hhea"]
+        self.ascent, self.descent = struct.unpack_from(">hh", hhea, 4)
+        num_hmetrics = struct.unpack_from(">H", hhea, 34)[0]
+        self.num_glyphs = struct.unpack_from(">H", self.tables["maxp"], 4)[0]
+
+        hmtx = self.tables["hmtx"]
+        # Long metrics are (advance, left side bearing) pairs; later glyphs repeat the last advance
+        advances = list(struct.unpack_from(f">{2 * num_hmetrics}H", hmtx)[0::2])
+        advances.extend([advances[-1]] * (self.num_glyphs - num_hmetrics))
+        self.advances = advances
+
+        loca = self.tables["loca"]
+        count = self.num_glyphs + 1
+        if self.long_loca:
+            self.loca = list(struct.unpack_from(f">{count}I", loca))
+        else:
+            self.loca = [offset * 2 for offset in struct.unpack_from(f">{count}H", loca)]
+
+        os2 = self.tables.get("OS/2")
+        self.cap_height = self.ascent
+        self.embedding_restricted = False
+        if os2 is not None:
+            fs_type = struct.unpack_from(">H", os2, 8)[0]
+            # Restricted license embedding: bit 1 set and none of the permissive bits
+            self.embedding_restricted = fs_type & 0x000F == 0x0002
+            if struct.unpack_from(">H", os2, 0)[0] >= 2 and len(os2) >= 90:
+                self.cap_height = struct.unpack_from(">h", os2, 88)[0]
+        post = self.tables.get("post")
+        self.italic_angle = struct.unpack_from(">i", post, 4)[0] / 65536.0 if post else 0.0
+        self.cmap = self._parse_cmap(self.tables["cmap"])
+        self.name = self._postscript_name()
+
+    @staticmethod
+    def _parse_cmap(cmap: bytes) -> Dict[int, int]:
+        """Code point -> glyph id, from the best Unicode subtable (format 12, else format 4)."""
+        subtables = {}
+        for i in range(struct.unpack_from(">H", cmap, 2)[0]):
+            platform, encoding, offset = struct.unpack_from(">HHI", cmap, 4 + 8 * i)
+            subtables[(platform, encoding)] = offset
+        for key in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            fmt = struct.unpack_from(">H", cmap, offset)[0]
+            mapping: Dict[int, int] = {}
+            if fmt == 12:
+                groups = struct.unpack_from(">I", cmap, offset + 12)[0]
+                for g in range(groups):
+                    start, end, glyph = struct.unpack_from(">III", cmap, offset + 16 + 12 * g)
+                    for code in range(start, end + 1):
+                        mapping[code] = glyph + code - start
+                return mapping
+            if fmt == 4:
+                segments = struct.unpack_from(">H", cmap, offset + 6)[0] // 2
+                ends = struct.unpack_from(f">{segments}H", cmap, offset + 14)
+                starts = struct.unpack_from(f">{segments}H", cmap, offset + 16 + 2 * segments)
+                deltas = struct.unpack_from(f">{segments}h", cmap, offset + 16 + 4 * segments)
+                range_base = offset + 16 + 6 * segments
+                range_offsets = struct.unpack_from(f">{segments}H", cmap, range_base)
+                for s in range(segments):
+                    for code in range(starts[s], ends[s] + 1):
+                        if code == 0xFFFF:
+                            continue
+                        if range_offsets[s] == 0:
+                            glyph = (code + deltas[s]) & 0xFFFF
+                        else:
+                            address = range_base + 2 * s + range_offsets[s] + 2 * (code - starts[s])
+                            glyph = struct.unpack_from(">H", cmap, address)[0]
+                            glyph = (glyph + deltas[s]) & 0xFFFF if glyph else 0
+                        if glyph:
+                            mapping[code] = glyph
+                return mapping
+        raise FontError("The font has no Unicode character map")
+
+    def _postscript_name(self) -> str:
+        name = self.tables.get("name")
+        if name is not None:
+            count, string_offset = struct.unpack_from(">HH", name, 2)
+            for i in range(count):
+                platform, encoding, _, name_id, length, offset = struct.unpack_from(">6H", name, 6 + 12 * i)
+                if name_id != 6:
+                    continue
+                raw = name[string_offset + offset:string_offset + offset + length]
+                text = raw.decode("utf-16-be" if platform in (0, 3) else "latin-1", errors="ignore")
+                text = "".join(char for char in text if char.isalnum() or char in "-_")
+                if text:
+                    return text
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        return "".join(char for char in stem if char.isalnum() or char in "-_") or "Font"
+
+    def width(self, glyph: int) -> int:
+        """Advance width of a glyph in 1/1000 em."""
+        return round(self.advances[glyph] * 1000 / self.units_per_em)
+
+    # ---- Subsetting ----
+    def _glyph(self, glyph: int) -> bytes:
+        return self.tables["glyf"][self.loca[glyph]:self.loca[glyph + 1]]
+
+    def _with_components(self, glyphs: Iterable[int]) -> List[int]:
+        keep = {0}
+        pending = list(glyphs)
+        while pending:
+            glyph = pending.pop()
+            if glyph in keep or glyph >= self.num_glyphs:
+                continue
+            keep.add(glyph)
+            data = self._glyph(glyph)
+            if len(data) < 10 or struct.unpack_from(">h", data, 0)[0] >= 0:
+                continue
+            position = 10
+            while True:
+                flags, component = struct.unpack_from(">HH", data, position)
+                pending.append(component)
+                position += 4 + (4 if flags & _ARG_1_AND_2_ARE_WORDS else 2)
+                if flags & _WE_HAVE_A_SCALE:
+                    position += 2
+                elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+                    position += 4
+                elif flags & _WE_HAVE_A_TWO_BY_TWO:
+                    position += 8
+                if not flags & _MORE_COMPONENTS:
+                    break
+        return sorted(keep)
+
+    def subset(self, glyphs: Iterable[int]) -> bytes:
+        """
+        A font file with only ``glyphs`` (and what they reference) left in the
+        glyph table. Glyph ids are unchanged; other glyphs become empty.
+        """
+        keep = set(self._with_components(glyphs))
+        glyf = bytearray()
+        loca = []
+        for glyph in range(self.num_glyphs):
+            loca.append(len(glyf))
+            if glyph in keep:
+                glyf += self._glyph(glyph)
+                glyf += b"\0" * (-len(glyf) % 4)
+        loca.append(len(glyf))
+
+        tables = dict(self.tables)
+        tables["glyf"] = bytes(glyf)
+        tables["loca"] = struct.pack(f">{len(loca)}I", *loca)
+        head = bytearray(self.tables["head"])
+        head[8:12] = b"\0\0\0\0"               # checkSumAdjustment, set below
+        head[50:52] = struct.pack(">h", 1)     # Long loca offsets
+        tables["head"] = bytes(head)
+        tags = [tag for tag in _SUBSET_TABLES if tag in tables]
+
+        # Offset table, table records, then the tables, each 4-byte aligned
+        search_range = 1
+        entry_selector = 0
+        while search_range * 2 <= len(tags):
+            search_range *= 2
+            entry_selector += 1
+        header = struct.pack(">IHHHH", 0x00010000, len(tags), search_range * 16, entry_selector,
+                             len(tags) * 16 - search_range * 16)
+        offset = len(header) + 16 * len(tags)
+        records, bodies = [], []
+        for tag in sorted(tags):
+            body = tables[tag]
+            records.append(struct.pack(">4sIII", tag.encode("latin-1"), _checksum(body), offset, len(body)))
+            padded = body + b"\0" * (-len(body) % 4)
+            bodies.append(padded)
+            offset += len(padded)
+        font = bytearray(header + b"".join(records) + b"".join(bodies))
+        head_offset = struct.unpack_from(">I", records[sorted(tags).index("head")], 8)[0]
+        font[head_offset + 8:head_offset + 12] = struct.pack(">I", (0xB1B0AFBA - _checksum(bytes(font))) & 0xFFFFFFFF)
+        return bytes(font)
+
+
+@lru_cache(maxsize=8)
+def load_font(path: str) -> TrueTypeFont:
+    """Parse a TrueType font once per process."""
+    font = TrueTypeFont(path)
+    if font.embedding_restricted:
+        raise FontError(f"The font's license does not allow embedding: {path}")
+    return font
+
+
+# ------------------------------
+# PDF objects
+# ------------------------------
+def _to_unicode_cmap(glyph_chars: Dict[int, str]) -> bytes:
+    entries = sorted(glyph_chars.items())
+    lines = [
+        "/CIDInit /ProcSet findresource begin",
+        "12 dict begin",
+        "begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def",
+        "/CMapType 2 def",
+        "1 begincodespacerange",
+        "<0000> <FFFF>",
+        "endcodespacerange",
+    ]
+    for start in range(0, len(entries), 100):
+        chunk = entries[start:start + 100]
+        lines.append(f"{len(chunk)} beginbfchar")
+        lines.extend(f"<{glyph:04X}> <{char.encode('utf-16-be').hex().upper()}>" for glyph, char in chunk)
+        lines.append("endbfchar")
+    lines.extend(["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"])
+    return "\n".join(lines).encode("ascii")
+
+
+def _stream(data: bytes, extra: str = "") -> bytes:
+    compressed = zlib.compress(data, 6)
+    return (f"<< /Length {len(compressed)} /Filter /FlateDecode{extra} >>\nstream\n".encode("ascii")
+            + compressed + b"\nendstream")
+
+
+def font_objects(font: TrueTypeFont, glyph_chars: Dict[int, str], first_id: int) -> List[bytes]:
+    """
+    PDF objects embedding a subset of ``font`` with the used glyphs (glyph id
+    -> character), numbered from ``first_id``; the first one is the Type0 font
+    to reference from page resources.
+    """
+    glyphs = sorted(glyph_chars)
+    tag = "".join(chr(65 + byte % 26) for byte in hashlib.sha1(repr(glyphs).encode("ascii")).digest()[:6])
+    base_font = f"{tag}+{font.name}"
+    scale = 1000 / font.units_per_em
+    bbox = " ".join(str(round(value * scale)) for value in font.bbox)
+    widths = " ".join(f"{glyph} [{font.width(glyph)}]" for glyph in glyphs)
+    file_data = font.subset(glyphs)
+    cid, descriptor, font_file, to_unicode = first_id + 1, first_id + 2, first_id + 3, first_id + 4
+    flags = 4 | (64 if font.italic_angle else 0)  # Symbolic (glyphs outside the standard Latin set), italic
+    return [
+        (f"<< /Type /Font /Subtype /Type0 /BaseFont /{base_font} /Encoding /Identity-H "
+         f"/DescendantFonts [{cid} 0 R] /ToUnicode {to_unicode} 0 R >>").encode("ascii"),
+        (f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{base_font} "
+         f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+         f"/FontDescriptor {descriptor} 0 R /DW 1000 /W [{widths}] /CIDToGIDMap /Identity >>").encode("ascii"),
+        (f"<< /Type /FontDescriptor /FontName /{base_font} /Flags {flags} /FontBBox [{bbox}] "
+         f"/ItalicAngle {font.italic_angle:g} /Ascent {round(font.ascent * scale)} "
+         f"/Descent {round(font.descent * scale)} /CapHeight {round(font.cap_height * scale)} "
+         f"/StemV 80 /FontFile2 {font_file} 0 R >>").encode("ascii"),
+        _stream(file_data, f" /Length1 {len(file_data)}"),
+        _stream(_to_unicode_cmap(glyph_chars)),
+    ]
@@ -0,0 +1,631 @@
+"""
+Pure-Python PDF export of structured profiles.
+
+Profiles are laid out and written as PDF directly, without an office suite or
+any third-party package, so it works offline on any server:
+
+- text uses the standard Helvetica family (regular, bold, oblique), which
+  every PDF viewer provides, so no fonts are embedded for WinAnsi text; line
+  breaking uses the fonts' AFM character widths, compiled once into per-font
+  tables, with per-word widths cached,
+- the page chrome (accent bar and footer rule) is a Form XObject built once
+  per ResumeStyle and drawn on every page with a single operator,
+- page content streams are deflate-compressed.
+
+The standard fonts cover WinAnsi (Latin-1 plus typographic punctuation). A
+profile with other characters is laid out again with ``unicode_font``, a
+TrueType font of which the used glyphs are embedded (see pdf_font_service);
+bold and italic are synthesized from it. Without one, or for characters the
+font lacks, PdfUnicodeError is raised rather than printing "?".
+
+Export many stored profiles on a process pool with:
+    python -m app.services.pdf_render_service --output-dir output/pdf [--workers N]
+"""
+
+import argparse
+import codecs
+import os
+import struct
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.docx_theme_service import ResumeStyle
+from app.services.pdf_font_service import TrueTypeFont, font_objects, load_font
+from app.services.profile_render_service import profile_to_dict
+
+# Bumped whenever the PDF output changes; part of PDF download URLs and ETags
+PDF_RENDER_VERSION = "2"
+
+PAGE_WIDTH = 612.0   # US Letter, in points
+PAGE_HEIGHT = 792.0
+LEADING = 1.2        # Line height as a multiple of the font size, before ResumeStyle.line_spacing
+
+FONT_REGULAR = "F1"
+FONT_BOLD = "F2"
+FONT_ITALIC = "F3"
+BASE_FONTS = {FONT_REGULAR: "Helvetica", FONT_BOLD: "Helvetica-Bold", FONT_ITALIC: "Helvetica-Oblique"}
+UNICODE_FONT = "U1"  # Resource name of the embedded TrueType font
+BOLD_STROKE = 0.03   # Synthesized bold: outline stroke width as a fraction of the font size
+ITALIC_SKEW = 0.21   # Synthesized italic: horizontal shear (about 12 degrees)
+
+# ------------------------------
+# 1. Font metrics
+# ------------------------------
+# AFM advance widths (1/1000 em) of printable ASCII, codes 32-126, in WinAnsi order
+_ASCII_WIDTHS = {
+    "Helvetica": (
+        "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 "
+        "556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 "
+        "1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 "
+        "333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 "
+        "556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+    ),
+    "Helvetica-Bold": (
+        "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 "
+        "556 556 556 556 556 556 556 556 556 556 333 333 584 584 584 611 "
+        "975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 333 278 333 584 556 "
+        "333 556 611 556 611 556 333 611 611 278 278 556 278 889 611 611 "
+        "611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+    ),
+}
+# Codes 128-191 and the non-letter codes of 192-255: (Helvetica, Helvetica-Bold)
+_HIGH_WIDTHS = {
+    128: (556, 556), 130: (222, 278), 131: (556, 556), 132: (333, 500), 133: (1000, 1000),
+    134: (556, 556), 135: (556, 556), 136: (333, 333), 137: (1000, 1000), 138: (667, 667),
+    139: (333, 333), 140: (1000, 1000), 142: (611, 611), 145: (222, 278), 146: (222, 278),
+    147: (333, 500), 148: (333, 500), 149: (350, 350), 150: (556, 556), 151: (1000, 1000),
+    152: (333, 333), 153: (1000, 1000), 154: (500, 556), 155: (333, 333), 156: (944, 944),
+    158: (500, 500), 159: (667, 667), 160: (278, 278), 161: (333, 333), 162: (556, 556),
+    163: (556, 556), 164: (556, 556), 165: (556, 556), 166: (260, 280), 167: (556, 556),
+    168: (333, 333), 169: (737, 737), 170: (370, 370), 171: (556, 556), 172: (584, 584),
+    173: (333, 333), 174: (737, 737), 175: (333, 333), 176: (400, 400), 177: (584, 584),
+    178: (333, 333), 179: (333, 333), 180: (333, 333), 181: (556, 611), 182: (537, 556),
+    183: (278, 278), 184: (333, 333), 185: (333, 333), 186: (365, 365), 187: (556, 556),
+    188: (834, 834), 189: (834, 834), 190: (834, 834), 191: (611, 611), 198: (1000, 1000),
+    208: (722, 722), 215: (584, 584), 216: (778, 778), 222: (667, 667), 223: (611, 611),
+    230: (889, 889), 240: (556, 611), 247: (584, 584), 248: (611, 611), 254: (556, 611),
+}
+# Substitutes for common characters outside WinAnsi
+_TRANSLITERATIONS = str.maketrans({
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2015": "\u2014", "\u2032": "'", "\u2033": '"',
+    "\u2212": "-", "\u2192": "->", "\u2190": "<-", "\u2265": ">=", "\u2264": "<=", "\u00a0": " ",
+    "\u200b": "", "\ufeff": "",
+})
+
+
+class PdfUnicodeError(Exception):
+    """Raised when a profile has characters the PDF fonts cannot show"""
+    pass
+
+
+def _unsupported(chars: Iterable[str], hint: str) -> PdfUnicodeError:
+    listed = ", ".join(f"{char!r} (U+{ord(char):04X})" for char in sorted(set(chars))[:10])
+    return PdfUnicodeError(f"Characters not covered by the PDF fonts: {listed}. {hint}")
+
+
+@lru_cache(maxsize=None)
+def font_widths(base_font: str) -> Tuple[int, ...]:
+    """Advance widths of all 256 WinAnsi codes for a standard font (oblique shares regular widths)."""
+    family = "Helvetica-Bold" if base_font == "Helvetica-Bold" else "Helvetica"
+    column = 1 if family == "Helvetica-Bold" else 0
+    widths = [0] * 256
+    for code, width in enumerate(_ASCII_WIDTHS[family].split(), start=32):
+        widths[code] = int(width)
+    for code in range(128, 256):
+        if code in _HIGH_WIDTHS:
+            widths[code] = _HIGH_WIDTHS[code][column]
+            continue
+        # Accented letters are as wide as their base letter
+        char = bytes([code]).decode("cp1252", errors="ignore")
+        base = unicodedata.normalize("NFD", char)[:1]
+        widths[code] = widths[ord(base)] if base and ord(base) < 128 else 556
+    return tuple(widths)
+
+
+def encode_text(text: str) -> bytes:
+    """
+    Encode text as WinAnsi (cp1252), composing accents and transliterating
+    typographic characters it lacks. Raises PdfUnicodeError for anything else.
+    """
+    try:
+        return text.encode("cp1252")
+    except UnicodeEncodeError:
+        pass
+    text = unicodedata.normalize("NFC", text).translate(_TRANSLITERATIONS)
+    try:
+        return text.encode("cp1252")
+    except UnicodeEncodeError:
+        missing = [char for char in text if not char.encode("cp1252", errors="ignore")]
+        raise _unsupported(missing, "Set PDF_UNICODE_FONT to a TrueType font that covers them.")
+
+
+class FontMetrics:
+    """Width lookups for one standard font, with a cache of measured words."""
+
+    unit = 1      # Bytes per character in encoded text
+    space = b" "
+
+    def __init__(self, base_font: str):
+        self.widths = font_widths(base_font)
+        self._word_widths: Dict[bytes, int] = {}
+
+    def words(self, text: str) -> List[bytes]:
+        """The encoded words of a line of text."""
+        return encode_text(text).split()
+
+    def width(self, encoded: bytes, size: float) -> float:
+        """Width of encoded text in points."""
+        units = self._word_widths.get(encoded)
+        if units is None:
+            widths = self.widths
+            units = sum(widths[byte] for byte in encoded)
+            if len(self._word_widths) < 100_000:
+                self._word_widths[encoded] = units
+        return units * size / 1000.0
+
+
+@lru_cache(maxsize=None)
+def get_font_metrics(font: str) -> FontMetrics:
+    return FontMetrics(BASE_FONTS[font])
+
+
+class EmbeddedFontMetrics(FontMetrics):
+    """
+    Encoding and widths for an embedded TrueType font: text is written as
+    2-byte glyph ids. Records the glyphs a document uses, so one instance
+    serves one document.
+    """
+
+    unit = 2
+
+    def __init__(self, font: TrueTypeFont):
+        self.font = font
+        self.used: Dict[int, str] = {}
+        self._word_widths: Dict[bytes, int] = {}
+        self.space = self.encode(" ")
+
+    def encode(self, text: str) -> bytes:
+        cmap = self.font.cmap
+        glyphs = []
+        missing = []
+        for char in text:
+            for written in (char if ord(char) in cmap else char.translate(_TRANSLITERATIONS)):
+                glyph = cmap.get(ord(written))
+                if glyph is None:
+                    missing.append(written)
+                    continue
+                glyphs.append(glyph)
+                self.used.setdefault(glyph, written)
+        if missing:
+            raise _unsupported(missing, f"The font {self.font.name} has no glyphs for them.")
+        return struct.pack(f">{len(glyphs)}H", *glyphs)
+
+    def words(self, text: str) -> List[bytes]:
+        return [self.encode(word) for word in unicodedata.normalize("NFC", text).split()]
+
+    def width(self, encoded: bytes, size: float) -> float:
+        units = self._word_widths.get(encoded)
+        if units is None:
+            width = self.font.width
+            units = sum(width(glyph) for glyph in struct.unpack(f">{len(encoded) // 2}H", encoded))
+            self._word_widths[encoded] = units
+        return units * size / 1000.0
+
+
+# ------------------------------
+# 2. Page template
+# ------------------------------
+def _color(rgb: Tuple[int, int, int]) -> str:
+    return " ".join(f"{channel / 255:.3f}" for channel in rgb)
+
+
+@lru_cache(maxsize=32)
+def _page_template(key: Tuple[Tuple[str, Any], ...]) -> bytes:
+    """Compressed Form XObject drawing the page chrome for a style (see page_template)."""
+    style = ResumeStyle(**dict(key))
+    margin = style.margins * 72
+    ops = (
+        f"q {_color(style.heading_color)} rg 0 {PAGE_HEIGHT - 6:.2f} {PAGE_WIDTH:.2f} 6 re f Q\n"
+        f"q 0.75 G 0.5 w {margin:.2f} {margin - 14:.2f} m {PAGE_WIDTH - margin:.2f} {margin - 14:.2f} l S Q\n"
+    ).encode("ascii")
+    stream = zlib.compress(ops)
+    header = (
+        f"<< /Type /XObject /Subtype /Form /BBox [0 0 {PAGE_WIDTH:.0f} {PAGE_HEIGHT:.0f}] "
+        f"/Resources << >> /Filter /FlateDecode /Length {len(stream)} >>\nstream\n"
+    ).encode("ascii")
+    return header + stream + b"\nendstream"
+
+
+def page_template(style: ResumeStyle) -> bytes:
+    """The page chrome object for ``style``, serialized once and reused by every page and document."""
+    return _page_template(tuple(sorted(style.model_dump().items())))
+
+
+# ------------------------------
+# 3. Layout
+# ------------------------------
+def _escape(encoded: bytes) -> bytes:
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r")
+
+
+class PdfLayout:
+    """
+    Flows paragraphs down pages, breaking lines by font metrics. With ``font``,
+    all text uses that embedded TrueType font instead of the standard fonts.
+    """
+
+    def __init__(self, style: ResumeStyle, font: Optional[TrueTypeFont] = None):
+        self.style = style
+        self.embedded = EmbeddedFontMetrics(font) if font is not None else None
+        self.margin = style.margins * 72
+        self.width = PAGE_WIDTH - 2 * self.margin
+        self.pages: List[List[bytes]] = []
+        self.y = 0.0
+        self._new_page()
+
+    def _new_page(self) -> None:
+        self.pages.append([b"/Tpl Do\n"])
+        self.y = PAGE_HEIGHT - self.margin
+
+    def _leading(self, size: float) -> float:
+        return size * LEADING * self.style.line_spacing
+
+    def _metrics(self, font: str) -> FontMetrics:
+        return self.embedded or get_font_metrics(font)
+
+    def _color_ops(self, color: Tuple[int, int, int]) -> bytes:
+        rgb = _color(color)
+        if self.embedded is None:
+            return f"{rgb} rg\n".encode("ascii")
+        # Synthesized bold also strokes the glyph outlines
+        return f"{rgb} rg {rgb} RG\n".encode("ascii")
+
+    def _show(self, font: str, size: float, x: float, y: float, encoded: bytes) -> bytes:
+        """Text object drawing one encoded line at (x, y)."""
+        text = _escape(encoded)
+        if self.embedded is None:
+            return b"BT /%s %.1f Tf %.2f %.2f Td (%s) Tj ET\n" % (font.encode("ascii"), size, x, y, text)
+        name = UNICODE_FONT.encode("ascii")
+        if font == FONT_BOLD:
+            return (b"q %.2f w BT /%s %.1f Tf 2 Tr %.2f %.2f Td (%s) Tj ET Q\n"
+                    % (size * BOLD_STROKE, name, size, x, y, text))
+        if font == FONT_ITALIC:
+            return b"BT /%s %.1f Tf 1 0 %.2f 1 %.2f %.2f Tm (%s) Tj ET\n" % (name, size, ITALIC_SKEW, x, y, text)
+        return b"BT /%s %.1f Tf %.2f %.2f Td (%s) Tj ET\n" % (name, size, x, y, text)
+
+    def wrap(self, text: str, font: str, size: float, width: float) -> List[bytes]:
+        """Greedy line breaking of ``text`` into encoded lines no wider than ``width``."""
+        metrics = self._metrics(font)
+        space = metrics.width(metrics.space, size)
+        unit = metrics.unit
+        lines = []
+        for raw_line in text.split("\n"):
+            line: List[bytes] = []
+            line_width = 0.0
+            for word in metrics.words(raw_line):
+                word_width = metrics.width(word, size)
+                while word_width > width and len(word) > unit:
+                    # A single word wider than the line: break it by characters
+                    if line:
+                        lines.append(metrics.space.join(line))
+                        line, line_width = [], 0.0
+                    cut = len(word) - unit
+                    while cut > unit and metrics.width(word[:cut], size) > width:
+                        cut -= unit
+                    lines.append(word[:cut])
+                    word = word[cut:]
+                    word_width = metrics.width(word, size)
+                if line and line_width + space + word_width > width:
+                    lines.append(metrics.space.join(line))
+                    line, line_width = [], 0.0
+                line_width += (space if line else 0.0) + word_width
+                line.append(word)
+            if line:
+                lines.append(metrics.space.join(line))
+        return lines
+
+    def paragraph(self, text: str, font: str, size: float, color: Tuple[int, int, int],
+                  space_before: float = 0.0, space_after: float = 0.0, indent: float = 0.0,
+                  keep_with_next: int = 0) -> None:
+        """
+        Add a paragraph. ``keep_with_next`` lines of following content must fit
+        on the same page (so headings are not stranded at the bottom).
+        """
+        if not text or not text.strip():
+            return
+        lines = self.wrap(text, font, size, self.width - indent)
+        leading = self._leading(size)
+        needed = space_before + leading * (min(len(lines), 2) + keep_with_next)
+        if self.y - needed < self.margin and len(self.pages[-1]) > 1:
+            self._new_page()
+        elif len(self.pages[-1]) > 1:
+            self.y -= space_before
+
+        ops = self.pages[-1]
+        ops.append(self._color_ops(color))
+        for line in lines:
+            if self.y - leading < self.margin:
+                self._new_page()
+                ops = self.pages[-1]
+                ops.append(self._color_ops(color))
+            self.y -= leading
+            ops.append(self._show(font, size, self.margin + indent, self.y + size * 0.22, line))
+        self.y -= space_after
+
+    def rule(self, color: Tuple[int, int, int], space_after: float = 4.0) -> None:
+        self.y -= 2
+        self.pages[-1].append(
+            f"q {_color(color)} RG 0.75 w {self.margin:.2f} {self.y:.2f} m "
+            f"{PAGE_WIDTH - self.margin:.2f} {self.y:.2f} l S Q\n".encode("ascii")
+        )
+        self.y -= space_after
+
+    def footers(self, label: str) -> None:
+        """Add "label · page N of M" under the footer rule of every page."""
+        size = 8.0
+        total = len(self.pages)
+        metrics = self._metrics(FONT_REGULAR)
+        for number, ops in enumerate(self.pages, start=1):
+            text = metrics.space.join(metrics.words(f"{label} \u00b7 {number} / {total}"))
+            ops.append(b"0.45 0.45 0.45 rg " + self._show(FONT_REGULAR, size, self.margin, self.margin - 26, text))
+
+
+def layout_profile(data: Dict[str, Any], style: ResumeStyle, unicode_font: Optional[str] = None) -> PdfLayout:
+    """
+    Lay a profile dict out in the same section order as the markdown/DOCX
+    renderings, with the standard fonts if they cover its text and with the
+    TrueType font at ``unicode_font`` otherwise.
+    """
+    try:
+        return _layout_profile(PdfLayout(style), data)
+    except PdfUnicodeError:
+        if not unicode_font:
+            raise
+    return _layout_profile(PdfLayout(style, load_font(unicode_font)), data)
+
+
+def _layout_profile(layout: PdfLayout, data: Dict[str, Any]) -> PdfLayout:
+    style = layout.style
+    text, heading = style.text_color, style.heading_color
+    normal = style.normal_size
+    small = max(normal - 1.5, 7)
+
+    def section(title: str) -> None:
+        layout.paragraph(title, FONT_BOLD, style.heading_size, heading, space_before=12, keep_with_next=2)
+        layout.rule(heading)
+
+    def entry(title: str, subtitle: Optional[str], body: Optional[str], meta: Optional[str] = None) -> None:
+        layout.paragraph(title, FONT_BOLD, normal + 0.5, text, space_before=6, keep_with_next=1)
+        if subtitle:
+            layout.paragraph(subtitle, FONT_REGULAR, normal, text)
+        if meta:
+            layout.paragraph(meta, FONT_ITALIC, small, text)
+        if body:
+            layout.paragraph(body, FONT_REGULAR, normal, text, space_before=2)
+
+    layout.paragraph(data.get("name") or "", FONT_BOLD, style.name_size, heading)
+    layout.paragraph(data.get("headline") or "", FONT_REGULAR, style.heading_size - 2, text, space_before=2)
+    layout.paragraph(data.get("location") or "", FONT_ITALIC, small, text, space_before=2)
+
+    if data.get("about"):
+        section("About")
+        layout.paragraph(data["about"], FONT_REGULAR, normal, text)
+
+    if data.get("experience"):
+        section("Experience")
+        for exp in data["experience"]:
+            entry(f"{exp['title']} at {exp['company']}", None, exp.get("description"), exp.get("duration"))
+
+    if data.get("education"):
+        section("Education")
+        for edu in data["education"]:
+            degree = f"{edu['degree']} in {edu['field']}" if edu.get("field") else edu["degree"]
+            entry(edu["school"], degree, None, edu.get("years"))
+
+    if data.get("skills"):
+        section("Skills")
+        layout.paragraph("  \u00b7  ".join(data["skills"]), FONT_REGULAR, normal, text)
+
+    if data.get("certifications"):
+        section("Certifications")
+        for cert in data["certifications"]:
+            issued = f"Issued by {cert['issuer']}" + (f" ({cert['date']})" if cert.get("date") else "")
+            entry(cert["name"], issued, None)
+
+    if data.get("languages"):
+        section("Languages")
+        layout.paragraph("  \u00b7  ".join(data["languages"]), FONT_REGULAR, normal, text)
+
+    if data.get("recommendations"):
+        section("Recommendations")
+        for rec in data["recommendations"]:
+            entry(f"From {rec['author']} ({rec['relationship']})", None, rec.get("text"))
+
+    layout.footers(data.get("name") or "Resume")
+    return layout
+
+
+# ------------------------------
+# 4. PDF writer
+# ------------------------------
+def _pdf_string(text: str) -> bytes:
+    try:
+        encoded = encode_text(text)
+    except PdfUnicodeError:
+        encoded = codecs.BOM_UTF16_BE + text.encode("utf-16-be")
+    return b"(" + _escape(encoded) + b")"
+
+
+def write_pdf(layout: PdfLayout, title: str = "") -> bytes:
+    """Serialize a laid-out document as a PDF file."""
+    # Objects: 1 catalog, 2 page tree, 3 info, then the fonts (three standard
+    # ones, or the embedded font's objects), the page template, and a (page,
+    # content stream) pair per page
+    if layout.embedded is None:
+        font_ids = {name: 4 + i for i, name in enumerate(BASE_FONTS)}
+        fonts = [b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base_font.encode("ascii")
+                 for base_font in BASE_FONTS.values()]
+    else:
+        font_ids = {UNICODE_FONT: 4}
+        fonts = font_objects(layout.embedded.font, layout.embedded.used, first_id=4)
+    template_id = 4 + len(fonts)
+    page_count = len(layout.pages)
+    page_ids = [template_id + 1 + 2 * i for i in range(page_count)]
+    resources = (
+        b"<< /Font << " + b" ".join(b"/%s %d 0 R" % (name.encode("ascii"), font_id)
+                                    for name, font_id in font_ids.items())
+        + b" >> /XObject << /Tpl %d 0 R >> >>" % template_id
+    )
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        + b"] /Count %d >>" % page_count,
+        b"<< /Title " + _pdf_string(title) + b" /Producer (linkedin_to_resume) >>",
+    ]
+    objects.extend(fonts)
+    objects.append(page_template(layout.style))
+    for page_id, ops in zip(page_ids, layout.pages):
+        stream = zlib.compress(b"".join(ops), 6)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, resources, page_id + 1)
+        )
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    out = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+    offsets = []
+    position = len(out[0])
+    for number, body in enumerate(objects, start=1):
+        chunk = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        offsets.append(position)
+        out.append(chunk)
+        position += len(chunk)
+    xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)]
+    xref.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    out.extend(xref)
+    out.append(b"trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+               % (len(objects) + 1, position))
+    return b"".join(out)
+
+
+def render_pdf_bytes(profile: Any, style: Optional[ResumeStyle] = None,
+                     unicode_font: Optional[str] = None) -> Tuple[bytes, int]:
+    """
+    Render a profile (LinkedInProfile or dict) to PDF. Returns (pdf, page count).
+    ``unicode_font`` is the path of a TrueType font for text outside WinAnsi.
+    """
+    data = profile_to_dict(profile)
+    layout = layout_profile(data, style or ResumeStyle(), unicode_font)
+    return write_pdf(layout, data.get("name") or ""), len(layout.pages)
+
+
+def render_pdf(profile: Any, stream, style: Optional[ResumeStyle] = None,
+               unicode_font: Optional[str] = None) -> int:
+    """Render a profile to PDF into a writable binary stream. Returns the page count."""
+    pdf, pages = render_pdf_bytes(profile, style, unicode_font)
+    stream.write(pdf)
+    return pages
+
+
+# ------------------------------
+# 5. Batch export
+# ------------------------------
+def _render_pdf_files(jobs: List[Tuple[Dict[str, Any], str]], style: Optional[ResumeStyle],
+                      unicode_font: Optional[str]) -> List[Tuple[str, Optional[int], Optional[str]]]:
+    """
+    Render (profile dict, output path) jobs to files. Runs inside a worker
+    process; returns (output path, page count, error) per job.
+    """
+    results = []
+    for data, output_path in jobs:
+        try:
+            pdf, pages = render_pdf_bytes(data, style, unicode_font)
+            tmp_path = f"{output_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, output_path)
+            results.append((output_path, pages, None))
+        except Exception as e:
+            results.append((output_path, None, str(e)))
+    return results
+
+
+def render_pdfs_batch(items: Iterable[Tuple[Dict[str, Any], str]], style: Optional[ResumeStyle] = None,
+                      workers: Optional[int] = None, chunksize: int = 16,
+                      unicode_font: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Render (profile dict, output path) pairs on a process pool, ``chunksize``
+    profiles per task. Each worker builds the font tables and page template
+    once and reuses them for every profile it renders. Returns a summary with
+    document, page and failure counts.
+    """
+    workers = workers or os.cpu_count() or 1
+    items = list(items)
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    summary = {"documents": 0, "pages": 0, "failed": 0, "failures": []}
+    started = time.perf_counter()
+
+    if workers == 1:
+        results = (_render_pdf_files(chunk, style, unicode_font) for chunk in chunks)
+        _collect(results, summary)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_pdf_files, chunk, style, unicode_font) for chunk in chunks]
+            _collect((future.result() for future in futures), summary)
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["pages_per_second"] = round(summary["pages"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def _collect(chunk_results: Iterable[List[Tuple[str, Optional[int], Optional[str]]]], summary: Dict[str, Any]) -> None:
+    for results in chunk_results:
+        for output_path, pages, error in results:
+            if error is None:
+                summary["documents"] += 1
+                summary["pages"] += pages
+            else:
+                summary["failed"] += 1
+                summary["failures"].append({"output": output_path, "error": error})
+
+
+# --------------------------------
+# 6. Main Entry Point
+# --------------------------------
+def main():
+    from app.services.profile_store_service import PROFILE_STORE_DIR, iter_profile_ids, load_profile
+
+    parser = argparse.ArgumentParser(description="Export stored profiles as PDF resumes.")
+    parser.add_argument("--store", default=PROFILE_STORE_DIR, help="Profile store directory")
+    parser.add_argument("--output-dir", default=os.path.join("output", "pdf"), help="Where to write the PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--unicode-font", default=None,
+                        help="TrueType font to embed for text outside WinAnsi (default: PDF_UNICODE_FONT)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    def items():
+        for profile_id in sorted(iter_profile_ids(args.store)):
+            data = load_profile(profile_id, args.store)
+            if data is not None:
+                yield data, os.path.join(args.output_dir, f"{profile_id}.pdf")
+
+    unicode_font = args.unicode_font or os.environ.get("PDF_UNICODE_FONT")
+    summary = render_pdfs_batch(items(), workers=args.workers, unicode_font=unicode_font)
+    print(f"Rendered {summary['documents']} PDFs ({summary['pages']} pages) in {summary['elapsed_seconds']}s, "
+          f"{summary['pages_per_second']} pages/s")
+    for failure in summary["failures"]:
+        print(f"  - {failure['output']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
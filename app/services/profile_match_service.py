@@ -0,0 +1,321 @@
+"""
+Local matching of stored profiles against job descriptions.
+
+Each profile becomes a sparse BM25 vector over the terms of its skills,
+experience titles (and headline) and free text (`about` plus experience
+descriptions), with the structured fields weighted higher. The vectors are
+stacked into one SciPy CSR matrix (profiles x vocabulary). A job description
+becomes a sparse query vector, so ranking every profile is a single sparse
+matrix product, and several job descriptions are ranked in the same product.
+
+The matrix is built from the profile store on first use and extended when new
+profiles are stored, without re-reading the ones already indexed. Only the
+latest version of each person is ranked; rows of earlier versions stay in the
+matrix with zero weight.
+
+Rank stored profiles from the command line with:
+    python -m app.services.profile_match_service job_description.txt
+"""
+
+import argparse
+import math
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.services.normalization_service import search_skills, search_title
+from app.services.profile_store_service import PROFILE_STORE_DIR, iter_latest_versions, load_profile
+
+# Term-frequency weight of each profile field (BM25F-style)
+MATCH_FIELDS = {
+    "skills": 3.0,
+    "titles": 2.0,
+    "text": 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_TOP_K = 100
+# Matched terms reported per result, strongest first
+MAX_MATCHED_TERMS = 10
+
+# Keeps "c++", "c#", "node.js" and "ci/cd" as single terms
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+doing for from had has have having he her his how i if in into is it its itself just me more most
+my no nor not of on once only or other our ours out over own same she should so some such than that
+the their them then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours etc e.g i.e per via using use
+""".split())
+
+
+class ProfileMatchError(Exception):
+    """Raised when a job description cannot be matched (e.g. it has no usable terms)"""
+    pass
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOP_WORDS]
+
+
+def profile_match_fields(data: Dict[str, Any]) -> Dict[str, str]:
+    """Flatten a profile dict into the text of each match field, with canonical skill and title spellings."""
+    experience = data.get("experience") or []
+    titles = [data.get("headline") or ""]
+    titles.extend(search_title(exp.get("title") or "") for exp in experience)
+    text = [data.get("about") or ""]
+    text.extend(exp.get("description") or "" for exp in experience)
+    return {
+        "skills": "\n".join(search_skills(data.get("skills") or [])),
+        "titles": "\n".join(titles),
+        "text": "\n".join(text),
+    }
+
+
+def profile_term_frequencies(data: Dict[str, Any]) -> Counter:
+    """Field-weighted term frequencies of one profile."""
+    frequencies = Counter()
+    for field, text in profile_match_fields(data).items():
+        weight = MATCH_FIELDS[field]
+        for token in tokenize(text):
+            frequencies[token] += weight
+    return frequencies
+
+
+# ------------------------------
+# 1. Index
+# ------------------------------
+class MatchIndex:
+    """
+    BM25 matrix over a growing set of profiles. Raw weighted term frequencies
+    are kept in flat arrays (CSR layout), so adding profiles only tokenizes the
+    new ones; the BM25 weights are then recomputed for all rows in a few
+    vectorized NumPy operations, as IDF and average length change with the
+    corpus.
+    """
+
+    def __init__(self):
+        self.profile_ids: List[str] = []
+        self.names: List[str] = []
+        self.headlines: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.matrix: Optional[sparse.csr_matrix] = None
+        self._indptr = array("q", [0])
+        self._indices = array("i")
+        self._frequencies = array("f")
+        self._lengths = array("f")
+        self._live = array("B")  # 0 for rows left out of ranking (superseded versions)
+
+    def __len__(self) -> int:
+        """Number of profiles being ranked."""
+        return sum(self._live)
+
+    def add(self, items: Iterable[Tuple[str, Dict[str, Any]]], keep: Optional[Set[str]] = None) -> int:
+        """
+        Add (profile_id, data) pairs and reweight the matrix. With ``keep``,
+        only rows whose id is in it are ranked (and counted in the BM25
+        statistics), so earlier versions of a person drop out. Returns the
+        number added.
+        """
+        added = 0
+        for profile_id, data in items:
+            frequencies = profile_term_frequencies(data)
+            for term, frequency in frequencies.items():
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = self.vocabulary[term] = len(self.terms)
+                    self.terms.append(term)
+                self._indices.append(column)
+                self._frequencies.append(frequency)
+            self._indptr.append(len(self._indices))
+            self._lengths.append(sum(frequencies.values()))
+            self._live.append(1)
+            self.profile_ids.append(profile_id)
+            self.names.append(data.get("name") or "")
+            self.headlines.append(data.get("headline") or "")
+            added += 1
+        changed = False
+        if keep is not None:
+            for row, profile_id in enumerate(self.profile_ids):
+                live = int(profile_id in keep)
+                if self._live[row] != live:
+                    self._live[row] = live
+                    changed = True
+        if added or changed:
+            self._reweight()
+        return added
+
+    def _reweight(self) -> None:
+        n_profiles = len(self._lengths)
+        indptr = np.frombuffer(self._indptr, dtype=np.int64)
+        indices = np.frombuffer(self._indices, dtype=np.int32)
+        frequencies = np.frombuffer(self._frequencies, dtype=np.float32)
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        live = np.frombuffer(self._live, dtype=np.uint8).astype(bool)
+        live_entries = np.repeat(live, np.diff(indptr))
+
+        n_live = int(live.sum())
+        document_frequency = np.bincount(indices[live_entries], minlength=len(self.terms))
+        idf = np.log1p((n_live - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        average_length = float(lengths[live].mean()) if n_live else 1.0
+        length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / (average_length or 1.0))
+        row_norm = np.repeat(length_norm, np.diff(indptr))
+        weights = idf[indices] * frequencies * (BM25_K1 + 1.0) / (frequencies + row_norm)
+        # Superseded rows keep their entries but never score
+        weights *= live_entries
+
+        # Copies, so later appends to the flat arrays never touch a published matrix
+        self.matrix = sparse.csr_matrix(
+            (weights, indices.copy(), indptr.copy()), shape=(n_profiles, len(self.terms))
+        )
+
+    def query_matrix(self, job_descriptions: List[str], n_terms: int) -> sparse.csc_matrix:
+        """Sparse (terms x job descriptions) matrix of log-scaled query term counts."""
+        rows, columns, values = [], [], []
+        for j, text in enumerate(job_descriptions):
+            for term, count in Counter(tokenize(text)).items():
+                row = self.vocabulary.get(term)
+                if row is not None and row < n_terms:
+                    rows.append(row)
+                    columns.append(j)
+                    values.append(1.0 + math.log(count))
+        return sparse.csc_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, columns)), shape=(n_terms, len(job_descriptions))
+        )
+
+    def rank(self, job_descriptions: List[str], top_k: int = 20) -> List[List[Dict[str, Any]]]:
+        """Rank all profiles against each job description in one matrix product."""
+        matrix = self.matrix
+        if matrix is None:
+            return [[] for _ in job_descriptions]
+        queries = self.query_matrix(job_descriptions, matrix.shape[1])
+        # CSR times a dense right-hand side is a single pass over the non-zeros
+        # (about 10x faster than a sparse-sparse product at 100k profiles)
+        scores = matrix @ queries.toarray()
+
+        rankings = []
+        for j in range(len(job_descriptions)):
+            column = scores[:, j]
+            k = min(top_k, len(column))
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top], kind="stable")]
+            query_terms = queries.getcol(j)
+            query_weights = dict(zip(query_terms.indices, query_terms.data))
+            rankings.append([
+                self._result(matrix, row, float(column[row]), query_weights)
+                for row in top if column[row] > 0
+            ])
+        return rankings
+
+    def _result(self, matrix: sparse.csr_matrix, row: int, score: float,
+                query_weights: Dict[int, float]) -> Dict[str, Any]:
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        contributions = [
+            (weight * query_weights[term], term)
+            for term, weight in zip(matrix.indices[start:end], matrix.data[start:end])
+            if term in query_weights
+        ]
+        contributions.sort(reverse=True)
+        return {
+            "profile_id": self.profile_ids[row],
+            "name": self.names[row],
+            "headline": self.headlines[row],
+            "score": round(score, 4),
+            "matched_terms": [self.terms[term] for _, term in contributions[:MAX_MATCHED_TERMS]],
+        }
+
+
+# Match index per store directory, with the directory mtime it was last synced at
+_indexes: Dict[str, Tuple[Optional[int], MatchIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_match_index(store_dir: str = PROFILE_STORE_DIR) -> MatchIndex:
+    """
+    The match index for a profile store, synced with it: the latest version of
+    every person. The directory is only rescanned when its mtime changed, and
+    only unseen profiles are loaded.
+    """
+    with _indexes_lock:
+        try:
+            mtime = os.stat(store_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = _indexes.get(store_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index = cached[1] if cached is not None else MatchIndex()
+        known = set(index.profile_ids)
+        latest = {profile_id for _, profile_id in iter_latest_versions(store_dir)}
+        new_ids = [profile_id for profile_id in latest if profile_id not in known]
+
+        def new_profiles():
+            for profile_id in sorted(new_ids):
+                data = load_profile(profile_id, store_dir)
+                if data is not None:
+                    yield profile_id, data
+
+        index.add(new_profiles(), keep=latest)
+        _indexes[store_dir] = (mtime, index)
+        return index
+
+
+# ------------------------------
+# 2. Matching
+# ------------------------------
+def _check_job_descriptions(job_descriptions: List[str]) -> None:
+    for text in job_descriptions:
+        if not tokenize(text):
+            raise ProfileMatchError("Job description has no matchable terms")
+
+
+def match_profiles_batch(job_descriptions: List[str], top_k: int = 20,
+                         store_dir: str = PROFILE_STORE_DIR) -> List[List[Dict[str, Any]]]:
+    """Best-matching stored profiles for each job description, best first."""
+    _check_job_descriptions(job_descriptions)
+    return get_match_index(store_dir).rank(job_descriptions, max(1, min(top_k, MAX_TOP_K)))
+
+
+def match_profiles(job_description: str, top_k: int = 20, store_dir: str = PROFILE_STORE_DIR) -> Dict[str, Any]:
+    """Rank all stored profiles against one job description."""
+    _check_job_descriptions([job_description])
+    index = get_match_index(store_dir)
+    return {
+        "profiles_considered": len(index),
+        "results": index.rank([job_description], max(1, min(top_k, MAX_TOP_K)))[0],
+    }
+
+
+# --------------------------------
+# 3. Main Entry Point
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Rank stored profiles against job descriptions.")
+    parser.add_argument("job_files", nargs="+", help="Text files, one job description each")
+    parser.add_argument("--top", type=int, default=10, help="Profiles to show per job description")
+    args = parser.parse_args()
+
+    job_descriptions = []
+    for path in args.job_files:
+        with open(path, "r", encoding="utf-8") as f:
+            job_descriptions.append(f.read())
+
+    for path, matches in zip(args.job_files, match_profiles_batch(job_descriptions, args.top)):
+        print(f"{path}: {len(matches)} matches")
+        for match in matches:
+            print(f"  {match['profile_id']}  {match['name']} - {match['headline']} ({match['score']})")
+            print(f"      {', '.join(match['matched_terms'])}")
+
+
+if __name__ == "__main__":
+    main()
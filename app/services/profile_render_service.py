@@ -0,0 +1,480 @@
+"""
+Incremental, section-level rendering of structured LinkedIn profiles.
+
+A profile is split into render units (header, about, one unit per experience,
+education entry, ...). Each unit is rendered to markdown, HTML and DOCX
+fragments which are cached on disk keyed by a hash of the unit's content, so
+re-rendering a profile only pays for the units that actually changed. DOCX
+output is packaged in a cached theme built from a ResumeStyle (see
+docx_theme_service).
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+from app.services.docx_theme_service import ResumeStyle, body_xml, get_theme
+
+# Bump whenever a template below changes so stale cached fragments are ignored.
+RENDER_VERSION = "2"
+
+CACHE_FILENAME = ".render_cache.json"
+PROFILE_JSON_FILENAME = "structured_profile.json"
+
+# A render unit: (section name, unit kind, JSON-serializable payload)
+RenderUnit = Tuple[str, str, Dict[str, Any]]
+
+
+# ------------------------------
+# 1. Splitting a profile into units
+# ------------------------------
+def profile_to_dict(profile: Any) -> Dict[str, Any]:
+    """Return a plain dict for a LinkedInProfile (or an already-dumped dict)."""
+    if isinstance(profile, dict):
+        return profile
+    return profile.model_dump()
+
+
+def profile_units(data: Dict[str, Any]) -> List[RenderUnit]:
+    """
+    Split a profile dict into ordered render units. Concatenating the rendered
+    units reproduces the full document.
+    """
+    units: List[RenderUnit] = [
+        ("header", "header", {
+            "name": data["name"],
+            "headline": data["headline"],
+            "location": data["location"],
+        }),
+        ("about", "about", {"about": data["about"]}),
+        ("experience", "experience_open", {}),
+    ]
+    units += [("experience", "experience", exp) for exp in data["experience"]]
+    units.append(("experience", "experience_close", {}))
+
+    units.append(("education", "education_open", {}))
+    units += [("education", "education", edu) for edu in data["education"]]
+    units.append(("education", "education_close", {}))
+
+    if data.get("skills"):
+        units.append(("skills", "skills", {"skills": data["skills"]}))
+
+    if data.get("certifications"):
+        units.append(("certifications", "certifications_open", {}))
+        units += [("certifications", "certification", cert) for cert in data["certifications"]]
+        units.append(("certifications", "certifications_close", {}))
+
+    if data.get("languages"):
+        units.append(("languages", "languages", {"languages": data["languages"]}))
+
+    if data.get("recommendations"):
+        units.append(("recommendations", "recommendations_open", {}))
+        units += [("recommendations", "recommendation", rec) for rec in data["recommendations"]]
+        units.append(("recommendations", "recommendations_close", {}))
+
+    units.append(("footer", "footer", {}))
+    return units
+
+
+def unit_hash(kind: str, payload: Dict[str, Any]) -> str:
+    """Content hash used as the fragment cache key for a render unit."""
+    blob = json.dumps([RENDER_VERSION, kind, payload], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+def section_hashes(data: Dict[str, Any]) -> Dict[str, str]:
+    """Return one combined content hash per profile section."""
+    grouped: Dict[str, List[str]] = {}
+    for section, kind, payload in profile_units(data):
+        grouped.setdefault(section, []).append(unit_hash(kind, payload))
+    return {
+        section: hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()[:32]
+        for section, hashes in grouped.items()
+    }
+
+
+def diff_profile_sections(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Compare two profile dicts section by section.
+    Returns {section: "added" | "removed" | "changed"} for every section that differs.
+    """
+    old = section_hashes(previous) if previous else {}
+    new = section_hashes(current)
+    diff = {}
+    for section, digest in new.items():
+        if section not in old:
+            diff[section] = "added"
+        elif old[section] != digest:
+            diff[section] = "changed"
+    for section in old:
+        if section not in new:
+            diff[section] = "removed"
+    return diff
+
+
+# ------------------------------
+# 2. Markdown fragments
+# ------------------------------
+def _render_markdown(kind: str, p: Dict[str, Any]) -> str:
+    if kind == "header":
+        return f"""# {p['name']}
+
+## {p['headline']}
+**Location:** {p['location']}
+
+"""
+    if kind == "about":
+        return f"""### About
+{p['about']}
+
+"""
+    if kind == "experience_open":
+        return "### Experience\n"
+    if kind == "experience":
+        return f"""
+#### {p['title']} at {p['company']}
+*{p['duration']}*
+
+{p['description'] if p.get('description') else ''}
+"""
+    if kind == "education_open":
+        return "\n### Education\n"
+    if kind == "education":
+        return f"""
+#### {p['school']}
+{p['degree']}{f" in {p['field']}" if p.get('field') else ''}
+{f"*{p['years']}*" if p.get('years') else ''}
+"""
+    if kind == "skills":
+        return "\n### Skills\n" + "".join(f"- {skill}\n" for skill in p["skills"])
+    if kind == "certifications_open":
+        return "\n### Certifications\n"
+    if kind == "certification":
+        return f"""
+#### {p['name']}
+Issued by {p['issuer']}{f" ({p['date']})" if p.get('date') else ''}
+"""
+    if kind == "languages":
+        return "\n### Languages\n" + "".join(f"- {lang}\n" for lang in p["languages"])
+    if kind == "recommendations_open":
+        return "\n### Recommendations\n"
+    if kind == "recommendation":
+        return f"""
+#### From {p['author']} ({p['relationship']})
+{p['text']}
+"""
+    # *_close and footer units have no markdown
+    return ""
+
+
+# ------------------------------
+# 3. HTML fragments
+# ------------------------------
+def _render_html(kind: str, p: Dict[str, Any]) -> str:
+    if kind == "header":
+        return f"""
+    <div class="profile-container">
+        <header class="profile-header">
+            <h1 class="profile-name">{p['name']}</h1>
+            <h2 class="profile-headline">{p['headline']}</h2>
+            <div class="profile-location">
+                <i class="fas fa-map-marker-alt"></i> {p['location']}
+            </div>
+        </header>
+
+"""
+    if kind == "about":
+        return f"""        <section class="profile-section">
+            <h3>About</h3>
+            <div class="profile-about">
+                {p['about']}
+            </div>
+        </section>
+
+"""
+    if kind == "experience_open":
+        return _section_open("Experience", "experience-list")
+    if kind == "experience":
+        return f'''
+                <div class="experience-item">
+                    <div class="experience-header">
+                        <h4>{p['title']}</h4>
+                        <div class="company-name">{p['company']}</div>
+                        <div class="duration">{p['duration']}</div>
+                    </div>
+                    <div class="experience-description">
+                        {p['description'] if p.get('description') else ''}
+                    </div>
+                </div>
+                '''
+    if kind == "experience_close":
+        return "\n            </div>\n        </section>\n\n"
+    if kind == "education_open":
+        return _section_open("Education", "education-list")
+    if kind == "education":
+        return f'''
+                <div class="education-item">
+                    <div class="education-header">
+                        <h4>{p['school']}</h4>
+                        <div class="degree">
+                            {p['degree']}{f" in {p['field']}" if p.get('field') else ''}
+                        </div>
+                        {f'<div class="years">{p["years"]}</div>' if p.get('years') else ''}
+                    </div>
+                </div>
+                '''
+    if kind == "education_close":
+        return "\n            </div>\n        </section>\n    "
+    if kind == "skills":
+        return f"""
+        <section class="profile-section">
+            <h3>Skills</h3>
+            <div class="skills-list">
+                {''.join([f'<span class="skill-tag">{skill}</span>' for skill in p['skills']])}
+            </div>
+        </section>
+        """
+    if kind == "certifications_open":
+        return "\n" + _section_open("Certifications", "certifications-list")
+    if kind == "certification":
+        return f'''
+                <div class="certification-item">
+                    <h4>{p['name']}</h4>
+                    <div class="certification-meta">
+                        <span class="issuer">Issued by {p['issuer']}</span>
+                        {f'<span class="date">{p["date"]}</span>' if p.get('date') else ''}
+                    </div>
+                </div>
+                '''
+    if kind == "languages":
+        return f"""
+        <section class="profile-section">
+            <h3>Languages</h3>
+            <div class="languages-list">
+                {''.join([f'<span class="language-tag">{lang}</span>' for lang in p['languages']])}
+            </div>
+        </section>
+        """
+    if kind == "recommendations_open":
+        return "\n" + _section_open("Recommendations", "recommendations-list", "profile-section recommendations-section")
+    if kind == "recommendation":
+        return f'''
+                <div class="recommendation-item">
+                    <div class="recommendation-header">
+                        <div class="recommender">
+                            <span class="recommender-name">{p['author']}</span>
+                            <span class="relationship">({p['relationship']})</span>
+                        </div>
+                    </div>
+                    <div class="recommendation-content">
+                        "{p['text']}"
+                    </div>
+                </div>
+                '''
+    if kind in ("certifications_close", "recommendations_close"):
+        return "\n            </div>\n        </section>\n        "
+    if kind == "footer":
+        return "</div>"
+    return ""
+
+
+def _section_open(title: str, list_class: str, section_class: str = "profile-section") -> str:
+    return (
+        f'        <section class="{section_class}">\n'
+        f'            <h3>{title}</h3>\n'
+        f'            <div class="{list_class}">\n'
+        f'                '
+    )
+
+
+# ------------------------------
+# 4. DOCX fragments
+# ------------------------------
+def add_markdown_lines(doc, lines: List[str]) -> None:
+    """Append paragraphs for the given markdown lines to a python-docx Document."""
+    for line in lines:
+        if line.startswith('# '):  # Name
+            doc.add_heading(line[2:], 0)
+        elif line.startswith('## '):  # Headline
+            doc.add_heading(line[3:], 1)
+        elif line.startswith('### '):  # Section headers
+            doc.add_heading(line[4:], 2)
+        elif line.startswith('#### '):  # Subsections
+            doc.add_heading(line[5:], 3)
+        elif line.startswith('- '):  # List items
+            doc.add_paragraph(line[2:], style='List Bullet')
+        elif line.startswith('*') and line.endswith('*'):  # Italic text
+            p = doc.add_paragraph()
+            p.add_run(line.strip('*')).italic = True
+        elif line.startswith('**') and line.endswith('**'):  # Bold text
+            p = doc.add_paragraph()
+            p.add_run(line.strip('**')).bold = True
+        elif '**' in line:  # Handle inline bold text
+            p = doc.add_paragraph()
+            parts = line.split('**')
+            for i, part in enumerate(parts):
+                if part:  # Skip empty parts
+                    run = p.add_run(part)
+                    run.bold = (i % 2 == 1)  # Bold for odd-indexed parts
+        elif line.strip():
+            doc.add_paragraph(line)
+
+
+def _body_content(doc) -> List[Any]:
+    """Body block elements of a document, excluding the trailing section properties."""
+    return [el for el in doc.element.body.iterchildren() if el.tag != qn('w:sectPr')]
+
+
+def _render_docx_into(doc, markdown: str) -> List[str]:
+    """Render a markdown fragment into ``doc`` and return the XML of the new elements."""
+    before = len(_body_content(doc))
+    add_markdown_lines(doc, markdown.split('\n'))
+    return [etree.tostring(el, encoding="unicode") for el in _body_content(doc)[before:]]
+
+
+# ------------------------------
+# 5. Fragment cache
+# ------------------------------
+class FragmentCache:
+    """On-disk cache of rendered fragments keyed by render-unit content hash."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CACHE_FILENAME)
+        self.fragments: Dict[str, Dict[str, Any]] = {}
+        self.units: List[str] = []
+        self.theme: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == RENDER_VERSION:
+                self.fragments = data.get("fragments", {})
+                self.units = data.get("units", [])
+                self.theme = data.get("theme")
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fragment
+
+    def save(self, units: List[str], theme: Optional[str] = None) -> None:
+        """Persist only the fragments referenced by the latest render."""
+        keep = set(units)
+        data = {
+            "version": RENDER_VERSION,
+            "units": units,
+            "theme": theme,
+            "fragments": {k: v for k, v in self.fragments.items() if k in keep},
+        }
+        # Unique per writer, so concurrent renders never replace each other's temp file
+        tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+# ------------------------------
+# 6. Assembly
+# ------------------------------
+def render_markdown(profile: Any) -> str:
+    """Render a whole profile to markdown in memory."""
+    return "".join(_render_markdown(kind, payload) for _, kind, payload in profile_units(profile_to_dict(profile)))
+
+
+def render_html(profile: Any) -> str:
+    """Render a whole profile to HTML in memory."""
+    return "".join(_render_html(kind, payload) for _, kind, payload in profile_units(profile_to_dict(profile)))
+
+
+def render_docx(profile: Any, stream, style: Optional[ResumeStyle] = None) -> None:
+    """Render a whole profile to DOCX, in the theme for ``style``, into a writable binary stream."""
+    theme = get_theme(style)
+    doc = theme.document()
+    add_markdown_lines(doc, render_markdown(profile).split('\n'))
+    theme.save(doc, stream)
+
+
+def render_docx_themes(profile: Any, styles: List[Optional[ResumeStyle]]) -> List[bytes]:
+    """Render a profile once and package it as one DOCX per style."""
+    doc = get_theme().document()
+    add_markdown_lines(doc, render_markdown(profile).split('\n'))
+    body = body_xml(doc)
+    return [get_theme(style).build(body) for style in styles]
+
+
+def render_profile_files(profile: Any, output_dir: str, base_name: str = "structured_profile",
+                         style: Optional[ResumeStyle] = None):
+    """
+    Render a profile to markdown, HTML and DOCX in ``output_dir``, reusing cached
+    fragments for every unit whose content did not change since the last render.
+    The DOCX uses the theme for ``style``. Returns (markdown_file, html_file, docx_file).
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    markdown_file = os.path.join(output_dir, f"{base_name}.md")
+    html_file = os.path.join(output_dir, f"{base_name}.html")
+    docx_file = os.path.join(output_dir, f"{base_name}.docx")
+    json_file = os.path.join(output_dir, f"{base_name}.json")
+
+    data = profile_to_dict(profile)
+    previous = None
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    changes = diff_profile_sections(previous, data)
+    cache = FragmentCache(output_dir)
+    units = profile_units(data)
+    keys = [unit_hash(kind, payload) for _, kind, payload in units]
+
+    theme = get_theme(style)
+    outputs_exist = all(os.path.exists(p) for p in (markdown_file, html_file, docx_file))
+    if not changes and outputs_exist and keys == cache.units and cache.theme == theme.fingerprint:
+        print("Profile unchanged since last render; reusing existing files.")
+        return markdown_file, html_file, docx_file
+
+    markdown_parts = []
+    html_parts = []
+    docx_parts = []
+    doc = theme.document()
+    for key, (_, kind, payload) in zip(keys, units):
+        fragment = cache.get(key)
+        if fragment is None:
+            md = _render_markdown(kind, payload)
+            fragment = {
+                "md": md,
+                "html": _render_html(kind, payload),
+                "docx": _render_docx_into(doc, md),
+            }
+            cache.fragments[key] = fragment
+        markdown_parts.append(fragment["md"])
+        html_parts.append(fragment["html"])
+        docx_parts.extend(fragment["docx"])
+
+    with open(markdown_file, "w", encoding="utf-8") as f:
+        f.write("".join(markdown_parts))
+    with open(html_file, "w", encoding="utf-8") as f:
+        f.write("".join(html_parts))
+    with open(docx_file, "wb") as f:
+        f.write(theme.build(docx_parts))
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    cache.save(keys, theme.fingerprint)
+
+    changed = ", ".join(f"{section} ({status})" for section, status in changes.items()) or "none"
+    print(f"Rendered {cache.misses}/{len(units)} fragments, reused {cache.hits}. Changed sections: {changed}")
+    return markdown_file, html_file, docx_file
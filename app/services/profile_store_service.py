@@ -0,0 +1,187 @@
+"""
+Content-addressed store of structured profiles.
+
+Every structured profile is saved as `<profile_id>.json`, where the id is a
+hash of the profile's content. A given id therefore always refers to the same
+data, which lets downloads use immutable, versioned URLs.
+
+Re-extracting a person stores a new version next to the old ones. The versions
+of each person are listed, oldest first, in `people/<hash>.json`, so search and
+matching can consider only the latest version of everyone.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.services.profile_render_service import profile_to_dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: msvcrt byte-range locks instead
+    fcntl = None
+    import msvcrt
+
+PROFILE_STORE_DIR = os.path.join("output", "profiles")
+LATEST_FILENAME = "latest"
+PEOPLE_DIRNAME = "people"
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+# Parsed people/*.json files, so listing the latest versions only re-reads changed ones
+_versions_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+def compute_profile_id(data: Dict[str, Any]) -> str:
+    """Content hash identifying one version of a profile."""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def is_valid_profile_id(profile_id: str) -> bool:
+    return bool(_PROFILE_ID.match(profile_id))
+
+
+def person_key(data: Dict[str, Any], profile_url: Optional[str] = None) -> Optional[str]:
+    """
+    Key shared by all versions of one person's profile: the LinkedIn profile
+    path. None when the URL is unknown; the profile is then a person of its
+    own, since different people can share a name.
+    """
+    if profile_url:
+        path = urlparse(profile_url).path.strip("/").lower()
+        if path:
+            return f"url:{path}"
+    return None
+
+
+def save_profile(profile: Any, store_dir: str = PROFILE_STORE_DIR, person: Optional[str] = None) -> str:
+    """
+    Store a profile (if not already stored), mark it as the latest one overall
+    and as the latest version of ``person`` (see `person_key`), and return its id.
+    """
+    data = profile_to_dict(profile)
+    profile_id = compute_profile_id(data)
+    os.makedirs(store_dir, exist_ok=True)
+
+    path = os.path.join(store_dir, f"{profile_id}.json")
+    if not os.path.exists(path):
+        _write_atomic(path, json.dumps(data, ensure_ascii=False))
+    _record_version(store_dir, person or profile_id, profile_id)
+    _write_atomic(os.path.join(store_dir, LATEST_FILENAME), profile_id)
+    return profile_id
+
+
+def load_profile(profile_id: str, store_dir: str = PROFILE_STORE_DIR) -> Optional[Dict[str, Any]]:
+    """Return the stored profile dict, or None if the id is unknown."""
+    if not is_valid_profile_id(profile_id):
+        return None
+    try:
+        with open(os.path.join(store_dir, f"{profile_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def latest_profile_id(store_dir: str = PROFILE_STORE_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(store_dir, LATEST_FILENAME), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def iter_profile_ids(store_dir: str = PROFILE_STORE_DIR) -> Iterator[str]:
+    """Yield the ids of all stored profiles."""
+    if not os.path.isdir(store_dir):
+        return
+    for entry in os.scandir(store_dir):
+        profile_id, ext = os.path.splitext(entry.name)
+        if ext == ".json" and is_valid_profile_id(profile_id):
+            yield profile_id
+
+
+def iter_latest_versions(store_dir: str = PROFILE_STORE_DIR) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (person, profile_id) for the latest version of every person.
+    Profiles stored before versions were tracked count as a person each.
+    """
+    tracked = set()
+    people_dir = os.path.join(store_dir, PEOPLE_DIRNAME)
+    if os.path.isdir(people_dir):
+        for entry in os.scandir(people_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            # Version files are replaced, never edited, so the inode identifies the content
+            stat = entry.stat()
+            cached = _versions_cache.get(entry.path)
+            if cached is not None and cached[0] == (stat.st_ino, stat.st_mtime_ns):
+                record = cached[1]
+            else:
+                record = _read_versions(entry.path)
+                _versions_cache[entry.path] = ((stat.st_ino, stat.st_mtime_ns), record)
+            if record["versions"]:
+                tracked.update(record["versions"])
+                yield record["person"], record["versions"][-1]
+    for profile_id in iter_profile_ids(store_dir):
+        if profile_id not in tracked:
+            yield profile_id, profile_id
+
+
+def _versions_path(store_dir: str, person: str) -> str:
+    digest = hashlib.sha256(person.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(store_dir, PEOPLE_DIRNAME, f"{digest}.json")
+
+
+def _read_versions(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"person": "", "versions": []}
+
+
+@contextlib.contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on ``path``.lock, held across processes (reprocessing runs several workers)."""
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after about 10 seconds
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _record_version(store_dir: str, person: str, profile_id: str) -> None:
+    """Append ``profile_id`` to the person's versions (moving it to the end if seen before)."""
+    path = _versions_path(store_dir, person)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Read, append and replace under a lock, so concurrent saves of one person keep every version
+    with _file_lock(path):
+        versions: List[str] = [version for version in _read_versions(path)["versions"] if version != profile_id]
+        versions.append(profile_id)
+        _write_atomic(path, json.dumps({"person": person, "versions": versions}, ensure_ascii=False))
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
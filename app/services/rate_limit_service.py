@@ -0,0 +1,352 @@
+"""
+Shared, rate-limit-aware scheduler for model calls.
+
+All OpenAI calls (interactive chat and background structuring) go through one
+`ModelCallScheduler` per process. It:
+
+- tracks the requests-per-minute and tokens-per-minute budgets reported in the
+  `x-ratelimit-*` response headers and holds calls back until budget is free,
+- admits queued calls by priority, so interactive chat goes before background
+  structuring work,
+- retries rate-limited and transient failures with jittered exponential
+  backoff, honouring `retry-after` when the API sends it.
+
+`tests/rate_limit_stub.py` has an offline endpoint that enforces a small budget
+and injects 429s, for exercising the scheduler without an API key.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from app.core.config import get_settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse reset durations such as "20ms", "1s" or "6m0s" into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_tokens(messages, max_output_tokens: int = 1000) -> int:
+    """Rough token estimate for budgeting: ~4 characters per token plus the expected output."""
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 4 + max_output_tokens
+
+
+# ------------------------------
+# 1. Budget tracking
+# ------------------------------
+class RateLimitBudget:
+    """Requests and tokens remaining in the current window, as last reported by the API."""
+
+    def __init__(self):
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.reset_requests_at = 0.0
+        self.reset_tokens_at = 0.0
+        self.blocked_until = 0.0
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Refresh the budget from `x-ratelimit-*` response headers."""
+        now = time.monotonic()
+        for kind in ("requests", "tokens"):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if limit is not None:
+                setattr(self, f"limit_{kind}", int(limit))
+            if remaining is not None:
+                setattr(self, f"remaining_{kind}", int(remaining))
+            if reset is not None:
+                setattr(self, f"reset_{kind}_at", now + reset)
+
+    def block_for(self, seconds: float) -> None:
+        """Hold every caller back, e.g. after a 429 with `retry-after`."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def wait_time(self, tokens: int) -> float:
+        """Seconds until a call needing ``tokens`` fits in the budget (0 if it fits now)."""
+        now = time.monotonic()
+        if self.remaining_requests is not None and now >= self.reset_requests_at:
+            self.remaining_requests = self.limit_requests
+        if self.remaining_tokens is not None and now >= self.reset_tokens_at:
+            self.remaining_tokens = self.limit_tokens
+
+        wait = max(0.0, self.blocked_until - now)
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            wait = max(wait, self.reset_requests_at - now)
+        if self.remaining_tokens is not None and self.remaining_tokens < tokens:
+            wait = max(wait, self.reset_tokens_at - now)
+        return wait
+
+    def reserve(self, tokens: int) -> None:
+        """Account locally for a call about to be sent, until the next headers arrive."""
+        if self.remaining_requests is not None:
+            self.remaining_requests -= 1
+        if self.remaining_tokens is not None:
+            self.remaining_tokens -= tokens
+
+
+# ------------------------------
+# 2. Scheduler
+# ------------------------------
+class ModelCallScheduler:
+    """Priority queue plus budget gate and retry loop in front of model calls."""
+
+    def __init__(self, max_concurrency: int = 8, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = RateLimitBudget()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        # Async callers waiting for a slot: (loop, event), woken along with the condition
+        self._async_waiters = set()
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+
+    def _acquire(self, priority: int, tokens: int, sequence: Optional[int] = None) -> int:
+        """Wait for a slot and budget. Returns the queue sequence number, to keep on retries."""
+        if sequence is None:
+            sequence = next(self._sequence)
+        ticket = (priority, sequence)
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            while True:
+                if self._queue[0] == ticket and self._in_flight < self.max_concurrency:
+                    wait = self.budget.wait_time(tokens)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait()
+            self._admit(tokens)
+        return sequence
+
+    def _admit(self, tokens: int) -> None:
+        # With self._cond held and the caller at the head of the queue
+        heapq.heappop(self._queue)
+        self._in_flight += 1
+        self.budget.reserve(tokens)
+        self._notify()
+
+    def _notify(self) -> None:
+        # With self._cond held
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    async def _aacquire(self, priority: int, tokens: int, sequence: Optional[int] = None) -> int:
+        """
+        `_acquire` for async callers: waits on the event loop instead of
+        blocking a thread of the default executor.
+        """
+        if sequence is None:
+            sequence = next(self._sequence)
+        ticket = (priority, sequence)
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+        try:
+            while True:
+                event = asyncio.Event()
+                waiter = (loop, event)
+                with self._cond:
+                    wait = None
+                    if self._queue[0] == ticket and self._in_flight < self.max_concurrency:
+                        wait = self.budget.wait_time(tokens)
+                        if wait <= 0:
+                            self._admit(tokens)
+                            return sequence
+                    # Registered under the lock, so no wake-up between the check and the wait is lost
+                    self._async_waiters.add(waiter)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._cond:
+                        self._async_waiters.discard(waiter)
+        except BaseException:
+            # Cancelled while queued: leave the queue so the calls behind move up
+            with self._cond:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._notify()
+            raise
+
+    def _count(self, *names: str) -> None:
+        # Calls finish on many threads at once
+        with self._cond:
+            for name in names:
+                self.stats[name] += 1
+
+    def _release(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if headers:
+                self.budget.update(headers)
+            self._notify()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        # "Full jitter" exponential backoff
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retrying a failed call; re-raises ``error`` when it must not be retried."""
+        if not _is_retryable(error) or attempt >= self.max_retries:
+            self._count("failed")
+            raise error
+        delay = self._backoff(attempt, error)
+        if _status_code(error) == 429:
+            with self._cond:
+                self.budget.block_for(delay)
+            self._count("rate_limited", "retries")
+        else:
+            self._count("retries")
+        return delay
+
+    def call(self, request: Callable[[], Any], priority: int = PRIORITY_BACKGROUND,
+             estimated_tokens: int = 0) -> Any:
+        """
+        Run ``request`` once budget is available and return its parsed result.
+
+        ``request`` must return a raw API response (`with_raw_response`) exposing
+        `.headers` and `.parse()`; the headers feed the budget tracker.
+        Blocks the calling thread; use `acall` from async code.
+        """
+        attempt = 0
+        sequence = None
+        while True:
+            # Retries keep their original place among calls of the same priority
+            sequence = self._acquire(priority, estimated_tokens, sequence)
+            headers = None
+            try:
+                raw = request()
+                headers = raw.headers
+                self._count("calls")
+                return raw.parse()
+            except Exception as e:
+                headers = _error_headers(e)
+                delay = self._retry_delay(attempt, e)
+                attempt += 1
+            finally:
+                self._release(headers)
+            time.sleep(delay)
+
+    async def acall(self, request: Callable[[], Any], priority: int = PRIORITY_INTERACTIVE,
+                    estimated_tokens: int = 0) -> Any:
+        """
+        `call` for async code. Queueing and backoff wait on the event loop; only
+        ``request`` itself runs in a worker thread, so calls held back by the
+        rate limit do not tie up the default executor (which browser
+        extractions share).
+        """
+        attempt = 0
+        sequence = None
+        while True:
+            sequence = await self._aacquire(priority, estimated_tokens, sequence)
+            headers = None
+            try:
+                raw = await asyncio.to_thread(request)
+                headers = raw.headers
+                self._count("calls")
+                return raw.parse()
+            except Exception as e:
+                headers = _error_headers(e)
+                delay = self._retry_delay(attempt, e)
+                attempt += 1
+            finally:
+                self._release(headers)
+            await asyncio.sleep(delay)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority: int = PRIORITY_INTERACTIVE, estimated_tokens: int = 0):
+        """
+        Hold a scheduler slot for a call the scheduler cannot drive itself, such
+        as a streamed completion. Budget and priority apply; retries do not.
+        """
+        await self._aacquire(priority, estimated_tokens)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+def _error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = _error_headers(error) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+@lru_cache()
+def get_scheduler() -> ModelCallScheduler:
+    """The process-wide scheduler shared by all model calls."""
+    settings = get_settings()
+    return ModelCallScheduler(
+        max_concurrency=settings.MODEL_MAX_CONCURRENCY,
+        max_retries=settings.MODEL_MAX_RETRIES,
+    )
+
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Bulk Offline Reprocessing
+-------------------------
+Re-runs structuring and rendering over an archive of raw `.marathon` profile
+dumps without logging into LinkedIn:
+
+1. Walks the archive directory and streams every `*.marathon` file.
+2. Structures each dump with `structure_profile_data` and renders it with
+   `save_structured_profile`, on a process pool.
+3. Limits how many model calls run at once across all workers.
+4. Records every finished dump in a checkpoint file so an interrupted run can
+   be resumed without redoing finished work.
+5. Prints a summary report of throughput and failures.
+
+Near-duplicates are skipped (see dedup_service): a dump whose raw text is a
+near-duplicate of one already seen is never sent to the model, and a
+structured profile that is a near-duplicate of one already rendered is not
+rendered again. Both are recorded as duplicates of the earlier dump.
+
+With --batch, dumps are structured through the OpenAI Batch API in chunks of
+--batch-size requests instead of one synchronous call each, and only the
+rendering runs on the process pool.
+
+Usage:
+    python -m app.services.reprocess_service ARCHIVE_DIR [--output DIR]
+        [--workers N] [--max-model-calls N] [--batch] [--batch-size N]
+        [--no-resume] [--report FILE] [--no-dedup]
+        [--raw-threshold S] [--profile-threshold S]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.dedup_service import (
+    PROFILE_DUPLICATE_THRESHOLD,
+    RAW_DUPLICATE_THRESHOLD,
+    profile_detector,
+    raw_dump_detector,
+)
+
+RAW_DUMP_EXTENSION = ".marathon"
+CHECKPOINT_FILENAME = ".reprocess_checkpoint.jsonl"
+
+# Set in each worker process by _init_worker
+_model_call_semaphore = None
+
+
+# ------------------------------
+# 1. Archive discovery
+# ------------------------------
+def iter_raw_dumps(archive_dir: str) -> Iterator[str]:
+    """Yield paths of raw profile dumps under ``archive_dir``, in a stable order."""
+    entries = sorted(os.scandir(archive_dir), key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_raw_dumps(entry.path)
+        elif entry.is_file() and entry.name.endswith(RAW_DUMP_EXTENSION):
+            yield entry.path
+
+
+def dump_fingerprint(path: str) -> str:
+    """Cheap change detector for a dump: size and modification time."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def output_dir_for(dump_path: str, archive_dir: str, output_root: str) -> str:
+    """Mirror the archive layout under ``output_root``, one directory per dump."""
+    relative = os.path.relpath(dump_path, archive_dir)
+    return os.path.join(output_root, os.path.splitext(relative)[0])
+
+
+# ------------------------------
+# 2. Checkpoints
+# ------------------------------
+class Checkpoint:
+    """
+    Append-only JSONL log of finished dumps, used to resume interrupted runs.
+    A dump recorded as a duplicate only counts as finished if the dump it
+    duplicates finished successfully.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = path
+        self.completed: Dict[str, str] = {}
+        if resume and os.path.exists(path):
+            duplicate_of: Dict[str, str] = {}
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line from an interrupted run
+                    key = record["dump"]
+                    duplicate_of.pop(key, None)
+                    if record.get("status") == "ok":
+                        self.completed[key] = record["fingerprint"]
+                    elif record.get("status") == "duplicate":
+                        self.completed[key] = record["fingerprint"]
+                        duplicate_of[key] = record["duplicate_of"]
+                    else:
+                        self.completed.pop(key, None)
+            for key, original in duplicate_of.items():
+                if original not in self.completed or original in duplicate_of:
+                    del self.completed[key]
+        elif not resume and os.path.exists(path):
+            os.remove(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_done(self, key: str, fingerprint: str) -> bool:
+        return self.completed.get(key) == fingerprint
+
+    def record(self, result: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+# ------------------------------
+# 3. Worker
+# ------------------------------
+def _init_worker(semaphore) -> None:
+    global _model_call_semaphore
+    _model_call_semaphore = semaphore
+
+
+def structure_dump(dump_path: str) -> Dict[str, Any]:
+    """
+    Structure a single raw dump. Runs inside a worker process; the profile is
+    returned so the driver can check it for duplicates before rendering it.
+    """
+    from app.services.linkedin_service import structure_profile_data
+
+    started = time.perf_counter()
+    with open(dump_path, "r", encoding="utf-8") as f:
+        raw_text = f.read()
+
+    model_started = time.perf_counter()
+    if _model_call_semaphore is not None:
+        with _model_call_semaphore:
+            profile = structure_profile_data(raw_text)
+    else:
+        profile = structure_profile_data(raw_text)
+    model_seconds = time.perf_counter() - model_started
+
+    if profile is None:
+        raise ValueError("Model returned no structured profile")
+
+    return {
+        "profile": profile,
+        "model_seconds": model_seconds,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def render_profile(profile, output_dir: str) -> Dict[str, Any]:
+    """Render an already-structured profile. Runs inside a worker process."""
+    from app.services.linkedin_service import save_structured_profile
+
+    started = time.perf_counter()
+    save_structured_profile(profile, output_dir)
+    return {
+        "model_seconds": 0.0,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+# ------------------------------
+# 4. Driver
+# ------------------------------
+def reprocess_archive(
+    archive_dir: str,
+    output_root: str = os.path.join("output", "reprocessed"),
+    workers: Optional[int] = None,
+    max_model_calls: int = 4,
+    resume: bool = True,
+    batch_size: Optional[int] = None,
+    batch_client=None,
+    dedup: bool = True,
+    raw_threshold: float = RAW_DUPLICATE_THRESHOLD,
+    profile_threshold: float = PROFILE_DUPLICATE_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Reprocess every raw dump under ``archive_dir`` and return a summary report.
+    At most ``workers * 2`` dumps are in flight, so huge archives are streamed
+    rather than queued up front.
+
+    If ``batch_size`` is set, dumps are structured through the Batch API in
+    chunks of that many requests (using ``batch_client`` if given).
+
+    With ``dedup``, dumps whose raw text (estimated Jaccard similarity of word
+    shingles) reaches ``raw_threshold`` against an earlier dump are skipped
+    before structuring, and structured profiles reaching ``profile_threshold``
+    against an earlier profile are skipped before rendering.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_root, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_root, CHECKPOINT_FILENAME), resume=resume)
+
+    context = multiprocessing.get_context()
+    semaphore = context.BoundedSemaphore(max_model_calls)
+
+    raw_duplicates = raw_dump_detector(raw_threshold) if dedup else None
+    profile_duplicates = profile_detector(profile_threshold) if dedup else None
+
+    summary = {
+        "archive_dir": archive_dir,
+        "output_root": output_root,
+        "workers": workers,
+        "max_model_calls": max_model_calls,
+        "processed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "skipped": 0,
+        "duplicates": 0,
+        "batches": 0,
+        "model_seconds": 0.0,
+        "failures": [],
+        "duplicate_of": {},
+    }
+    started = time.perf_counter()
+    # future -> (key, fingerprint, output_dir, timings of earlier stages)
+    pending: Dict[Any, Tuple[str, str, str, Optional[Dict[str, float]]]] = {}
+    chunk: List[Tuple[str, str, str]] = []
+
+    def record_failure(key: str, fingerprint: str, error: str) -> None:
+        summary["processed"] += 1
+        summary["failed"] += 1
+        summary["failures"].append({"dump": key, "error": error})
+        checkpoint.record({"dump": key, "fingerprint": fingerprint, "status": "failed", "error": error})
+        print(f"Failed: {key}: {error}")
+        # Later near-duplicates of a failed dump must be processed themselves
+        if raw_duplicates is not None:
+            raw_duplicates.forget(key)
+            profile_duplicates.forget(key)
+
+    def record_duplicate(key: str, fingerprint: str, stage: str, match: Tuple[str, float]) -> None:
+        original, similarity = match
+        summary["duplicates"] += 1
+        summary["duplicate_of"][key] = original
+        checkpoint.record({"dump": key, "fingerprint": fingerprint, "status": "duplicate",
+                           "duplicate_of": original, "similarity": round(similarity, 3), "stage": stage})
+
+    def render_unless_duplicate(pool, key: str, fingerprint: str, profile, output_dir: str,
+                                timings: Optional[Dict[str, float]] = None) -> None:
+        if profile_duplicates is not None:
+            from app.services.profile_render_service import profile_to_dict
+
+            match = profile_duplicates.check(key, profile_to_dict(profile))
+            if match is not None:
+                record_duplicate(key, fingerprint, "profile", match)
+                return
+        submit(pool, render_profile, key, fingerprint, output_dir, timings, profile, output_dir)
+
+    def collect(done: Set[Any]) -> None:
+        structured = []
+        for future in done:
+            key, fingerprint, output_dir, timings = pending.pop(future)
+            record = {"dump": key, "fingerprint": fingerprint}
+            try:
+                result = future.result()
+            except Exception as e:
+                record_failure(key, fingerprint, str(e))
+                continue
+            if "profile" in result:
+                # Structured by a worker; render it next (unless it is a duplicate)
+                structured.append((key, fingerprint, output_dir, result))
+                continue
+            record.update(result, status="ok")
+            if timings:
+                record["model_seconds"] += timings["model_seconds"]
+                record["seconds"] += timings["seconds"]
+            summary["succeeded"] += 1
+            summary["model_seconds"] += record["model_seconds"]
+            summary["processed"] += 1
+            checkpoint.record(record)
+        for key, fingerprint, output_dir, result in structured:
+            profile = result.pop("profile")
+            render_unless_duplicate(pool, key, fingerprint, profile, output_dir, result)
+
+    def submit(pool, fn, key: str, fingerprint: str, output_dir: str,
+               timings: Optional[Dict[str, float]], *args) -> None:
+        if len(pending) >= workers * 2:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending[pool.submit(fn, *args)] = (key, fingerprint, output_dir, timings)
+
+    def flush_chunk(pool) -> None:
+        """Structure the accumulated chunk in one batch job, then render it on the pool."""
+        from app.services.batch_structuring_service import structure_profiles_batch
+
+        raw_texts = {}
+        for key, fingerprint, dump_path in chunk:
+            with open(dump_path, "r", encoding="utf-8") as f:
+                raw_texts[key] = f.read()
+        try:
+            profiles, errors = structure_profiles_batch(raw_texts, client=batch_client)
+        except Exception as e:
+            profiles, errors = {}, {key: f"Batch failed: {e}" for key in raw_texts}
+        summary["batches"] += 1
+
+        for key, fingerprint, dump_path in chunk:
+            if key in profiles:
+                output_dir = output_dir_for(dump_path, archive_dir, output_root)
+                render_unless_duplicate(pool, key, fingerprint, profiles[key], output_dir)
+            else:
+                record_failure(key, fingerprint, errors.get(key, "No result"))
+        chunk.clear()
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(semaphore,),
+        ) as pool:
+            for dump_path in iter_raw_dumps(archive_dir):
+                key = os.path.relpath(dump_path, archive_dir)
+                fingerprint = dump_fingerprint(dump_path)
+                done_before = checkpoint.is_done(key, fingerprint)
+
+                if raw_duplicates is not None:
+                    with open(dump_path, "r", encoding="utf-8") as f:
+                        raw_text = f.read()
+                    if done_before:
+                        # Finished in an earlier run: still a candidate original
+                        raw_duplicates.add(key, raw_text)
+                    else:
+                        match = raw_duplicates.check(key, raw_text)
+                        if match is not None:
+                            record_duplicate(key, fingerprint, "raw", match)
+                            continue
+                if done_before:
+                    summary["skipped"] += 1
+                    continue
+
+                if batch_size:
+                    chunk.append((key, fingerprint, dump_path))
+                    if len(chunk) >= batch_size:
+                        flush_chunk(pool)
+                    continue
+
+                output_dir = output_dir_for(dump_path, archive_dir, output_root)
+                submit(pool, structure_dump, key, fingerprint, output_dir, None, dump_path)
+
+            if chunk:
+                flush_chunk(pool)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+    finally:
+        checkpoint.close()
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["profiles_per_minute"] = round(summary["processed"] / elapsed * 60, 2) if elapsed else 0.0
+    summary["model_seconds"] = round(summary["model_seconds"], 3)
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print("\nReprocessing summary")
+    print("-------------------------------------")
+    print(f"Processed:   {summary['processed']} ({summary['succeeded']} ok, {summary['failed']} failed)")
+    print(f"Skipped:     {summary['skipped']} (already done in a previous run)")
+    if summary["duplicates"]:
+        print(f"Duplicates:  {summary['duplicates']} (near-duplicates of another dump, not processed)")
+    if summary["batches"]:
+        print(f"Batch jobs:  {summary['batches']}")
+    print(f"Elapsed:     {summary['elapsed_seconds']}s")
+    print(f"Throughput:  {summary['profiles_per_minute']} profiles/min")
+    if summary["succeeded"]:
+        print(f"Model time:  {summary['model_seconds'] / summary['succeeded']:.2f}s avg per profile")
+    for failure in summary["failures"]:
+        print(f"  - {failure['dump']}: {failure['error']}")
+
+
+# --------------------------------
+# 5. Main Entry Point
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Restructure and re-render archived raw LinkedIn profile dumps.")
+    parser.add_argument("archive_dir", help="Directory containing *.marathon raw dumps (searched recursively)")
+    parser.add_argument("--output", default=os.path.join("output", "reprocessed"), help="Root directory for rendered profiles")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-model-calls", type=int, default=4, help="Maximum concurrent model calls across all workers")
+    parser.add_argument("--batch", action="store_true", help="Structure dumps through the OpenAI Batch API")
+    parser.add_argument("--batch-size", type=int, default=500, help="Structuring requests per batch job (with --batch)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and reset the checkpoint from previous runs")
+    parser.add_argument("--report", help="Also write the summary report as JSON to this file")
+    parser.add_argument("--no-dedup", action="store_true", help="Process near-duplicate dumps and profiles too")
+    parser.add_argument("--raw-threshold", type=float, default=RAW_DUPLICATE_THRESHOLD,
+                        help="Raw-text similarity (0-1) at which a dump is skipped as a near-duplicate")
+    parser.add_argument("--profile-threshold", type=float, default=PROFILE_DUPLICATE_THRESHOLD,
+                        help="Structured-profile similarity (0-1) at which rendering is skipped")
+    args = parser.parse_args()
+
+    summary = reprocess_archive(
+        args.archive_dir,
+        output_root=args.output,
+        workers=args.workers,
+        max_model_calls=args.max_model_calls,
+        resume=not args.no_resume,
+        batch_size=args.batch_size if args.batch else None,
+        dedup=not args.no_dedup,
+        raw_threshold=args.raw_threshold,
+        profile_threshold=args.profile_threshold,
+    )
+    print_summary(summary)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Exact-match cache for informational chat turns.
+
+Many conversations are the same few questions ("how does extraction work?",
+"what formats can I download?"). Their answers depend only on the conversation, the
+model and the prompt, so the encoded response of such a turn is kept and
+returned directly the next time the same conversation arrives.
+
+- The key is a hash of the normalized conversation (Unicode-normalized,
+  case-folded, whitespace collapsed, trailing punctuation dropped) together with
+  the model name, developer prompt and tool definitions.
+- Conversations with tool calls, tool results, e-mail addresses, URLs, or any
+  mention of a password or login are never looked up or stored, since they
+  may carry credentials and the model may use the extraction tool for them. Answers that came back with tool calls
+  are never stored either.
+- Entries expire after ``ttl`` seconds and the least recently used are
+  evicted beyond ``max_entries``.
+"""
+
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.models.chat import ChatMessage
+from app.services.openai_service import PROMPT_PREFIX, TOOLS
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_URL = re.compile(r"https?://|www\.|linkedin\.com/", re.IGNORECASE)
+# Any mention of a password or login, and "pass" followed by a value ("pass: x", "pass hunter2")
+_SECRET = re.compile(
+    r"\b(passwords?|passwd|pwd|passcodes?|passphrases?|logins?|log-?ins?|log\s+in|usernames?|user\s+names?"
+    r"|credentials?)\b|\bpass\b\s*(is|was|:|=)?\s*\S",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s.?!]+$")
+
+
+def normalize_text(text: str) -> str:
+    """Case- and spacing-insensitive form of a message, for cache keys."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _TRAILING.sub("", _WHITESPACE.sub(" ", text).strip())
+
+
+def is_cacheable(messages: List[ChatMessage]) -> bool:
+    """False for conversations that involve tools or may carry credentials."""
+    for msg in messages:
+        if msg.role == "tool" or msg.tool_calls or msg.tool_call_id:
+            return False
+        # Our own answers may mention URLs; what the client wrote is what matters
+        if msg.role != "assistant" and (_EMAIL.search(msg.content) or _URL.search(msg.content)
+                                        or _SECRET.search(msg.content)):
+            return False
+    return True
+
+
+class ResponseCache:
+    """TTL/LRU map from conversation hashes to encoded chat responses."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, namespace: str = ""):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._namespace = namespace.encode("utf-8")
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "bypassed": 0,
+                      "stores": 0, "expired": 0, "evicted": 0}
+
+    def key_for(self, messages: List[ChatMessage]) -> Optional[str]:
+        """Cache key of a conversation, or None when it must not be cached."""
+        if not is_cacheable(messages):
+            self.stats["bypassed"] += 1
+            return None
+        payload = json.dumps([(msg.role, normalize_text(msg.content)) for msg in messages],
+                             ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return hashlib.blake2b(self._namespace + b"\0" + payload, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        self.stats["lookups"] += 1
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.stats["expired"] += 1
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: str, body: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self._entries.move_to_end(key)
+        self.stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """The process-wide response cache, keyed to the current model, prompt and tools."""
+    settings = get_settings()
+    namespace = json.dumps([settings.OPENAI_MODEL, PROMPT_PREFIX, TOOLS], sort_keys=True)
+    return ResponseCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+        namespace=namespace,
+    )
@@ -1,6 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import re
 import html
+import json
 from bs4 import BeautifulSoup
 
 class ResponseFormatter:
@@ -72,55 +73,107 @@ class ResponseFormatter:
             print(f"Error formatting response: {str(e)}")
             return content  # Return original content if formatting fails
     
+    @staticmethod
+    def profile_summary_markdown(profile_data: Dict[str, Any]) -> str:
+        """
+        Build the markdown summary of a profile (sections for basic information,
+        about, experience, education and skills).
+        """
+        sections = []
+        
+        # Basic Information
+        if any(key in profile_data for key in ['name', 'headline', 'location']):
+            basic_info = []
+            if 'name' in profile_data:
+                basic_info.append(f"**Name:** {profile_data['name']}")
+            if 'headline' in profile_data:
+                basic_info.append(f"**Headline:** {profile_data['headline']}")
+            if 'location' in profile_data:
+                basic_info.append(f"**Location:** {profile_data['location']}")
+            sections.append("### Basic Information\n" + "\n".join(basic_info))
+        
+        # About
+        if 'about' in profile_data and profile_data['about']:
+            sections.append(f"### About\n{profile_data['about']}")
+        
+        # Experience
+        if 'experience' in profile_data and profile_data['experience']:
+            exp_items = []
+            for exp in profile_data['experience']:
+                exp_items.append(f"- **{exp['title']}** at {exp['company']}")
+                if 'duration' in exp:
+                    exp_items.append(f"  {exp['duration']}")
+            sections.append("### Experience\n" + "\n".join(exp_items))
+        
+        # Education
+        if 'education' in profile_data and profile_data['education']:
+            edu_items = []
+            for edu in profile_data['education']:
+                edu_items.append(f"- **{edu['degree']}** from {edu['school']}")
+                if 'years' in edu:
+                    edu_items.append(f"  {edu['years']}")
+            sections.append("### Education\n" + "\n".join(edu_items))
+        
+        # Skills
+        if 'skills' in profile_data and profile_data['skills']:
+            sections.append("### Skills\n" + "\n".join(f"- {skill}" for skill in profile_data['skills']))
+        
+        return "\n\n".join(sections)
+    
     @staticmethod
     def format_profile_summary(profile_data: Dict[str, Any]) -> str:
         """
         Format a profile summary into a clean, structured response.
         """
         try:
-            sections = []
-            
-            # Basic Information
-            if any(key in profile_data for key in ['name', 'headline', 'location']):
-                basic_info = []
-                if 'name' in profile_data:
-                    basic_info.append(f"**Name:** {profile_data['name']}")
-                if 'headline' in profile_data:
-                    basic_info.append(f"**Headline:** {profile_data['headline']}")
-                if 'location' in profile_data:
-                    basic_info.append(f"**Location:** {profile_data['location']}")
-                sections.append("### Basic Information\n" + "\n".join(basic_info))
-            
-            # About
-            if 'about' in profile_data and profile_data['about']:
-                sections.append(f"### About\n{profile_data['about']}")
-            
-            # Experience
-            if 'experience' in profile_data and profile_data['experience']:
-                exp_items = []
-                for exp in profile_data['experience']:
-                    exp_items.append(f"- **{exp['title']}** at {exp['company']}")
-                    if 'duration' in exp:
-                        exp_items.append(f"  {exp['duration']}")
-                sections.append("### Experience\n" + "\n".join(exp_items))
-            
-            # Education
-            if 'education' in profile_data and profile_data['education']:
-                edu_items = []
-                for edu in profile_data['education']:
-                    edu_items.append(f"- **{edu['degree']}** from {edu['school']}")
-                    if 'years' in edu:
-                        edu_items.append(f"  {edu['years']}")
-                sections.append("### Education\n" + "\n".join(edu_items))
-            
-            # Skills
-            if 'skills' in profile_data and profile_data['skills']:
-                sections.append("### Skills\n" + "\n".join(f"- {skill}" for skill in profile_data['skills']))
-            
             # Format the entire response
-            formatted_text = "\n\n".join(sections)
+            formatted_text = ResponseFormatter.profile_summary_markdown(profile_data)
             return ResponseFormatter.format_response(formatted_text)
             
         except Exception as e:
             print(f"Error formatting profile summary: {str(e)}")
-            return str(profile_data)  # Return raw data if formatting fails 
\ No newline at end of file
+            return str(profile_data)  # Return raw data if formatting fails
+    
+    @staticmethod
+    def format_profile_for_model(profile_data: Dict[str, Any], max_text_chars: int = 200) -> str:
+        """
+        Compact, token-minimized representation of a profile for tool messages
+        sent back to the model: minified JSON with empty fields dropped, long
+        free text (about, descriptions) trimmed and recommendations reduced to
+        their authors. The styled HTML from format_profile_summary is for the
+        browser only.
+        """
+        def compact(value):
+            if isinstance(value, dict):
+                items = ((k, compact(v)) for k, v in value.items())
+                return {k: v for k, v in items if v not in (None, "", [], {})}
+            if isinstance(value, list):
+                return [v for v in (compact(item) for item in value) if v not in (None, "", [], {})]
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                if len(value) > max_text_chars:
+                    value = value[:max_text_chars].rstrip() + "…"
+            return value
+        
+        data = dict(profile_data)
+        if data.get("recommendations"):
+            data["recommendations"] = [
+                f"{rec['author']} ({rec['relationship']})" for rec in data["recommendations"]
+            ]
+        return json.dumps(compact(data), ensure_ascii=False, separators=(",", ":"))
+    
+    @staticmethod
+    def format_extraction_result(profiles: List[Dict[str, Any]]) -> str:
+        """
+        Templated confirmation for a successful extraction, used instead of a
+        second model round-trip after the tool has run.
+        """
+        try:
+            parts = ["I've extracted the profile and generated your resume files (Markdown, HTML and DOCX)."]
+            parts += [ResponseFormatter.profile_summary_markdown(profile) for profile in profiles]
+            parts.append("Is there anything you'd like to know about the extracted profile?")
+            return ResponseFormatter.format_response("\n\n".join(parts))
+            
+        except Exception as e:
+            print(f"Error formatting extraction result: {str(e)}")
+            return str(profiles)  # Return raw data if formatting fails
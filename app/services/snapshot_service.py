@@ -0,0 +1,397 @@
+"""
+Append-only, delta-compressed archive of raw profile captures.
+
+Every capture of a profile URL is kept, so history is not lost when
+`profile.marathon` is overwritten. Each URL has one file of records
+(`output/snapshots/<key>.snap`):
+
+- a keyframe stores a whole capture, compressed with a dictionary trained on
+  captures of other profiles (LinkedIn pages share most of their boilerplate),
+- a delta stores a capture compressed with the previous capture as the
+  dictionary, so unchanged text costs almost nothing,
+- every KEYFRAME_INTERVAL-th version is a keyframe, which bounds the number of
+  records decoded to read any version.
+
+Records are only ever appended; a header index of each file is cached, and
+recently decoded versions are kept in memory. zstd (the `zstandard` package)
+is used when installed, zlib with a preset dictionary otherwise; each record
+names its codec and dictionary, so both can be read back.
+
+Inspect the archive with:
+    python -m app.services.snapshot_service list
+    python -m app.services.snapshot_service history <profile_url>
+    python -m app.services.snapshot_service show <profile_url> [--version N]
+    python -m app.services.snapshot_service train
+"""
+
+import argparse
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import zstandard
+except ImportError:  # Optional: records are zlib-compressed without it
+    zstandard = None
+
+SNAPSHOT_DIR = os.path.join("output", "snapshots")
+DICTIONARY_DIR = "dictionaries"
+CURRENT_DICTIONARY = "current"
+KEYFRAME_INTERVAL = 16
+DICTIONARY_SIZE = 64 * 1024
+# Profiles archived before a dictionary is trained automatically
+TRAINING_PROFILES = 16
+ZSTD_LEVEL = 12
+DECODED_CACHE_SIZE = 64
+
+FILE_MAGIC = b"LTRSNAP1"
+KEYFRAME, DELTA = 0, 1
+CODEC_ZLIB, CODEC_ZSTD = 1, 2
+# payload length, kind, codec, dictionary id, captured at (ms), raw length, crc32 of raw
+_RECORD = struct.Struct("<IBBIQII")
+_ZLIB_WINDOW = 32 * 1024
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be found or decoded"""
+    pass
+
+
+def normalize_profile_url(url: str) -> str:
+    """Canonical form of a profile URL: lowercase host, no query, fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    return f"{host}{path}" if host else path
+
+
+def snapshot_key(url: str) -> str:
+    return hashlib.sha256(normalize_profile_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+# ------------------------------
+# 1. Codecs and dictionaries
+# ------------------------------
+def build_raw_dictionary(samples: Iterable[bytes], size: int = DICTIONARY_SIZE) -> bytes:
+    """
+    Raw-content dictionary of the lines shared by most samples, the most
+    common last (both codecs find matches closer to the end more cheaply).
+    Used for zlib and when there are too few samples to train zstd.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(line for line in sample.splitlines() if len(line) > 2))
+    lines = [line for line, count in sorted(counts.items(), key=lambda item: (item[1], item[0])) if count > 1]
+    content = b"\n".join(lines)
+    return content[-size:]
+
+
+def train_dictionary(samples: List[bytes], size: int = DICTIONARY_SIZE) -> bytes:
+    """A zstd-trained dictionary if possible, else a raw-content one."""
+    if zstandard is not None:
+        try:
+            return zstandard.train_dictionary(size, samples).as_bytes()
+        except zstandard.ZstdError:
+            pass
+    return build_raw_dictionary(samples, size)
+
+
+def _zstd_dictionary(content: bytes, raw: bool = False):
+    dict_type = zstandard.DICT_TYPE_RAWCONTENT if raw else zstandard.DICT_TYPE_AUTO
+    return zstandard.ZstdCompressionDict(content, dict_type=dict_type)
+
+
+def _compress(data: bytes, codec: int, dictionary: bytes, raw: bool = False) -> bytes:
+    if codec == CODEC_ZSTD:
+        dict_data = _zstd_dictionary(dictionary, raw) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    compressor = zlib.compressobj(9, zdict=dictionary[-_ZLIB_WINDOW:]) if dictionary else zlib.compressobj(9)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(payload: bytes, codec: int, dictionary: bytes, size: int, raw: bool = False) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise SnapshotError("Snapshot was written with zstd; install the 'zstandard' package to read it")
+        dict_data = _zstd_dictionary(dictionary, raw) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload, max_output_size=size)
+    decompressor = zlib.decompressobj(zdict=dictionary[-_ZLIB_WINDOW:]) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(payload) + decompressor.flush()
+
+
+# ------------------------------
+# 2. Archive
+# ------------------------------
+class SnapshotArchive:
+    """Per-URL append-only snapshot files under ``root``."""
+
+    def __init__(self, root: str = SNAPSHOT_DIR, keyframe_interval: int = KEYFRAME_INTERVAL,
+                 codec: Optional[int] = None):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.codec = codec or (CODEC_ZSTD if zstandard is not None else CODEC_ZLIB)
+        self._lock = threading.RLock()
+        # path -> (file size, url, records); a record is (offset, header fields)
+        self._indexes: Dict[str, Tuple[int, str, List[Tuple[int, Tuple]]]] = {}
+        self._dictionaries: Dict[int, bytes] = {}
+        self._decoded: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.root, f"{snapshot_key(url)}.snap")
+
+    # Dictionaries ---------------------------------------------------------
+    def _dictionary_path(self, dictionary_id: int) -> str:
+        return os.path.join(self.root, DICTIONARY_DIR, f"{dictionary_id:08x}.dict")
+
+    def dictionary(self, dictionary_id: int) -> bytes:
+        if not dictionary_id:
+            return b""
+        content = self._dictionaries.get(dictionary_id)
+        if content is None:
+            try:
+                with open(self._dictionary_path(dictionary_id), "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                raise SnapshotError(f"Missing snapshot dictionary {dictionary_id:08x}")
+            self._dictionaries[dictionary_id] = content
+        return content
+
+    def current_dictionary_id(self) -> int:
+        try:
+            with open(os.path.join(self.root, DICTIONARY_DIR, CURRENT_DICTIONARY), "r", encoding="utf-8") as f:
+                return int(f.read().strip() or "0", 16)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def train(self, samples: Optional[List[bytes]] = None) -> int:
+        """
+        Train a dictionary (by default from the latest capture of every
+        archived profile) and use it for new keyframes. Existing records keep
+        the dictionary they were written with. Returns the dictionary id.
+        """
+        with self._lock:
+            if samples is None:
+                samples = [self.read_bytes_at(path, -1) for path in self._snapshot_paths()]
+            if not samples:
+                raise SnapshotError("No captures to train a dictionary from")
+            content = train_dictionary(samples)
+            dictionary_id = zlib.crc32(content) or 1
+            os.makedirs(os.path.join(self.root, DICTIONARY_DIR), exist_ok=True)
+            path = self._dictionary_path(dictionary_id)
+            if not os.path.exists(path):
+                _write_atomic(path, content)
+            _write_atomic(os.path.join(self.root, DICTIONARY_DIR, CURRENT_DICTIONARY),
+                          f"{dictionary_id:08x}".encode("ascii"))
+            self._dictionaries[dictionary_id] = content
+            print(f"Trained snapshot dictionary {dictionary_id:08x} ({len(content)} bytes, {len(samples)} samples)")
+            return dictionary_id
+
+    # Index ----------------------------------------------------------------
+    def _snapshot_paths(self) -> List[str]:
+        try:
+            names = sorted(name for name in os.listdir(self.root) if name.endswith(".snap"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.root, name) for name in names]
+
+    def _index(self, path: str) -> Tuple[int, str, List[Tuple[int, Tuple]]]:
+        """(valid length, url, records) of a snapshot file, rescanned only when it grew."""
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return 0, "", []
+        cached = self._indexes.get(path)
+        if cached is not None and cached[0] == size:
+            return cached
+
+        with open(path, "rb") as f:
+            if cached is not None:
+                end, url, records = cached[0], cached[1], list(cached[2])
+                f.seek(end)
+            else:
+                if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                    raise SnapshotError(f"Not a snapshot file: {path}")
+                (url_length,) = struct.unpack("<H", f.read(2))
+                url = f.read(url_length).decode("utf-8")
+                records, end = [], f.tell()
+            while True:
+                header = f.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    break
+                fields = _RECORD.unpack(header)
+                offset = end + _RECORD.size
+                if offset + fields[0] > size:
+                    break  # Torn write at the end; ignored, and overwritten by the next append
+                records.append((offset, fields))
+                end = offset + fields[0]
+                f.seek(end)
+        index = (end, url, records)
+        self._indexes[path] = index
+        return index
+
+    # Reading --------------------------------------------------------------
+    def _cache_decoded(self, path: str, version: int, data: bytes) -> None:
+        self._decoded[(path, version)] = data
+        self._decoded.move_to_end((path, version))
+        while len(self._decoded) > DECODED_CACHE_SIZE:
+            self._decoded.popitem(last=False)
+
+    def read_bytes_at(self, path: str, version: int = -1) -> bytes:
+        """Decode one version of a snapshot file (negative versions count from the latest)."""
+        with self._lock:
+            _, _, records = self._index(path)
+            if version < 0:
+                version += len(records)
+            if not 0 <= version < len(records):
+                raise SnapshotError(f"No snapshot version {version} (have {len(records)})")
+            cached = self._decoded.get((path, version))
+            if cached is not None:
+                self._decoded.move_to_end((path, version))
+                return cached
+
+            # Walk back to a keyframe or an already decoded version, then forward
+            start = version
+            while records[start][1][1] != KEYFRAME and (path, start) not in self._decoded:
+                start -= 1
+            with open(path, "rb") as f:
+                data = self._decoded.get((path, start))
+                for current in range(start, version + 1):
+                    if current == start and data is not None:
+                        continue
+                    offset, (length, kind, codec, dictionary_id, _, raw_length, crc) = records[current]
+                    f.seek(offset)
+                    payload = f.read(length)
+                    if kind == KEYFRAME:
+                        data = _decompress(payload, codec, self.dictionary(dictionary_id), raw_length)
+                    else:
+                        data = _decompress(payload, codec, data, raw_length, raw=True)
+                    if zlib.crc32(data) != crc:
+                        raise SnapshotError(f"Corrupt snapshot record {current} in {path}")
+            self._cache_decoded(path, version, data)
+            return data
+
+    def read(self, url: str, version: int = -1) -> str:
+        """The text of one capture of ``url``; -1 (default) is the latest."""
+        return self.read_bytes_at(self._path(url), version).decode("utf-8")
+
+    def versions(self, url: str) -> List[Dict[str, Any]]:
+        """Metadata of every capture of ``url``, oldest first."""
+        _, _, records = self._index(self._path(url))
+        return [
+            {
+                "version": version,
+                "captured_at": captured_at / 1000.0,
+                "kind": "keyframe" if kind == KEYFRAME else "delta",
+                "size": raw_length,
+                "stored_size": length + _RECORD.size,
+            }
+            for version, (_, (length, kind, _, _, captured_at, raw_length, _)) in enumerate(records)
+        ]
+
+    def urls(self) -> List[Dict[str, Any]]:
+        """Every archived profile URL with its number of captures and bytes on disk."""
+        result = []
+        for path in self._snapshot_paths():
+            end, url, records = self._index(path)
+            result.append({"url": url, "captures": len(records), "stored_size": end,
+                           "size": sum(fields[5] for _, fields in records)})
+        return result
+
+    # Writing --------------------------------------------------------------
+    def append(self, url: str, text: str, captured_at: Optional[float] = None) -> int:
+        """Archive a capture of ``url`` and return its version number."""
+        data = text.encode("utf-8")
+        captured_at = time.time() if captured_at is None else captured_at
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            path = self._path(url)
+            end, _, records = self._index(path)
+            version = len(records)
+
+            if version % self.keyframe_interval == 0:
+                dictionary_id = self.current_dictionary_id()
+                if not dictionary_id and version == 0:
+                    dictionary_id = self._maybe_train()
+                payload = _compress(data, self.codec, self.dictionary(dictionary_id))
+                kind = KEYFRAME
+            else:
+                previous = self.read_bytes_at(path, version - 1)
+                payload = _compress(data, self.codec, previous, raw=True)
+                kind, dictionary_id = DELTA, 0
+            record = _RECORD.pack(len(payload), kind, self.codec, dictionary_id,
+                                  int(captured_at * 1000), len(data), zlib.crc32(data)) + payload
+
+            if version == 0:
+                encoded_url = normalize_profile_url(url).encode("utf-8")
+                record = FILE_MAGIC + struct.pack("<H", len(encoded_url)) + encoded_url + record
+                end = 0
+            with open(path, "r+b" if version else "wb") as f:
+                f.truncate(end)
+                f.seek(end)
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            self._cache_decoded(path, version, data)
+            return version
+
+    def _maybe_train(self) -> int:
+        """Train the first dictionary once enough distinct profiles have been archived."""
+        if len(self._snapshot_paths()) < TRAINING_PROFILES:
+            return 0
+        return self.train()
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=None)
+def get_snapshot_archive(root: str = SNAPSHOT_DIR) -> SnapshotArchive:
+    return SnapshotArchive(root)
+
+
+# --------------------------------
+# 3. Main Entry Point
+# --------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the raw profile snapshot archive.")
+    parser.add_argument("--root", default=SNAPSHOT_DIR, help="Snapshot directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List archived profile URLs")
+    show = commands.add_parser("show", help="Print one capture of a profile")
+    show.add_argument("url")
+    show.add_argument("--version", type=int, default=-1, help="Version number (default: latest)")
+    history = commands.add_parser("history", help="List the captures of a profile")
+    history.add_argument("url")
+    commands.add_parser("train", help="Train a compression dictionary for new keyframes")
+    args = parser.parse_args()
+
+    archive = SnapshotArchive(args.root)
+    if args.command == "list":
+        for entry in archive.urls():
+            ratio = entry["size"] / entry["stored_size"] if entry["stored_size"] else 0
+            print(f"{entry['url']}: {entry['captures']} captures, {entry['stored_size']} bytes ({ratio:.1f}x)")
+    elif args.command == "show":
+        print(archive.read(args.url, args.version))
+    elif args.command == "history":
+        for entry in archive.versions(args.url):
+            captured = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["captured_at"]))
+            print(f"v{entry['version']:<4} {captured}  {entry['kind']:<8} {entry['size']:>8} -> {entry['stored_size']} bytes")
+    elif args.command == "train":
+        archive.train()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Overload test of /api/chat with and without admission control.
+
+Runs the chat router in-process (httpx ASGITransport, no network) against
+simulated backends: model completions that take --model-latency seconds, and
+profile extractions that need one of --browsers browsers for --extraction
+seconds each. Requests arrive open-loop (Poisson, --rate per second) from
+--clients clients, one of which sends --greedy-share of all traffic, and
+--tool-share of turns ask for an extraction, which is more than the browsers
+can serve.
+
+Without admission control every request is accepted and waits; with it,
+greedy clients get 429 and requests beyond the bounded queues get 503 with
+Retry-After right away. Reports, per kind of turn, the status codes and the
+p50/p99 latency of successful and rejected requests, plus the deepest queues
+seen in the admission metrics.
+
+Usage:
+    python -m benchmarks.bench_admission [--rate 12] [--duration 15] [--browsers 2]
+        [--tool-share 0.3] [--greedy-share 0.2]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat
+from app.core.config import get_settings
+from app.models.chat import ChatMessage, ChatResponse, ToolCall
+from app.services.admission_service import get_admission_controller
+from app.services.linkedin_service import LinkedInProfile
+from benchmarks.fixtures import synthetic_profile
+
+UNLIMITED = {
+    "CLIENT_RATE_PER_MINUTE": "1000000000",
+    "CLIENT_BURST": "1000000000",
+    "MAX_CONCURRENT_TURNS": "1000000",
+    "MAX_CONCURRENT_TOOL_TURNS": "1000000",
+    "ADMISSION_MAX_QUEUE": "1000000",
+    "ADMISSION_MAX_TOOL_QUEUE": "1000000",
+}
+
+
+def simulated_backends(model_latency: float, extraction_seconds: float, browsers: int):
+    browser_pool = threading.BoundedSemaphore(browsers)
+    profile = LinkedInProfile.model_validate(synthetic_profile(0))
+
+    async def completion(messages):
+        await asyncio.sleep(model_latency)
+        last = messages[-1]
+        if last.role == "user" and last.content.startswith("Extract"):
+            call = ToolCall(id=f"call_{random.getrandbits(32)}", function={
+                "name": "linkedin_highlight_and_extract",
+                "arguments": '{"email": "user@example.com", "password": "secret", '
+                             '"profile_url": "https://www.linkedin.com/in/someone/"}'})
+            return ChatResponse(message=ChatMessage(role="assistant", content="", tool_calls=[call]))
+        return ChatResponse(message=ChatMessage(role="assistant", content="Extraction reads the public profile page."))
+
+    def extraction(email, password, profile_url):
+        with browser_pool:
+            time.sleep(extraction_seconds)
+        return profile
+
+    return completion, extraction
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_load(app, args, rng):
+    clients = {}
+
+    def client_for(name: str) -> httpx.AsyncClient:
+        if name not in clients:
+            transport = httpx.ASGITransport(app=app, client=(name, 40000))
+            clients[name] = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+        return clients[name]
+
+    results = []
+    deepest = Counter()
+
+    async def one(kind: str, client_name: str):
+        text = "Extract https://www.linkedin.com/in/someone/" if kind == "tool" else "How does extraction work?"
+        started = time.perf_counter()
+        response = await client_for(client_name).post("/api/chat", json={"messages": [{"role": "user", "content": text}]})
+        results.append((kind, response.status_code, time.perf_counter() - started,
+                        response.headers.get("retry-after")))
+
+    async def sample_metrics():
+        while True:
+            metrics = get_admission_controller().metrics()
+            for name in ("chat_turns", "tool_turns"):
+                deepest[f"{name} queue"] = max(deepest[f"{name} queue"], metrics[name]["queue_depth"])
+                deepest[f"{name} in flight"] = max(deepest[f"{name} in flight"], metrics[name]["in_flight"])
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_metrics())
+    tasks = []
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(rng.expovariate(args.rate))
+        kind = "tool" if rng.random() < args.tool_share else "plain"
+        client_name = "10.0.0.1" if rng.random() < args.greedy_share else f"10.0.1.{rng.randrange(args.clients)}"
+        tasks.append(asyncio.create_task(one(kind, client_name)))
+    await asyncio.gather(*tasks)
+    sampler.cancel()
+    for client in clients.values():
+        await client.aclose()
+    return results, deepest
+
+
+def report(label: str, results, deepest, elapsed: float) -> None:
+    print(f"{label} ({len(results)} requests, drained in {elapsed:.1f}s)")
+    by_kind = defaultdict(list)
+    for row in results:
+        by_kind[row[0]].append(row)
+    for kind in ("plain", "tool"):
+        rows = by_kind[kind]
+        statuses = Counter(status for _, status, _, _ in rows)
+        ok = [seconds for _, status, seconds, _ in rows if status == 200]
+        shed = [seconds for _, status, seconds, _ in rows if status != 200]
+        retry_after = [float(value) for _, _, _, value in rows if value]
+        print(f"  {kind:<6} {dict(sorted(statuses.items()))}")
+        print(f"         200: p50 {percentile(ok, 50):6.2f}s  p99 {percentile(ok, 99):6.2f}s  max {max(ok, default=float('nan')):6.2f}s")
+        if shed:
+            print(f"         rejected: p99 {percentile(shed, 99) * 1000:6.1f} ms, "
+                  f"Retry-After {statistics.mean(retry_after):.1f}s on average")
+    if deepest:
+        print("  deepest: " + ", ".join(f"{name} {value}" for name, value in deepest.items()))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=float, default=12.0, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of arrivals")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--greedy-share", type=float, default=0.2)
+    parser.add_argument("--tool-share", type=float, default=0.3)
+    parser.add_argument("--browsers", type=int, default=2)
+    parser.add_argument("--extraction", type=float, default=1.0, help="Seconds per extraction")
+    parser.add_argument("--model-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    capacity = args.browsers / args.extraction
+    print(f"{args.rate:.0f} req/s for {args.duration:.0f}s, {args.tool_share:.0%} extraction turns "
+          f"({args.rate * args.tool_share:.1f}/s offered vs {capacity:.1f}/s capacity)\n")
+
+    completion, extraction = simulated_backends(args.model_latency, args.extraction, args.browsers)
+    chat.get_chat_completion = completion
+    chat.linkedin_highlight_and_extract = extraction
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+
+    scenarios = [
+        ("no admission control", UNLIMITED),
+        ("admission control", {"MAX_CONCURRENT_TOOL_TURNS": str(args.browsers)}),
+    ]
+    for label, environment in scenarios:
+        saved = {name: os.environ.get(name) for name in UNLIMITED}
+        os.environ.update(environment)
+        get_settings.cache_clear()
+        get_admission_controller.cache_clear()
+        try:
+            started = time.perf_counter()
+            # The chat route logs every tool message; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                results, deepest = asyncio.run(run_load(app, args, random.Random(7)))
+            report(label, results, deepest, time.perf_counter() - started)
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            get_settings.cache_clear()
+            get_admission_controller.cache_clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+DOCX rendering throughput with cached ResumeStyle themes.
+
+Compares the previous approach (a blank python-docx `Document()` per render,
+saved with `Document.save`) with rendering into a cached theme, for many
+profiles in one theme and for one profile in several themes. Also reports the
+one-off cost of building a theme.
+
+Usage:
+    python -m benchmarks.bench_docx_themes [--profiles 200] [--themes 8]
+"""
+
+import argparse
+import io
+import time
+
+from docx import Document
+
+from app.services.docx_theme_service import ResumeStyle, get_theme
+from app.services.profile_render_service import add_markdown_lines, render_docx, render_docx_themes, render_markdown
+from benchmarks.fixtures import profile_list
+
+PALETTE = [(0, 0, 0), (31, 56, 100), (120, 20, 40), (20, 90, 60)]
+FONTS = ["Calibri", "Georgia", "Arial", "Garamond"]
+
+
+def blank_document_docx(profile) -> bytes:
+    """The pre-theme render: blank template, unstyled, full package save."""
+    doc = Document()
+    add_markdown_lines(doc, render_markdown(profile).split("\n"))
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def themed_docx(profile, style=None) -> bytes:
+    buffer = io.BytesIO()
+    render_docx(profile, buffer, style)
+    return buffer.getvalue()
+
+
+def rate(label: str, count: int, seconds: float, baseline: float = None) -> float:
+    speedup = f"  ({baseline / seconds:.1f}x)" if baseline else ""
+    print(f"{label:<44}{count / seconds:>9.1f}/s{speedup}")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--themes", type=int, default=8)
+    args = parser.parse_args()
+
+    profiles = profile_list(args.profiles)
+    styles = [
+        ResumeStyle(font_name=FONTS[i % len(FONTS)], heading_color=PALETTE[i % len(PALETTE)],
+                    margins=0.5 + 0.125 * i, name_size=18 + i % 3)
+        for i in range(args.themes)
+    ]
+
+    started = time.perf_counter()
+    for style in styles:
+        get_theme(style)
+    get_theme()
+    print(f"Built {len(styles) + 1} themes in {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"({(time.perf_counter() - started) * 1000 / (len(styles) + 1):.1f} ms each, once per style)")
+
+    print(f"\nMany profiles, one theme ({len(profiles)} profiles)")
+    started = time.perf_counter()
+    for profile in profiles:
+        blank_document_docx(profile)
+    baseline = rate("blank Document() per render", len(profiles), time.perf_counter() - started)
+    started = time.perf_counter()
+    for profile in profiles:
+        themed_docx(profile)
+    rate("cached theme", len(profiles), time.perf_counter() - started, baseline)
+
+    sample = profiles[:max(1, len(profiles) // 10)]
+    print(f"\nOne profile, {len(styles)} themes ({len(sample)} profiles)")
+    started = time.perf_counter()
+    for profile in sample:
+        for style in styles:
+            blank_document_docx(profile)
+    baseline = rate("blank Document() per theme", len(sample) * len(styles), time.perf_counter() - started)
+    started = time.perf_counter()
+    for profile in sample:
+        for style in styles:
+            themed_docx(profile, style)
+    rate("cached theme, rendered per theme", len(sample) * len(styles), time.perf_counter() - started, baseline)
+    started = time.perf_counter()
+    for profile in sample:
+        render_docx_themes(profile, styles)
+    rate("render once, package per theme", len(sample) * len(styles), time.perf_counter() - started, baseline)
+
+    size = len(blank_document_docx(profiles[0])), len(themed_docx(profiles[0]))
+    print(f"\nDocument size: {size[0] / 1024:.1f} KB blank template, {size[1] / 1024:.1f} KB themed")
+
+
+if __name__ == "__main__":
+    main()
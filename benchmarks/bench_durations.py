@@ -0,0 +1,99 @@
+"""
+Duration parsing and career analytics at corpus scale.
+
+Compares the ad hoc approach (parse every duration string as it is met, then
+merge each profile's roles in a Python loop) with the memoized parser feeding
+NumPy columns and the vectorized per-profile statistics, and checks both give
+the same total experience.
+
+Usage:
+    python -m benchmarks.bench_durations [--profiles 100000]
+"""
+
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+
+from app.services.duration_service import (
+    career_analytics,
+    career_stats,
+    current_month_index,
+    experience_columns,
+    parse_duration,
+)
+from benchmarks.fixtures import synthetic_profiles
+
+AS_OF = date(2024, 12, 1)
+
+
+def loop_total_months(profiles) -> np.ndarray:
+    """The ad hoc version: uncached parsing and per-profile interval merging."""
+    parse = parse_duration.__wrapped__
+    now = current_month_index(AS_OF)
+    totals = np.zeros(len(profiles), dtype=np.int64)
+    for i, data in enumerate(profiles):
+        spans = []
+        for exp in data.get("experience") or []:
+            parsed = parse(exp.get("duration"))
+            if parsed is None or parsed[0] < 0:
+                continue
+            start, end, _, current = parsed
+            if current:
+                end = max(now + 1, start + 1)
+            if end >= 0:
+                spans.append((start, end))
+        spans.sort()
+        total, reach = 0, None
+        for start, end in spans:
+            if reach is None or start >= reach:
+                total += end - start
+                reach = end
+            elif end > reach:
+                total += end - reach
+                reach = end
+        totals[i] = total
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    profiles = list(synthetic_profiles(args.profiles))
+    roles = sum(len(data["experience"]) for data in profiles)
+    print(f"{len(profiles)} profiles, {roles} roles; generated in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    expected = loop_total_months(profiles)
+    baseline = time.perf_counter() - started
+    print(f"\n{'ad hoc parse + Python merge':<40}{baseline * 1000:>9.0f} ms  {roles / baseline:>12,.0f} roles/s")
+
+    parse_duration.cache_clear()
+    for label in ("columns + vectorized stats (cold cache)", "columns + vectorized stats (warm cache)"):
+        started = time.perf_counter()
+        columns = experience_columns(profiles, AS_OF)
+        parsed = time.perf_counter() - started
+        stats = career_stats(columns)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<40}{elapsed * 1000:>9.0f} ms  {roles / elapsed:>12,.0f} roles/s  "
+              f"({baseline / elapsed:.1f}x; stats {(elapsed - parsed) * 1000:.0f} ms)")
+    info = parse_duration.cache_info()
+    print(f"Distinct duration strings: {info.currsize} ({info.currsize / roles:.1%} of roles)")
+
+    mismatches = int(np.count_nonzero(stats["total_months"] != expected))
+    print(f"Total experience mismatches vs. loop: {mismatches}")
+
+    started = time.perf_counter()
+    report = career_analytics(profiles, AS_OF)
+    print(f"\nFull career_analytics report in {(time.perf_counter() - started) * 1000:.0f} ms: "
+          f"median experience {report['total_experience_years']['p50']} years, "
+          f"median tenure {report['tenure_months']['p50']} months, "
+          f"{report['gaps']['share']:.0%} of profiles with a gap")
+
+
+if __name__ == "__main__":
+    main()
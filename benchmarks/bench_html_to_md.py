@@ -0,0 +1,92 @@
+"""
+Time and peak memory of the HTML-to-Markdown engines in other_tools/html_to_md.py.
+
+Converts synthetic API-reference pages (`benchmarks.fixtures.documentation_page`)
+of increasing size, stored as local files, with the previous BeautifulSoup +
+html2text pipeline, the single-parse lxml engine (both on the page read into
+memory) and the streaming mode (file to file). Peak memory is measured in a fresh process as the
+growth of its resident set (VmHWM, reset through /proc/self/clear_refs, so
+Linux only) during one conversion, so libxml2's C allocations are included.
+
+Usage:
+    python -m benchmarks.bench_html_to_md [--sections 100 1000 5000] [--repeat N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fixtures import documentation_page
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "other_tools"))
+import html_to_md  # noqa: E402
+
+ENGINES = ("html2text", "tree", "stream")
+SETTINGS = {"keep_links": True, "keep_images": True, "keep_emphasis": True, "generate_toc": False}
+
+
+def _memory_status(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"{field} not available")
+
+
+def convert(path, output_path, engine):
+    """One conversion as a user would run it: the in-memory engines read the whole page first."""
+    if engine == "stream":
+        html_to_md.stream_source_to_file(path, output_path, SETTINGS)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html_to_md.convert_html_to_markdown(html, engine=engine))
+
+
+def peak_rss_growth(path, output_path, engine):
+    """Runs in a fresh process: peak RSS added by one conversion, in bytes."""
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # Reset the high-water mark to the current RSS
+    baseline = _memory_status("VmRSS")
+    convert(path, output_path, engine)
+    return _memory_status("VmHWM") - baseline
+
+
+def measure(path, output_path, engine, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        convert(path, output_path, engine)
+        timings.append(time.perf_counter() - started)
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        peak = pool.submit(peak_rss_growth, path, output_path, engine).result()
+    return min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'page':>10}{'engine':>12}{'best time':>12}{'peak mem':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "page.html")
+        output_path = os.path.join(workdir, "page.md")
+        for sections in args.sections:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(documentation_page(sections))
+            size = os.path.getsize(path)
+            for engine in ENGINES:
+                seconds, peak = measure(path, output_path, engine, args.repeat)
+                print(f"{size / 1e6:>8.2f}MB{engine:>12}{seconds:>11.3f}s{peak / 1e6:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Request/response serialization of the chat API.
+
+For a realistic conversation (10 messages) and a large one (1,000 messages)
+compares:
+
+- response encoding: FastAPI's path for a returned model (dump, re-validate
+  against response_model, jsonable_encoder, json.dumps) with
+  FastJSONResponse,
+- history encoding: jsonable_encoder + json.dumps with the pre-built
+  CHAT_MESSAGES_ADAPTER,
+- request decoding: json.loads + validation (what FastAPI does with the body)
+  with validating straight from the JSON bytes,
+- message construction: one validated constructor per message with a single
+  CHAT_MESSAGES_ADAPTER.validate_python call.
+
+Every fast path is checked to produce the same JSON as the default one. For
+reference it also times model_construct, which skips validation but runs in
+Python and is slower than pydantic-core's validators for these models.
+
+Usage:
+    python -m benchmarks.bench_json_serialization [--sizes 10,1000] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import FastJSONResponse, orjson
+from app.models.chat import CHAT_MESSAGES_ADAPTER, ChatMessage, ChatRequest, ChatResponse, ToolCall
+from app.services.linkedin_service import LinkedInProfile
+from app.services.response_formatter_service import ResponseFormatter
+from benchmarks.fixtures import synthetic_profile
+
+RESPONSE_FIELD = create_response_field(name="Response_chat", type_=ChatResponse, mode="serialization")
+LOOP = asyncio.new_event_loop()
+
+
+def conversation(size: int, seed: int = 0):
+    """Raw message dicts of a chat with occasional profile extractions."""
+    rng = random.Random(seed)
+    messages = []
+    while len(messages) < size:
+        if rng.random() < 0.2:
+            call_id = f"call_{len(messages)}"
+            messages.append({"role": "assistant", "content": "", "tool_calls": [{
+                "id": call_id, "type": "function", "function": {
+                    "name": "linkedin_highlight_and_extract",
+                    "arguments": json.dumps({"email": "user@example.com", "password": "secret",
+                                             "profile_url": f"https://www.linkedin.com/in/profile-{len(messages)}/"}),
+                }}]})
+            messages.append({"role": "tool", "tool_call_id": call_id, "name": "linkedin_highlight_and_extract",
+                             "content": ResponseFormatter.format_profile_for_model(synthetic_profile(len(messages)))})
+        else:
+            messages.append({"role": "user", "content": f"Summarize the experience of profile {len(messages)}."})
+            messages.append({"role": "assistant", "content": ResponseFormatter.format_response(
+                f"**Summary**\n- {rng.randint(2, 20)} years of experience\n- Strong in search and data")})
+    return messages[:size]
+
+
+def default_response(response: ChatResponse) -> bytes:
+    content = LOOP.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=response))
+    return JSONResponse(content).body
+
+
+def timed(function, repeat: int):
+    result = function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def row(label: str, default, fast) -> None:
+    (slow_seconds, _), (fast_seconds, _) = default, fast
+    print(f"  {label:<34}{slow_seconds * 1e6:>12,.0f} us{fast_seconds * 1e6:>12,.0f} us{slow_seconds / fast_seconds:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10,1000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"orjson {'installed' if orjson is not None else 'not installed (stdlib json fallback)'}\n")
+    profile = LinkedInProfile.model_validate(synthetic_profile(0))
+    profile_data = profile.model_dump()
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        raw = conversation(size)
+        messages = [ChatMessage.model_validate(message) for message in raw]
+        body = json.dumps({"messages": raw}).encode("utf-8")
+        repeat = max(3, args.repeat * 10 // max(size, 10))
+        response = ChatResponse(
+            message=ChatMessage(role="assistant",
+                                content=ResponseFormatter.format_extraction_result([profile_data])),
+            profile_data=profile_data,
+            usage={"prompt_tokens": 120 * size, "completion_tokens": 80, "cached_tokens": 100 * size},
+        )
+        print(f"{size} messages ({len(body) / 1024:,.0f} KB request body){'':<8}{'default':>15}{'fast':>15}")
+
+        default, fast = timed(lambda: default_response(response), repeat), timed(lambda: FastJSONResponse(response).body, repeat)
+        assert json.loads(default[1]) == json.loads(fast[1])
+        row("response (profile + message)", default, fast)
+
+        default = timed(lambda: json.dumps(jsonable_encoder(messages)).encode("utf-8"), repeat)
+        fast = timed(lambda: CHAT_MESSAGES_ADAPTER.dump_json(messages), repeat)
+        assert json.loads(default[1]) == json.loads(fast[1])
+        row("history encode", default, fast)
+
+        default = timed(lambda: ChatRequest.model_validate(json.loads(body)), repeat)
+        fast = timed(lambda: ChatRequest.model_validate_json(body), repeat)
+        assert default[1] == fast[1]
+        row("request decode", default, fast)
+
+        def validated():
+            return [ChatMessage(role=m["role"], content=m["content"], tool_call_id=m.get("tool_call_id"),
+                                name=m.get("name"),
+                                tool_calls=[ToolCall(**call) for call in m["tool_calls"]] if m.get("tool_calls") else None)
+                    for m in raw]
+
+        def constructed():
+            return [ChatMessage.model_construct(role=m["role"], content=m["content"], tool_call_id=m.get("tool_call_id"),
+                                                name=m.get("name"),
+                                                tool_calls=[ToolCall.model_construct(**call) for call in m["tool_calls"]]
+                                                if m.get("tool_calls") else None)
+                    for m in raw]
+
+        default, fast = timed(validated, repeat), timed(lambda: CHAT_MESSAGES_ADAPTER.validate_python(raw), repeat)
+        assert CHAT_MESSAGES_ADAPTER.dump_json(default[1]) == CHAT_MESSAGES_ADAPTER.dump_json(fast[1])
+        row("message construction", default, fast)
+        reference = timed(constructed, repeat)
+        assert CHAT_MESSAGES_ADAPTER.dump_json(reference[1]) == CHAT_MESSAGES_ADAPTER.dump_json(fast[1])
+        print(f"  {'(model_construct, no validation)':<34}{'':>15}{reference[0] * 1e6:>12,.0f} us")
+        print()
+
+    repeat = args.repeat * 10
+    validated = timed(lambda: LinkedInProfile.model_validate(profile_data), repeat)[0]
+    constructed = timed(lambda: LinkedInProfile.model_construct(**profile_data), repeat)[0]
+    print(f"Re-validating a stored profile: {validated * 1e6:.1f} us "
+          f"(a shallow model_construct alone takes {constructed * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
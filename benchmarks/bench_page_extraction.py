@@ -0,0 +1,123 @@
+"""
+In-page profile extraction against local fixture pages.
+
+Loads LinkedIn-like fixture pages (`fixtures.profile_page_html`) in headless
+Chrome and extracts each one twice:
+
+- the previous flow: `find_elements` per selector, one `execute_script` per
+  "see more" click (with the original 1 s pause, or --click-pause), two
+  selection scripts and a final `document.body.innerText`,
+- the single `execute_async_script` call of page_extraction_service.
+
+Reports WebDriver calls and time per page, and how much of each profile
+(complete role descriptions, roles behind "Show all", the lazily loaded
+section) ends up in the extracted text.
+
+Usage:
+    python -m benchmarks.bench_page_extraction [--pages 10] [--click-pause 1.0]
+        [--chrome-binary PATH] [--chromedriver PATH]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+
+from app.services.page_extraction_service import extract_profile_sections, sections_to_text
+from benchmarks.fixtures import profile_page_html
+
+LEGACY_SELECTORS = [".inline-show-more-text__button.inline-show-more-text__button--light.link"]
+
+
+def legacy_extract(driver, click_pause: float):
+    """The previous extraction flow. Returns (text, WebDriver calls)."""
+    calls = 0
+    for selector in LEGACY_SELECTORS:
+        buttons = driver.find_elements(By.CSS_SELECTOR, selector)
+        calls += 1
+        for button in buttons:
+            driver.execute_script("arguments[0].click();", button)
+            calls += 1
+            time.sleep(click_pause)
+    driver.execute_script("window.getSelection().removeAllRanges();")
+    driver.execute_script("const range = document.createRange(); range.selectNode(document.body); "
+                          "window.getSelection().addRange(range);")
+    text = driver.execute_script("return document.body.innerText")
+    return text, calls + 3
+
+
+def coverage(text: str, profile) -> dict:
+    descriptions = [exp["description"] for exp in profile["experience"] if exp["description"]]
+    return {
+        "roles": sum(exp["title"] in text and exp["duration"] in text for exp in profile["experience"])
+        / len(profile["experience"]),
+        "descriptions": sum(description in text for description in descriptions) / len(descriptions)
+        if descriptions else 1.0,
+        "about": profile["about"] in text,
+        "lazy_section": all(language in text for language in profile["languages"] or ["English"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--click-pause", type=float, default=1.0, help="Pause after each legacy click (the original flow slept 1 s)")
+    parser.add_argument("--chrome-binary", default=None)
+    parser.add_argument("--chromedriver", default=None)
+    args = parser.parse_args()
+
+    options = Options()
+    for argument in ("--headless=new", "--no-sandbox", "--disable-gpu", "--disable-dev-shm-usage"):
+        options.add_argument(argument)
+    if args.chrome_binary:
+        options.binary_location = args.chrome_binary
+    service = Service(args.chromedriver) if args.chromedriver else None
+    driver = webdriver.Chrome(options=options, service=service)
+
+    results = {"legacy": [], "script": []}
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            for index in range(args.pages):
+                page, profile = profile_page_html(index, visible_roles=2)
+                path = os.path.join(directory, f"profile_{index}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(page)
+                url = f"file://{path}"
+
+                driver.get(url)
+                # The old flow waited a fixed 5 s after navigation; give the lazy section time to load
+                time.sleep(0.5)
+                started = time.perf_counter()
+                text, calls = legacy_extract(driver, args.click_pause)
+                results["legacy"].append((time.perf_counter() - started, calls, coverage(text, profile), len(text)))
+
+                driver.get(url)
+                started = time.perf_counter()
+                extracted = extract_profile_sections(driver)
+                text = sections_to_text(extracted)
+                results["script"].append((time.perf_counter() - started, 2, coverage(text, profile), len(text)))
+        finally:
+            driver.quit()
+
+    print(f"{args.pages} fixture pages\n")
+    print(f"{'':<28}{'time/page':>10}{'calls':>7}{'roles':>8}{'full desc.':>12}{'about':>7}{'lazy':>6}{'chars':>8}")
+    for label, name in (("find/click/innerText", "legacy"), ("single async script", "script")):
+        rows = results[name]
+        print(f"{label:<28}{statistics.mean(r[0] for r in rows):>9.2f}s"
+              f"{statistics.mean(r[1] for r in rows):>7.1f}"
+              f"{statistics.mean(r[2]['roles'] for r in rows):>8.0%}"
+              f"{statistics.mean(r[2]['descriptions'] for r in rows):>12.0%}"
+              f"{statistics.mean(r[2]['about'] for r in rows):>7.0%}"
+              f"{statistics.mean(r[2]['lazy_section'] for r in rows):>6.0%}"
+              f"{statistics.mean(r[3] for r in rows):>8.0f}")
+    print("\nThe script's time includes waiting for the page to stop changing after the last expansion.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+PDF export throughput in pages per second.
+
+Renders synthetic profiles with the pure-Python PDF renderer: in one process
+(reporting the split between layout and PDF serialization, and the one-off
+cost of building the font tables and page template), then as a batch export
+to files on a process pool.
+
+Usage:
+    python -m benchmarks.bench_pdf_render [--profiles 1000] [--workers N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.services.docx_theme_service import ResumeStyle
+from app.services.pdf_render_service import (
+    get_font_metrics,
+    layout_profile,
+    page_template,
+    render_pdf_bytes,
+    render_pdfs_batch,
+    write_pdf,
+)
+from benchmarks.fixtures import profile_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    profiles = profile_list(args.profiles)
+    style = ResumeStyle()
+
+    started = time.perf_counter()
+    for font in ("F1", "F2", "F3"):
+        get_font_metrics(font)
+    page_template(style)
+    print(f"Font tables and page template built in {(time.perf_counter() - started) * 1000:.2f} ms (once per process)")
+
+    # Warm the per-word width caches the way a long-running worker would
+    render_pdf_bytes(profiles[0], style)
+
+    layout_seconds = write_seconds = 0.0
+    pages = size = 0
+    for profile in profiles:
+        started = time.perf_counter()
+        layout = layout_profile(profile, style)
+        layout_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        pdf = write_pdf(layout, profile["name"])
+        write_seconds += time.perf_counter() - started
+        pages += len(layout.pages)
+        size += len(pdf)
+    total = layout_seconds + write_seconds
+    print(f"\nSingle process: {len(profiles)} profiles, {pages} pages ({pages / len(profiles):.1f}/profile, "
+          f"{size / len(profiles) / 1024:.1f} KB/profile)")
+    print(f"{pages / total:>10.0f} pages/s  {len(profiles) / total:>8.0f} profiles/s  "
+          f"({layout_seconds / total:.0%} layout, {write_seconds / total:.0%} PDF serialization)")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        items = [(profile, os.path.join(output_dir, f"{i}.pdf")) for i, profile in enumerate(profiles)]
+        for workers in sorted({1, args.workers}):
+            summary = render_pdfs_batch(items, style, workers=workers)
+            print(f"\nBatch export to files, {workers} worker(s): {summary['documents']} PDFs, "
+                  f"{summary['pages']} pages in {summary['elapsed_seconds']:.2f}s")
+            print(f"{summary['pages_per_second']:>10.0f} pages/s  "
+                  f"{summary['documents'] / summary['elapsed_seconds']:>8.0f} profiles/s"
+                  + (f"  ({summary['failed']} failed)" if summary["failed"] else ""))
+
+
+if __name__ == "__main__":
+    main()
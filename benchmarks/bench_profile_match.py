@@ -0,0 +1,84 @@
+"""
+Latency of ranking profiles against job descriptions with the BM25 match matrix.
+
+Builds the match index over N synthetic profiles, then times ranking all of
+them against one job description (as served by `/api/profiles/match`), a
+batch of job descriptions ranked in one matrix product, and, for reference, a
+per-profile Python loop computing the same scores.
+
+Usage:
+    python -m benchmarks.bench_profile_match [--profiles 10000,100000] [--runs 20] [--batch 32]
+"""
+
+import argparse
+import statistics
+import time
+
+from app.services.profile_match_service import MatchIndex
+from benchmarks.fixtures import job_description, synthetic_profiles
+
+
+def python_loop_scores(rows, query_weights):
+    """Score every profile with plain dict lookups (the pre-matrix approach)."""
+    return [sum(weight * row.get(term, 0.0) for term, weight in query_weights.items()) for row in rows]
+
+
+def percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def bench(n_profiles: int, runs: int, batch: int) -> None:
+    index = MatchIndex()
+    started = time.perf_counter()
+    index.add((f"{i:016x}", data) for i, data in enumerate(synthetic_profiles(n_profiles)))
+    build = time.perf_counter() - started
+    started = time.perf_counter()
+    index._reweight()
+    reweight = time.perf_counter() - started
+    matrix = index.matrix
+    print(f"\n{n_profiles} profiles: {matrix.shape[1]} terms, {matrix.nnz} non-zeros; "
+          f"build {build:.1f}s incl. fixture generation, BM25 reweight {reweight * 1000:.0f} ms")
+
+    jobs = [job_description(seed) for seed in range(max(runs, batch))]
+
+    timings = []
+    for text in jobs[:runs]:
+        query_started = time.perf_counter()
+        index.rank([text], top_k=20)
+        timings.append((time.perf_counter() - query_started) * 1000)
+    single_p50 = statistics.median(timings)
+    print(f"  1 job description:    p50 {single_p50:7.1f} ms   p95 {percentile(timings, 0.95):7.1f} ms")
+
+    started = time.perf_counter()
+    index.rank(jobs[:batch], top_k=20)
+    batch_ms = (time.perf_counter() - started) * 1000
+    print(f"  {batch} job descriptions: {batch_ms:7.1f} ms total, {batch_ms / batch:.1f} ms each")
+
+    rows = [
+        dict(zip(matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]].tolist(),
+                 matrix.data[matrix.indptr[i]:matrix.indptr[i + 1]].tolist()))
+        for i in range(matrix.shape[0])
+    ]
+    query = index.query_matrix(jobs[:1], matrix.shape[1])
+    query_weights = dict(zip(query.indices.tolist(), query.data.tolist()))
+    started = time.perf_counter()
+    python_loop_scores(rows, query_weights)
+    loop_ms = (time.perf_counter() - started) * 1000
+    print(f"  Python loop (scores only, 1 job description): {loop_ms:7.1f} ms "
+          f"({loop_ms / single_p50:.0f}x the matrix path incl. top-k)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", default="10000,100000", help="Comma-separated index sizes")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    for n_profiles in (int(size) for size in args.profiles.split(",")):
+        bench(n_profiles, args.runs, args.batch)
+
+
+if __name__ == "__main__":
+    main()
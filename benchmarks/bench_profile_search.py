@@ -0,0 +1,63 @@
+"""
+Query latency of the profile search index (SQLite FTS5) at scale.
+
+Indexes N synthetic profiles into a temporary database, then times a mix of
+free-text, prefix, field-filtered and paginated queries (count + one page of
+ranked results, as served by `/api/profiles/search`).
+
+Usage:
+    python -m benchmarks.bench_profile_search [--profiles 100000] [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.services.profile_index_service import index_profiles, search_profiles
+from benchmarks.fixtures import synthetic_profiles
+
+QUERIES = [
+    ("single skill", {"query": "kubernetes"}),
+    ("prefix", {"query": "terra"}),
+    ("multi-term text", {"query": "distributed payments latency"}),
+    ("name", {"query": "Priya Patel"}),
+    ("skill filter", {"skill": "machine learning"}),
+    ("company + title", {"company": "Globex", "title": "staff engineer"}),
+    ("text + school", {"query": "search ranking", "school": "Stanford"}),
+    ("page 10", {"query": "python", "page": 10}),
+    ("rare term", {"query": "Tyrell", "skill": "Rust"}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "search.sqlite3")
+        started = time.perf_counter()
+        index_profiles(((f"{i:016x}", data, None) for i, data in enumerate(synthetic_profiles(args.profiles))), db_path)
+        print(f"Indexed {args.profiles} profiles in {time.perf_counter() - started:.1f}s "
+              f"({os.path.getsize(db_path) / 1e6:.0f} MB)")
+
+        print(f"{'query':<18}{'hits':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+        worst = 0.0
+        for label, params in QUERIES:
+            timings = []
+            for _ in range(args.runs):
+                query_started = time.perf_counter()
+                result = search_profiles(db_path=db_path, **params)
+                timings.append((time.perf_counter() - query_started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            worst = max(worst, p95)
+            print(f"{label:<18}{result['total']:>8}{statistics.median(timings):>9.1f}{p95:>9.1f}{timings[-1]:>9.1f}")
+        print(f"Slowest p95: {worst:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
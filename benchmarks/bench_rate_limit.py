@@ -0,0 +1,105 @@
+"""
+The model call scheduler against the local 429-injecting stub.
+
+Drives `ModelCallScheduler` against `RateLimitStub` (tests/rate_limit_stub.py),
+with no API key needed:
+
+- priority: with one slot busy, background calls queue first and interactive
+  calls arrive after them; the interactive ones must be served first,
+- budget tracking and retries: many concurrent calls against a small
+  requests-per-window budget with randomly injected 429s. Every call must
+  succeed. The scheduler reads the `x-ratelimit-*` headers, so the stub
+  should reject little beyond the injected 429s. For comparison, the same load
+  runs with the headers ignored.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--calls 60] [--threads 8] [--rpw 10] [--inject 0.1]
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.rate_limit_service import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    ModelCallScheduler,
+    RateLimitBudget,
+)
+from tests.rate_limit_stub import RateLimitStub
+
+
+class HeaderBlindBudget(RateLimitBudget):
+    """A budget that never learns the limits, as if no headers were tracked."""
+
+    def update(self, headers) -> None:
+        pass
+
+
+def check_priority() -> None:
+    stub = RateLimitStub(requests_per_window=1000, tokens_per_window=10 ** 9, latency=0.1)
+    scheduler = ModelCallScheduler(max_concurrency=1)
+    order = []
+    lock = threading.Lock()
+
+    def call(label: str, priority: int) -> None:
+        scheduler.call(lambda: stub(100), priority=priority, estimated_tokens=100)
+        with lock:
+            order.append(label)
+
+    threads = [threading.Thread(target=call, args=("B0", PRIORITY_BACKGROUND))]
+    threads[0].start()
+    time.sleep(0.02)
+    for label, priority in [*((f"B{i}", PRIORITY_BACKGROUND) for i in range(1, 6)),
+                            *((f"I{i}", PRIORITY_INTERACTIVE) for i in range(1, 6))]:
+        thread = threading.Thread(target=call, args=(label, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+
+    served_after_first = order[1:]
+    interactive_first = all(label.startswith("I") for label in served_after_first[:5])
+    print(f"Priority: served {' '.join(order)}")
+    print(f"  interactive calls queued after background ones were served first: {interactive_first}\n")
+    assert interactive_first
+
+
+def run_load(label: str, args, blind: bool) -> None:
+    stub = RateLimitStub(requests_per_window=args.rpw, tokens_per_window=args.rpw * 1000, window=1.0,
+                         inject_429_rate=args.inject, seed=1)
+    scheduler = ModelCallScheduler(max_concurrency=args.threads, max_retries=20, base_delay=0.05, max_delay=2.0)
+    if blind:
+        scheduler.budget = HeaderBlindBudget()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(lambda _: scheduler.call(lambda: stub(100), estimated_tokens=100),
+                                range(args.calls)))
+    elapsed = time.perf_counter() - started
+    assert results == ["ok"] * args.calls
+
+    stats = scheduler.stats
+    print(f"{label:<24}{elapsed:>7.1f}s  {args.calls / elapsed:>6.1f} calls/s  "
+          f"stub 429s {stub.rejected:>4}  retries {stats['retries']:>4}  failed {stats['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rpw", type=int, default=10, help="Requests per 1 s window allowed by the stub")
+    parser.add_argument("--inject", type=float, default=0.1, help="Probability of an injected 429")
+    args = parser.parse_args()
+
+    check_priority()
+    print(f"Budget and retries: {args.calls} calls from {args.threads} threads, "
+          f"{args.rpw} requests/s allowed, {args.inject:.0%} injected 429s")
+    run_load("tracking headers", args, blind=False)
+    run_load("ignoring headers", args, blind=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Response cache hit rate and latency on repeated informational chat turns.
+
+Replays a chat workload through the /api/chat route in-process (httpx
+ASGITransport) with a simulated model (--model-latency seconds per
+completion). Most turns are a handful of common questions, written with
+varying case, spacing and punctuation and drawn with a Zipf-like skew. The
+rest are one-off questions, plus questions about passwords and logins and
+extraction requests with credentials, which must bypass the cache.
+
+Runs the workload with the cache disabled and enabled, and reports the hit
+rate, completions made, and p50/p99 latency of hits, misses and bypassed
+turns. Also checks that every cached answer equals the freshly generated one.
+
+Usage:
+    python -m benchmarks.bench_response_cache [--requests 2000] [--concurrency 8]
+        [--model-latency 0.3]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import time
+from collections import defaultdict
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.routes import chat
+from app.core.config import get_settings
+from app.models.chat import ChatMessage, ChatResponse, ToolCall
+from app.services.admission_service import get_admission_controller
+from app.services.linkedin_service import LinkedInProfile
+from app.services.response_cache_service import get_response_cache
+from benchmarks.fixtures import synthetic_profile
+
+COMMON_QUESTIONS = [
+    "How does extraction work?",
+    "Which sections are extracted?",
+    "What formats can I download?",
+    "Can I change the resume theme?",
+    "Do you store my LinkedIn data?",
+    "How long does an extraction take?",
+    "Does it work with private profiles?",
+    "Can I export to PDF?",
+]
+# Never cached: they may carry credentials
+LOGIN_QUESTIONS = [
+    "Is my password safe?",
+    "Why do you need my LinkedIn login?",
+    "my pass is hunter2, is that ok?",
+]
+SETTINGS = {
+    "CLIENT_RATE_PER_MINUTE": "1000000000",
+    "CLIENT_BURST": "1000000000",
+    "MAX_CONCURRENT_TURNS": "1000",
+    "CHAT_FAST_PATH_FOLLOWUP": "false",
+}
+
+
+def variant(question: str, rng: random.Random) -> str:
+    """The same question as different users type it."""
+    text = question
+    if rng.random() < 0.3:
+        text = text.lower()
+    if rng.random() < 0.2:
+        text = text.rstrip("?") + (" ?" if rng.random() < 0.5 else "")
+    if rng.random() < 0.2:
+        text = "  " + text.replace(" ", "  ", 1)
+    return text
+
+
+def workload(count: int, rng: random.Random):
+    weights = [1 / (rank + 1) for rank in range(len(COMMON_QUESTIONS))]
+    for index in range(count):
+        draw = rng.random()
+        if draw < 0.1:
+            yield "tool", (f"Extract my profile https://www.linkedin.com/in/user-{index}/ "
+                           f"email user{index}@example.com password is secret{index}")
+        elif draw < 0.15:
+            yield "login", variant(rng.choice(LOGIN_QUESTIONS), rng)
+        elif draw < 0.3:
+            yield "unique", f"Question number {index}: what about section {rng.randrange(10 ** 6)}?"
+        else:
+            yield "common", variant(rng.choices(COMMON_QUESTIONS, weights)[0], rng)
+
+
+def simulated_model(model_latency: float):
+    profile = LinkedInProfile.model_validate(synthetic_profile(0))
+    calls = {"completions": 0}
+
+    async def completion(messages):
+        calls["completions"] += 1
+        await asyncio.sleep(model_latency)
+        last = messages[-1]
+        if last.content.startswith("Extract"):
+            call = ToolCall(id=f"call_{calls['completions']}", function={
+                "name": "linkedin_highlight_and_extract",
+                "arguments": '{"email": "a@example.com", "password": "x", "profile_url": "https://www.linkedin.com/in/a/"}'})
+            return ChatResponse(message=ChatMessage(role="assistant", content="", tool_calls=[call]))
+        # Deterministic answer per (normalized) question
+        topic = " ".join(last.content.lower().strip(" ?").split())
+        return ChatResponse(message=ChatMessage(role="assistant", content=f"**Answer**\n- About: {topic}"),
+                            usage={"prompt_tokens": 900, "completion_tokens": 60, "cached_tokens": 0})
+
+    return completion, (lambda email, password, profile_url: profile), calls
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def replay(app, turns, concurrency: int):
+    results = []
+    queue = list(turns)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            while queue:
+                kind, text = queue.pop(0)
+                started = time.perf_counter()
+                response = await client.post("/api/chat", json={"messages": [{"role": "user", "content": text}]})
+                elapsed = time.perf_counter() - started
+                assert response.status_code == 200, response.text
+                body = response.json()
+                # Cached answers are served without the original completion's token usage
+                hit = kind != "tool" and body["usage"] is None
+                results.append((kind, hit, elapsed, text, body["message"]["content"]))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    turns = list(workload(args.requests, random.Random(3)))
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    saved = {name: os.environ.get(name) for name in [*SETTINGS, "RESPONSE_CACHE_ENABLED"]}
+    answers = {}
+    try:
+        for enabled in ("false", "true"):
+            os.environ.update(SETTINGS, RESPONSE_CACHE_ENABLED=enabled)
+            get_settings.cache_clear()
+            get_admission_controller.cache_clear()
+            get_response_cache.cache_clear()
+            completion, extraction, calls = simulated_model(args.model_latency)
+            chat.get_chat_completion = completion
+            chat.linkedin_highlight_and_extract = extraction
+
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = asyncio.run(replay(app, turns, args.concurrency))
+            elapsed = time.perf_counter() - started
+
+            latencies = defaultdict(list)
+            for kind, hit, seconds, text, content in results:
+                assert not (hit and kind == "login"), f"login question served from the cache: {text!r}"
+                group = "hit" if hit else ("bypassed" if kind in ("tool", "login") else "miss")
+                latencies[group].append(seconds)
+                if kind == "common" and enabled == "false":
+                    answers[text] = content
+                elif hit:
+                    assert content == answers[text], f"cached answer differs for {text!r}"
+
+            metrics = get_response_cache().metrics()
+            label = "cache enabled" if enabled == "true" else "cache disabled"
+            print(f"{label}: {len(results)} turns in {elapsed:.1f}s, {calls['completions']} completions, "
+                  f"hit rate {metrics['hit_rate']:.0%} ({metrics['hits']} hits, {metrics['bypassed']} bypassed)")
+            for group in ("hit", "miss", "bypassed"):
+                if latencies[group]:
+                    print(f"  {group:<9}{len(latencies[group]):>6}  p50 {percentile(latencies[group], 50) * 1000:8.1f} ms"
+                          f"  p99 {percentile(latencies[group], 99) * 1000:8.1f} ms")
+            print()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        get_settings.cache_clear()
+        get_admission_controller.cache_clear()
+        get_response_cache.cache_clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Storage size and read latency of the raw capture snapshot archive.
+
+Simulates repeated captures of many profiles (each capture changes a few
+counts and occasionally adds text), archives them, and compares the bytes on
+disk with storing every capture in full, gzip'd, or zstd-compressed on its
+own. Then measures the latency of reading the latest and random versions
+from a freshly opened archive, and verifies every version round-trips.
+
+Usage:
+    python -m benchmarks.bench_snapshots [--profiles 200] [--captures 30]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import tempfile
+import time
+
+from app.services.profile_render_service import render_markdown
+from app.services.snapshot_service import CODEC_ZLIB, CODEC_ZSTD, SnapshotArchive, zstandard
+from benchmarks.fixtures import synthetic_profile
+
+CHROME_HEAD = ("Skip to main content\nHome\nMy Network\nJobs\nMessaging\nNotifications\nMe\nFor Business\n"
+               "Try Premium for free\nOpen to\nAdd profile section\nMore\n")
+CHROME_TAIL = ("People also viewed\nPeople you may know\nYou might like\nLinkedIn Corporation © 2024\n"
+               "About\nAccessibility\nUser Agreement\nPrivacy Policy\nCookie Policy\nCopyright Policy\n"
+               "Brand Policy\nGuest Controls\nCommunity Guidelines\nLanguage\n")
+
+
+def captures(index: int, count: int):
+    """Successive page captures of one synthetic profile."""
+    rng = random.Random(index)
+    body = render_markdown(synthetic_profile(index))
+    connections, followers = rng.randint(50, 500), rng.randint(50, 5000)
+    for _ in range(count):
+        connections += rng.randint(0, 3)
+        followers += rng.randint(0, 20)
+        if rng.random() < 0.1:
+            body += f"\n- Endorsed skill {rng.randint(1, 99)} by {rng.randint(1, 40)} people"
+        yield (f"{CHROME_HEAD}{followers} followers\n{connections} connections\n"
+               f"{body}\n{CHROME_TAIL}")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(codec: int, label: str, all_captures, root: str, raw_bytes: int, baseline_bytes: int) -> None:
+    archive = SnapshotArchive(root, codec=codec)
+    started = time.perf_counter()
+    for url, texts in all_captures:
+        for text in texts[:1]:
+            archive.append(url, text)
+    for url, texts in all_captures:
+        for text in texts[1:]:
+            archive.append(url, text)
+    write_seconds = time.perf_counter() - started
+    count = sum(len(texts) for _, texts in all_captures)
+    stored = sum(entry["stored_size"] for entry in archive.urls())
+    print(f"{label:<36}{stored / 1024:>10,.0f} KB  {raw_bytes / stored:>6.1f}x  "
+          f"({baseline_bytes / stored:.1f}x smaller than gzip per capture; {count / write_seconds:,.0f} appends/s)")
+
+    # Fresh instance: no cached index or decoded versions
+    reader = SnapshotArchive(root, codec=codec)
+    rng = random.Random(1)
+    latest, random_reads = [], []
+    for url, texts in all_captures:
+        started = time.perf_counter()
+        assert reader.read(url) == texts[-1]
+        latest.append(time.perf_counter() - started)
+    reader = SnapshotArchive(root, codec=codec)
+    for _ in range(2000):
+        url, texts = rng.choice(all_captures)
+        version = rng.randrange(len(texts))
+        started = time.perf_counter()
+        assert reader.read(url, version) == texts[version]
+        random_reads.append(time.perf_counter() - started)
+    print(f"{'':<36}read latest p50 {percentile(latest, 50) * 1000:.2f} ms, p99 {percentile(latest, 99) * 1000:.2f} ms; "
+          f"random version p50 {percentile(random_reads, 50) * 1000:.2f} ms, "
+          f"p99 {percentile(random_reads, 99) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--captures", type=int, default=30)
+    args = parser.parse_args()
+
+    all_captures = [(f"https://www.linkedin.com/in/profile-{i}/", list(captures(i, args.captures)))
+                    for i in range(args.profiles)]
+    texts = [text.encode("utf-8") for _, versions in all_captures for text in versions]
+    raw_bytes = sum(len(text) for text in texts)
+    print(f"{args.profiles} profiles x {args.captures} captures, {raw_bytes / 1024:,.0f} KB raw "
+          f"({raw_bytes / len(texts) / 1024:.1f} KB per capture)\n")
+
+    gzip_bytes = sum(len(gzip.compress(text)) for text in texts)
+    print(f"{'full copy per capture':<36}{raw_bytes / 1024:>10,.0f} KB  {1.0:>6.1f}x")
+    print(f"{'gzip per capture':<36}{gzip_bytes / 1024:>10,.0f} KB  {raw_bytes / gzip_bytes:>6.1f}x")
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=12)
+        zstd_bytes = sum(len(compressor.compress(text)) for text in texts)
+        print(f"{'zstd per capture (no dictionary)':<36}{zstd_bytes / 1024:>10,.0f} KB  {raw_bytes / zstd_bytes:>6.1f}x")
+
+    codecs = [(CODEC_ZLIB, "archive, zlib + deltas")]
+    if zstandard is not None:
+        codecs.insert(0, (CODEC_ZSTD, "archive, zstd dictionary + deltas"))
+    for codec, label in codecs:
+        with tempfile.TemporaryDirectory() as root:
+            run(codec, label, all_captures, os.path.join(root, "snapshots"), raw_bytes, gzip_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Token cost of the extraction tool message sent back to the model.
+
+Compares the HTML summary from `ResponseFormatter.format_profile_summary`
+(what used to be sent) with `ResponseFormatter.format_profile_for_model`.
+Uses tiktoken when installed (and its encoding is available offline),
+otherwise estimates ~4 characters per token.
+
+Usage:
+    python -m benchmarks.bench_tool_payload [--profiles N]
+"""
+
+import argparse
+import statistics
+
+from app.services.response_formatter_service import ResponseFormatter
+from benchmarks.fixtures import profile_list
+
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "estimate (chars/4)", lambda text: (len(text) + 3) // 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profiles", type=int, default=200)
+    args = parser.parse_args()
+
+    method, count_tokens = token_counter()
+    html_tokens, compact_tokens = [], []
+    for profile in profile_list(args.profiles):
+        html_tokens.append(count_tokens(ResponseFormatter.format_profile_summary(profile)))
+        compact_tokens.append(count_tokens(ResponseFormatter.format_profile_for_model(profile)))
+
+    print(f"Tool message tokens over {args.profiles} fixture profiles ({method})")
+    print(f"{'format':<28}{'mean':>8}{'median':>8}{'max':>8}")
+    for label, values in (("format_profile_summary", html_tokens), ("format_profile_for_model", compact_tokens)):
+        print(f"{label:<28}{statistics.mean(values):>8.0f}{statistics.median(values):>8.0f}{max(values):>8}")
+    print(f"Reduction: {1 - sum(compact_tokens) / sum(html_tokens):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Synthetic fixtures for the benchmarks.
+
+Profiles are plain dicts shaped like `LinkedInProfile.model_dump()`;
+`documentation_page` builds a large API-reference HTML page for the
+HTML-to-Markdown benchmarks, and `profile_page_html` a LinkedIn-like profile
+page for the extraction benchmark. Everything is generated deterministically from a
+seed, so benchmark runs are comparable.
+"""
+
+import html
+import json
+import random
+from typing import Any, Dict, Iterator, List
+
+FIRST_NAMES = ["Ava", "Liam", "Noah", "Mia", "Zoe", "Ethan", "Priya", "Chen", "Sofia", "Mateo",
+               "Amara", "Lucas", "Yuki", "Omar", "Elena", "Kofi", "Ines", "Ravi", "Hana", "Jonas"]
+LAST_NAMES = ["Smith", "Garcia", "Kim", "Patel", "Nguyen", "Muller", "Rossi", "Okafor", "Silva",
+              "Cohen", "Tanaka", "Novak", "Haddad", "Larsen", "Moreau", "Ibrahim", "Walsh", "Costa"]
+CITIES = ["San Francisco, CA", "New York, NY", "Austin, TX", "London, UK", "Berlin, Germany",
+          "Toronto, Canada", "Bangalore, India", "Singapore", "Remote", "Seattle, WA"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises",
+             "Hooli", "Pied Piper", "Vandelay Industries", "Soylent", "Cyberdyne", "Tyrell Corp",
+             "Massive Dynamic", "Aperture Science", "Wonka Industries", "Oscorp"]
+TITLES = ["Software Engineer", "Senior Software Engineer", "Sr. Software Engineer", "SWE",
+          "Staff Engineer", "Data Scientist", "Machine Learning Engineer", "ML Engineer",
+          "Product Manager", "Engineering Manager", "Frontend Developer", "Front-End Developer",
+          "Backend Engineer", "DevOps Engineer", "Site Reliability Engineer", "SRE",
+          "Data Engineer", "QA Engineer", "Technical Lead", "Tech Lead", "UX Designer"]
+SKILLS = ["Python", "python", "JavaScript", "JS", "Javascript", "JavaScript (ES6)", "TypeScript", "TS",
+          "React", "React.js", "ReactJS", "Node.js", "NodeJS", "Go", "Golang", "Rust", "Java", "C++",
+          "SQL", "PostgreSQL", "Postgres", "MySQL", "MongoDB", "Redis", "Docker", "Kubernetes", "k8s",
+          "AWS", "Amazon Web Services", "GCP", "Google Cloud Platform", "Azure", "Terraform",
+          "Machine Learning", "ML", "Deep Learning", "PyTorch", "TensorFlow", "NLP",
+          "Natural Language Processing", "Data Analysis", "Pandas", "NumPy", "Spark", "Apache Spark",
+          "CI/CD", "Git", "Linux", "GraphQL", "REST APIs", "Microservices", "Agile", "Scrum",
+          "Project Management", "Leadership", "Communication", "Figma", "UX Research"]
+SCHOOLS = ["Stanford University", "MIT", "University of Toronto", "ETH Zurich", "IIT Bombay",
+           "University of Oxford", "UC Berkeley", "Carnegie Mellon University", "TU Munich",
+           "National University of Singapore", "University of Washington", "Georgia Tech"]
+DEGREES = ["Bachelor of Science", "BSc", "Master of Science", "MSc", "PhD", "MBA", "Bachelor of Engineering"]
+FIELDS = ["Computer Science", "Electrical Engineering", "Mathematics", "Statistics", "Physics",
+          "Business Administration", "Human-Computer Interaction", None]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+WORDS = ("built scalable distributed systems data pipelines services platform team customers "
+         "latency reliability cost migration cloud infrastructure features product growth "
+         "mentored engineers designed implemented launched improved reduced increased led "
+         "real-time analytics dashboards models search ranking recommendations payments "
+         "security compliance observability testing automation deployment performance").split()
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(sentences))
+
+
+def _span(rng: random.Random, end_year: int, current: bool) -> str:
+    """A LinkedIn-style duration such as "Jan 2019 - Present · 5 yrs 2 mos"."""
+    months = rng.randint(3, 96)
+    end_index = end_year * 12 + rng.randint(0, 11)
+    start_index = end_index - months
+    start = f"{MONTHS[start_index % 12]} {start_index // 12}"
+    end = "Present" if current else f"{MONTHS[end_index % 12]} {end_index // 12}"
+    years, rem = divmod(months + 1, 12)
+    parts = []
+    if years:
+        parts.append(f"{years} yr{'s' if years > 1 else ''}")
+    if rem:
+        parts.append(f"{rem} mo{'s' if rem > 1 else ''}")
+    return f"{start} - {end} · {' '.join(parts) or '1 mo'}"
+
+
+def synthetic_profile(index: int, seed: int = 0) -> Dict[str, Any]:
+    """Build one deterministic synthetic profile."""
+    rng = random.Random(seed * 1_000_003 + index)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    experience = []
+    year = 2024
+    for position in range(rng.randint(1, 6)):
+        experience.append({
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "duration": _span(rng, year, current=(position == 0)),
+            "description": _paragraph(rng, rng.randint(1, 4)) if rng.random() < 0.8 else None,
+        })
+        year -= rng.randint(1, 4)
+    education = []
+    for _ in range(rng.randint(1, 2)):
+        start = rng.randint(1995, 2018)
+        education.append({
+            "school": rng.choice(SCHOOLS),
+            "degree": rng.choice(DEGREES),
+            "field": rng.choice(FIELDS),
+            "years": f"{start} - {start + rng.randint(1, 5)}" if rng.random() < 0.9 else None,
+        })
+    return {
+        "name": name,
+        "headline": f"{experience[0]['title']} at {experience[0]['company']}",
+        "location": rng.choice(CITIES),
+        "about": _paragraph(rng, rng.randint(2, 6)),
+        "experience": experience,
+        "education": education,
+        "skills": rng.sample(SKILLS, rng.randint(3, 20)),
+        "certifications": [
+            {"name": f"{rng.choice(['AWS', 'GCP', 'Azure', 'Kubernetes'])} Certified {rng.choice(['Developer', 'Architect', 'Administrator'])}",
+             "issuer": rng.choice(["Amazon", "Google", "Microsoft", "CNCF"]),
+             "date": f"{rng.choice(MONTHS)} {rng.randint(2015, 2024)}"}
+        ] if rng.random() < 0.4 else None,
+        "languages": rng.sample(["English", "Spanish", "German", "French", "Mandarin", "Hindi"], rng.randint(1, 3))
+        if rng.random() < 0.6 else None,
+        "volunteer": None,
+        "recommendations": [
+            {"author": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+             "relationship": rng.choice(["Manager", "Colleague", "Direct report"]),
+             "text": _paragraph(rng, rng.randint(2, 5))}
+            for _ in range(rng.randint(0, 3))
+        ] or None,
+    }
+
+
+def synthetic_profiles(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` synthetic profiles."""
+    for index in range(count):
+        yield synthetic_profile(index, seed)
+
+
+def profile_list(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    return list(synthetic_profiles(count, seed))
+
+
+def documentation_page(sections: int, seed: int = 0) -> str:
+    """
+    An API-reference style HTML page (navigation, doc-symbol headings, prose,
+    parameter tables and code samples), roughly 1.6 KB per section.
+    """
+    rng = random.Random(seed)
+    names = [f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{i}" for i in range(sections)]
+    parts = ["<!DOCTYPE html><html><head><title>API Reference</title>",
+             "<style>.doc-symbol{color:#888}</style><script>var x = 1;</script></head><body>",
+             "<nav><ul>"]
+    parts.extend(f'<li><a href="#{name}">{name}</a></li>' for name in names)
+    parts.append("</ul></nav><main><h1>API Reference</h1>")
+    for name in names:
+        kind = rng.choice(["class", "meth", "property"])
+        symbol_class = {"class": "doc-symbol doc-symbol-heading doc-symbol-class",
+                        "meth": "doc-symbol doc-symbol-heading doc-symbol-meth",
+                        "property": "doc-symbol doc-symbol-heading property"}[kind]
+        parts.append(f'<div class="doc doc-object"><h2 id="{name}"><code class="{symbol_class}">{kind}</code> {name}</h2>')
+        parts.append(f"<p>{_paragraph(rng, 3)} See <a href=\"#{rng.choice(names)}\"><code>{rng.choice(names)}</code></a> "
+                     f"and the <em>meth</em> helpers; <strong>{_sentence(rng, 4)}</strong></p>")
+        parts.append("<table><thead><tr><th>Name</th><th>Type</th><th>Description</th></tr></thead><tbody>")
+        for _ in range(rng.randint(2, 4)):
+            parts.append(f"<tr><td><code>{rng.choice(WORDS)}</code></td><td><code>str</code></td>"
+                         f"<td>{_sentence(rng, 8)}</td></tr>")
+        parts.append("</tbody></table>")
+        parts.append(f'<pre><code class="language-python">from package import {name}\n\n'
+                     f'result = {name}(&quot;{rng.choice(WORDS)}&quot;)\nprint(result)\n</code></pre>')
+        parts.append(f"<ul><li>{_sentence(rng, 6)}</li><li>{_sentence(rng, 6)}</li></ul></div>")
+    parts.append("</main></body></html>")
+    return "\n".join(parts)
+
+
+def job_description(seed: int = 0) -> str:
+    """A synthetic job posting mentioning a role, a handful of skills and duties."""
+    rng = random.Random(seed)
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, rng.randint(3, 8))
+    return (f"{title} at {rng.choice(COMPANIES)}. We are looking for a {title} with experience in "
+            f"{', '.join(skills)}. {_paragraph(rng, rng.randint(2, 5))}")
+
+
+def _dual_text(text: str) -> str:
+    """LinkedIn renders visible text plus a visually hidden copy for screen readers."""
+    escaped = html.escape(text)
+    return f'<span aria-hidden="true">{escaped}</span><span class="visually-hidden">{escaped}</span>'
+
+
+def _truncated(text: str, limit: int = 80) -> str:
+    """Text cut at ``limit`` characters with a "see more" button revealing the rest."""
+    if len(text) <= limit:
+        return f"<div>{_dual_text(text)}</div>"
+    return (f'<div class="inline-show-more-text" data-full="{html.escape(text, quote=True)}">'
+            f'<span aria-hidden="true">{html.escape(text[:limit])}…</span>'
+            f'<button class="inline-show-more-text__button inline-show-more-text__button--light link" '
+            f'aria-expanded="false">…see more</button></div>')
+
+
+def profile_page_html(index: int, seed: int = 0, visible_roles: int = 2) -> str:
+    """
+    A LinkedIn-like profile page for ``synthetic_profile(index, seed)``. Like
+    the real page it has screen-reader duplicates, "see more" buttons whose
+    text is filled in asynchronously, a "Show all" footer revealing further
+    roles (with their own "see more" buttons) and a section injected after
+    load. Returns (html, profile).
+    """
+    profile = synthetic_profile(index, seed)
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">",
+        f"<title>{html.escape(profile['name'])} | LinkedIn</title>",
+        "<style>.visually-hidden{position:absolute!important;width:1px;height:1px;overflow:hidden;"
+        "clip:rect(1px,1px,1px,1px);white-space:nowrap}</style></head><body>",
+        "<header><nav><a>Home</a> <a>My Network</a> <a>Jobs</a> <a>Messaging</a></nav></header><main>",
+        '<section class="artdeco-card"><div class="ph5">',
+        f"<h1>{html.escape(profile['name'])}</h1>",
+        f'<div class="text-body-medium">{html.escape(profile["headline"])}</div>',
+        f'<span class="text-body-small">{html.escape(profile["location"])}</span>',
+        "<div><span>500+ connections</span></div></div></section>",
+        '<section class="artdeco-card"><div id="about" class="pv-profile-card__anchor"></div>',
+        f"<div><h2>{_dual_text('About')}</h2></div>{_truncated(profile['about'])}</section>",
+        '<section class="artdeco-card"><div id="experience" class="pv-profile-card__anchor"></div>',
+        f"<div><h2>{_dual_text('Experience')}</h2></div><ul>",
+    ]
+    roles = []
+    for exp in profile["experience"]:
+        role = (f"<li><div>{_dual_text(exp['title'])}</div><div>{_dual_text(exp['company'])}</div>"
+                f"<div>{_dual_text(exp['duration'])}</div>")
+        if exp["description"]:
+            role += _truncated(exp["description"])
+        roles.append(role + "</li>")
+    parts.extend(roles[:visible_roles])
+    parts.append("</ul>")
+    if len(roles) > visible_roles:
+        # Further roles are only added to the page when "Show all" is clicked
+        parts.append(f"<template>{''.join(roles[visible_roles:])}</template>"
+                     f'<button class="pvs-list__footer-button" aria-expanded="false">'
+                     f"Show all {len(roles)} experiences</button>")
+    parts.append("</section>")
+    parts.append('<section class="artdeco-card"><div id="education" class="pv-profile-card__anchor"></div>'
+                 f"<div><h2>{_dual_text('Education')}</h2></div><ul>")
+    for edu in profile["education"]:
+        degree = f"{edu['degree']}, {edu['field']}" if edu["field"] else edu["degree"]
+        parts.append(f"<li><div>{_dual_text(edu['school'])}</div><div>{_dual_text(degree)}</div>"
+                     f"<div>{_dual_text(edu['years'] or '')}</div></li>")
+    parts.append("</ul></section>")
+    parts.append('<section class="artdeco-card"><div id="skills" class="pv-profile-card__anchor"></div>'
+                 f"<div><h2>{_dual_text('Skills')}</h2></div><ul>")
+    parts.extend(f"<li>{_dual_text(skill)}</li>" for skill in profile["skills"])
+    parts.append("</ul></section><div id=\"lazy\"></div></main>")
+    parts.append("<footer><a>About</a> <a>Accessibility</a> <a>Privacy &amp; Terms</a></footer>")
+
+    languages = "".join(f"<li>{_dual_text(language)}</li>" for language in profile["languages"] or ["English"])
+    lazy_section = ('<section class="artdeco-card"><div id="languages" class="pv-profile-card__anchor"></div>'
+                    f"<div><h2>{_dual_text('Languages')}</h2></div><ul>{languages}</ul></section>")
+    parts.append(f"""<script>
+setTimeout(function () {{ document.getElementById("lazy").outerHTML = {json.dumps(lazy_section)}; }}, 300);
+document.addEventListener("click", function (event) {{
+  var button = event.target.closest("button");
+  if (!button) return;
+  if (button.classList.contains("inline-show-more-text__button")) {{
+    var container = button.parentElement;
+    setTimeout(function () {{
+      container.innerHTML = '<span aria-hidden="true"></span>';
+      container.firstChild.textContent = container.dataset.full;
+    }}, 100);
+  }} else if (button.classList.contains("pvs-list__footer-button")) {{
+    setTimeout(function () {{
+      var section = button.closest("section");
+      section.querySelector("ul").appendChild(section.querySelector("template").content.cloneNode(true));
+      button.setAttribute("aria-expanded", "true");
+    }}, 200);
+  }}
+}});
+</script></body></html>""")
+    return "\n".join(parts), profile
@@ -4,9 +4,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import os
-from app.api.routes import chat
+from app.api.routes import chat, profiles
+from app.core.serialization import FastJSONResponse
 
-app = FastAPI()
+# Routes returning plain data are still encoded by jsonable_encoder, then dumped with orjson
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -26,6 +28,7 @@ templates = Jinja2Templates(directory="templates")
 
 # Include routers
 app.include_router(chat.router, prefix="/api")
+app.include_router(profiles.router, prefix="/api")
 
 # Serve index page
 @app.get("/")
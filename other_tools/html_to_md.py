@@ -4,19 +4,42 @@ THE ULTIMATE HTML-TO-MARKDOWN CLI
 --------------------------------
 An extremely sophisticated, interactive Python script to convert
 HTML from a user-supplied URL into Markdown, with advanced features.
+
+Batch mode (non-interactive):
+    python html_to_md.py --batch sources.txt [--output-dir DIR] [--workers N]
+        [--fetch-concurrency N] [--per-host N] [--stream] [--no-images]
+        [--no-links] [--no-emphasis] [--toc]
+
+`sources.txt` lists one URL or local HTML file per line ('#' starts a comment).
+
+Crawl mode (mirror a documentation site):
+    python html_to_md.py --crawl https://docs.example.com/ [--output-dir DIR]
+        [--max-pages N] [--fetch-concurrency N] [--per-host N] [--toc]
 """
 
 import os
 import sys
 import re
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
-from urllib.parse import urlparse
+from html.parser import HTMLParser
+from urllib.parse import urlparse, urlunparse, urljoin, unquote
 
 # --- External libraries ---
 # Make sure to install these (if not already installed) by running:
-#   pip install questionary requests html2text rich
+#   pip install questionary requests html2text rich beautifulsoup4 lxml
 
 import requests
+from requests.adapters import HTTPAdapter
 import questionary
 import html2text
 from rich.console import Console
@@ -25,6 +48,8 @@ from rich import print
 from rich.progress import Progress
 from rich.spinner import Spinner
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
 # Create a global Rich console for pretty output
 console = Console()
@@ -126,16 +151,38 @@ def process_doc_symbols(html_content):
         code_elem.replace_with(new_text)
     
     # Also look for standalone 'meth' text nodes
-    for elem in soup.find_all(text=re.compile(r'\bmeth\b')):
+    for elem in soup.find_all(string=re.compile(r'\bmeth\b')):
         if elem.parent.name not in ['code', 'span']:
             new_text = elem.replace('meth', '``meth``')
             elem.replace_with(new_text)
     
     return str(soup)
 
-def convert_html_to_markdown(html_content, keep_links=True, keep_images=True, keep_emphasis=True):
+def convert_html_to_markdown(html_content, keep_links=True, keep_images=True, keep_emphasis=True, engine="tree",
+                             link_rewriter=None):
     """
     Enhanced converter that handles documentation symbols and pseudo-elements.
+
+    The default "tree" engine parses the document once with lxml and emits
+    Markdown while walking the tree, applying the doc-symbol rules on the way.
+    It passes every link through `link_rewriter` if one is given.
+    engine="html2text" keeps the previous BeautifulSoup + html2text pipeline.
+    """
+    if engine == "html2text":
+        return convert_html_to_markdown_html2text(html_content, keep_links, keep_images, keep_emphasis)
+
+    root = parse_html_tree(html_content)
+    if root is None:
+        return ""
+    parts = []
+    emitter = MarkdownEmitter(parts.append, keep_links, keep_images, keep_emphasis, link_rewriter)
+    walk_tree(root, emitter)
+    emitter.close()
+    return "".join(parts).strip()
+
+def convert_html_to_markdown_html2text(html_content, keep_links=True, keep_images=True, keep_emphasis=True):
+    """
+    Previous converter: BeautifulSoup pre-processing followed by html2text.
     """
     # Pre-process doc symbols
     processed_html = process_doc_symbols(html_content)
@@ -156,6 +203,577 @@ def convert_html_to_markdown(html_content, keep_links=True, keep_images=True, ke
     
     return markdown_text.strip()
 
+# ------------------------------
+# Single-parse Markdown engine
+# ------------------------------
+# Tags whose content never reaches the Markdown output
+SKIP_TAGS = {"script", "style", "head", "title", "noscript", "template", "svg", "iframe", "object"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "main", "nav", "aside",
+    "figure", "figcaption", "form", "fieldset", "details", "summary", "address",
+    "table", "dl", "dt", "dd", "center",
+}
+HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
+EMPHASIS_MARKERS = {"strong": "**", "b": "**", "em": "_", "i": "_"}
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "area", "base", "col", "embed", "source", "track", "wbr"}
+
+IMPLIED_END = {
+    "li": {"li"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"},
+    "tr": {"tr", "td", "th"}, "td": {"td", "th"}, "th": {"td", "th"}, "option": {"option"},
+}
+IMPLIED_END_SCOPES = {"ul", "ol", "dl", "table", "select"}
+PARAGRAPH_CLOSERS = {"ul", "ol", "pre", "blockquote", "hr"} | set(HEADING_LEVELS)
+
+METH_PATTERN = re.compile(r'\bmeth\b')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def is_doc_symbol(tag, classes):
+    """
+    Whether an element is rewritten by the doc-symbol rules (see process_doc_symbols).
+    """
+    return tag in ("code", "span") and any("doc-symbol" in c or "meth" in c for c in classes)
+
+def format_doc_symbol(classes, text):
+    """
+    Builds the replacement text for a doc-symbol element, e.g. "``meth`` run @property".
+    """
+    joined = " ".join(classes)
+    formatted_parts = []
+    if "meth" in joined or text == "meth":
+        formatted_parts.append("``meth``")
+    if "doc-symbol-heading" in classes:
+        formatted_parts.append("###")
+    formatted_parts.append(text)
+    if "doc-symbol-class" in classes:
+        formatted_parts.append("``class``")
+    if "abstractmethod" in joined:
+        formatted_parts.append("@abstractmethod")
+    if "property" in joined:
+        formatted_parts.append("@property")
+    return " ".join(formatted_parts)
+
+class MarkdownEmitter:
+    """
+    Turns a stream of start/end/text events into Markdown, writing each piece
+    to `write` as soon as it is known. It keeps only the stack of open
+    elements, so it can be fed by a tree walk or directly by a parser.
+    """
+
+    def __init__(self, write, keep_links=True, keep_images=True, keep_emphasis=True, link_rewriter=None):
+        self.write = write
+        self.keep_links = keep_links
+        self.keep_images = keep_images
+        self.keep_emphasis = keep_emphasis
+        # Optional callable: sees every link href and returns the href to write
+        self.link_rewriter = link_rewriter
+
+        self._stack = []            # Open element tags
+        self._prefixes = []         # Line prefixes (blockquote markers, list indentation)
+        self._lists = []            # [ordered, next_number] per open list
+        self._inline_pending = []   # Opening markers not yet written (dropped if the element is empty)
+        self._links = []            # href per open <a> (None if the link is not rendered)
+        self._tables = []           # Per open table: {"cells": n, "header": bool, "separated": bool}
+        self._skip = 0              # Depth inside SKIP_TAGS
+        self._pre = 0               # Depth inside <pre>
+        self._fence_open = False
+        self._fence_lang = ""
+        self._symbol = None         # [classes, text parts, depth] while inside a doc-symbol element
+        self._items = []            # Marker per open list item
+        self._marker_line = False   # Next line starts with a list marker
+
+        self._started = False       # Anything written yet
+        self._newlines = 0          # Newlines at the end of the output so far
+        self._pending_breaks = 0    # Newlines required before the next content
+        self._space = False         # A collapsed space is owed before the next word
+
+    # ---- Output primitives ----
+    def _break(self, count):
+        if self._started:
+            self._pending_breaks = max(self._pending_breaks, count)
+        self._space = False
+
+    def _line_prefix(self):
+        return "".join(self._prefixes)
+
+    def _settle_breaks(self):
+        """
+        Writes the line breaks owed so far, using the current line prefix for blank lines.
+        """
+        if not self._pending_breaks:
+            return
+        missing = self._pending_breaks - self._newlines
+        if missing > 0:
+            blank = self._line_prefix().rstrip()
+            self.write(("\n" + blank) * (missing - 1) + "\n")
+        self._newlines = max(self._newlines, self._pending_breaks)
+        self._pending_breaks = 0
+        self._space = False
+
+    def _emit(self, content):
+        """
+        Writes inline content, settling owed line breaks, prefixes and spaces first.
+        """
+        if not content:
+            return
+        self._settle_breaks()
+        if self._newlines or not self._started:
+            if self._marker_line:
+                # The item's own continuation indent does not apply to its marker line
+                self.write("".join(self._prefixes[:-1]))
+                self._marker_line = False
+            else:
+                self.write(self._line_prefix())
+            self._newlines = 0
+        elif self._space:
+            self.write(" ")
+        self._space = False
+        if self._inline_pending:
+            self.write("".join(self._inline_pending))
+            self._inline_pending = []
+        self.write(content)
+        self._started = True
+
+    def _emit_raw(self, content):
+        """
+        Writes preformatted text verbatim inside a fenced block.
+        """
+        if not self._fence_open:
+            self._emit("```" + self._fence_lang)
+            self._fence_open = True
+            self.write("\n")
+            self._newlines = 1
+            # Like browsers, ignore a newline right after the opening <pre>
+            if content.startswith("\n"):
+                content = content[1:]
+        for i, line in enumerate(content.split("\n")):
+            if i:
+                self.write("\n")
+                self._newlines = 1
+            if line:
+                if self._newlines:
+                    self.write(self._line_prefix())
+                    self._newlines = 0
+                self.write(line)
+
+    # ---- Events ----
+    def start(self, tag, attrs):
+        tag = tag.lower()
+        # Implied end tags, for event sources that do not repair markup
+        if tag in IMPLIED_END:
+            for open_tag in reversed(self._stack):
+                if open_tag in IMPLIED_END[tag]:
+                    self.end(open_tag)
+                    break
+                if open_tag in IMPLIED_END_SCOPES:
+                    break
+        if self._stack and self._stack[-1] == "p" and (tag in BLOCK_TAGS or tag in PARAGRAPH_CLOSERS):
+            self.end("p")
+        if tag not in VOID_TAGS:
+            self._stack.append(tag)
+        if self._skip or tag in SKIP_TAGS:
+            if tag in SKIP_TAGS and tag not in VOID_TAGS:
+                self._skip += 1
+            return
+        if self._symbol is not None:
+            if tag not in VOID_TAGS:
+                self._symbol[2] += 1
+            return
+
+        classes = (attrs.get("class") or "").split()
+        if is_doc_symbol(tag, classes):
+            self._symbol = [classes, [], 1]
+            return
+
+        if self._pre:
+            if tag == "br":
+                self._emit_raw("\n")
+            elif tag == "code" and not self._fence_open:
+                for c in classes:
+                    if c.startswith("language-"):
+                        self._fence_lang = c[len("language-"):]
+            return
+
+        if tag in HEADING_LEVELS:
+            self._break(2)
+            self._inline_pending.append("#" * HEADING_LEVELS[tag] + " ")
+        elif tag in BLOCK_TAGS:
+            self._break(2 if tag in ("p", "table", "dl", "figure") else 1)
+            if tag == "table":
+                self._tables.append({"cells": 0, "header": False, "separated": False})
+        elif tag == "tr":
+            self._break(1)
+            if self._tables:
+                self._tables[-1]["cells"] = 0
+        elif tag in ("td", "th"):
+            if self._tables:
+                table = self._tables[-1]
+                if table["cells"]:
+                    self._space = True
+                    self._emit("|")
+                    self._space = True
+                table["cells"] += 1
+                table["header"] = table["header"] or tag == "th"
+        elif tag in ("ul", "ol"):
+            self._break(2 if not self._lists else 1)
+            self._lists.append([tag == "ol", int(attrs.get("start") or 1) if tag == "ol" else 0])
+        elif tag == "li":
+            self._break(1)
+            if self._lists:
+                current = self._lists[-1]
+                marker = f"{current[1]}. " if current[0] else "* "
+                current[1] += 1
+            else:
+                marker = "* "
+            self._items.append(marker)
+            self._inline_pending.append(marker)
+            self._prefixes.append(" " * len(marker))
+            self._marker_line = True
+        elif tag == "blockquote":
+            self._break(2)
+            self._settle_breaks()
+            self._prefixes.append("> ")
+        elif tag == "pre":
+            self._break(2)
+            self._pre += 1
+            self._fence_open = False
+            self._fence_lang = ""
+        elif tag == "br":
+            self._break(1)
+        elif tag == "hr":
+            self._break(2)
+            self._emit("* * *")
+            self._break(2)
+        elif tag in EMPHASIS_MARKERS:
+            if self.keep_emphasis:
+                self._open_inline(EMPHASIS_MARKERS[tag])
+        elif tag == "code":
+            self._open_inline("`")
+        elif tag == "a":
+            href = attrs.get("href")
+            if href and self.link_rewriter:
+                href = self.link_rewriter(href)
+            if self.keep_links and href:
+                self._links.append(href)
+                self._open_inline("[")
+            else:
+                self._links.append(None)
+        elif tag == "img":
+            if self.keep_images and attrs.get("src"):
+                self._emit(f"![{attrs.get('alt') or ''}]({attrs['src']})")
+
+    def _open_inline(self, marker):
+        self._inline_pending.append(marker)
+
+    def _close_inline(self, opening, closing):
+        """
+        Closes an inline element; if nothing was written inside it, the opening
+        marker is dropped instead.
+        """
+        if self._inline_pending and self._inline_pending[-1] == opening:
+            self._inline_pending.pop()
+            return
+        space = self._space
+        self._space = False
+        self.write(closing)
+        self._space = space
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            return
+        # Tolerate unbalanced markup: close up to the matching open element
+        if tag not in self._stack:
+            return
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        if self._skip:
+            if tag in SKIP_TAGS:
+                self._skip -= 1
+            return
+        if self._symbol is not None:
+            self._symbol[2] -= 1
+            if self._symbol[2] == 0:
+                classes, parts, _ = self._symbol
+                self._symbol = None
+                self._text(format_doc_symbol(classes, "".join(parts)), apply_meth=False)
+            return
+
+        if self._pre:
+            if tag == "pre":
+                self._pre -= 1
+                if self._fence_open:
+                    self._break(1)
+                    self._emit("```")
+                self._fence_open = False
+                self._break(2)
+            return
+
+        if tag in HEADING_LEVELS:
+            self._drop_pending("#" * HEADING_LEVELS[tag] + " ")
+            self._break(2)
+        elif tag in BLOCK_TAGS:
+            self._break(2 if tag in ("p", "table", "dl", "figure") else 1)
+            if tag == "table" and self._tables:
+                self._tables.pop()
+        elif tag == "tr":
+            if self._tables:
+                table = self._tables[-1]
+                if table["header"] and not table["separated"] and table["cells"]:
+                    self._break(1)
+                    self._emit("|".join(["---"] * table["cells"]))
+                    table["separated"] = True
+            self._break(1)
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._break(2 if not self._lists else 1)
+        elif tag == "li":
+            if self._prefixes:
+                self._prefixes.pop()
+            if self._items:
+                if self._drop_pending(self._items.pop()):
+                    self._marker_line = False
+            self._break(1)
+        elif tag == "blockquote":
+            if self._prefixes:
+                self._prefixes.pop()
+            self._break(2)
+        elif tag in EMPHASIS_MARKERS:
+            if self.keep_emphasis:
+                marker = EMPHASIS_MARKERS[tag]
+                self._close_inline(marker, marker)
+        elif tag == "code":
+            self._close_inline("`", "`")
+        elif tag == "a":
+            href = self._links.pop() if self._links else None
+            if href is not None:
+                self._close_inline("[", f"]({href})")
+
+    def _drop_pending(self, marker):
+        """
+        Forgets an unwritten block marker (empty heading or list item).
+        """
+        if self._inline_pending and self._inline_pending[-1] == marker:
+            self._inline_pending.pop()
+            return True
+        return False
+
+    def text(self, data):
+        if self._skip or not data:
+            return
+        if self._symbol is not None:
+            self._symbol[1].append(data)
+            return
+        if self._pre:
+            self._emit_raw(data)
+            return
+        parent = self._stack[-1] if self._stack else None
+        self._text(data, apply_meth=parent not in ("code", "span"))
+
+    def _text(self, data, apply_meth=True):
+        if apply_meth and "meth" in data:
+            data = METH_PATTERN.sub("``meth``", data)
+        words = WHITESPACE_PATTERN.sub(" ", data)
+        if words == " ":
+            self._space = True
+            return
+        if words.startswith(" "):
+            self._space = True
+        self._emit(words.strip())
+        if words.endswith(" "):
+            self._space = True
+
+    def close(self):
+        """
+        Closes any elements left open and ends the output with a newline.
+        """
+        while self._stack:
+            self._close(self._stack.pop())
+        if self._started:
+            self.write("\n")
+
+def walk_tree(root, emitter):
+    """
+    Feeds an lxml element tree to the emitter in document order.
+    """
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if not isinstance(element.tag, str):  # Comments and processing instructions
+            if event == "end" and element.tail:
+                emitter.text(element.tail)
+            continue
+        if event == "start":
+            emitter.start(element.tag, element.attrib)
+            if element.text:
+                emitter.text(element.text)
+        else:
+            emitter.end(element.tag)
+            if element.tail:
+                emitter.text(element.tail)
+
+def parse_html_tree(html_content):
+    """
+    Parses HTML (str or bytes) into an lxml tree; returns None for an empty document.
+    """
+    try:
+        return lxml.html.document_fromstring(html_content)
+    except ValueError:
+        # Unicode input carrying an XML encoding declaration
+        if isinstance(html_content, str):
+            return parse_html_tree(html_content.encode("utf-8"))
+        raise
+    except etree.ParserError:
+        return None
+
+# ------------------------------
+# Streaming conversion
+# ------------------------------
+# Peak memory of a streamed conversion does not depend on the document size.
+# It is bounded by:
+#   - one input chunk (STREAM_CHUNK_SIZE characters),
+#   - the parser's buffer, which holds at most one incomplete tag or one
+#     <script>/<style> element until it is complete,
+#   - pending text, flushed at a word boundary once it passes STREAM_CHUNK_SIZE,
+#   - the emitter's open-element stacks, which grow with nesting depth,
+#   - the text of the doc-symbol element being rewritten, if any.
+# Markdown goes to the output file as soon as it is produced. With a TOC, only
+# the headings are collected, and the body is copied behind the TOC in chunks.
+STREAM_CHUNK_SIZE = 64 * 1024
+LAST_WHITESPACE_PATTERN = re.compile(r'\s(?=\S*$)')
+HEADING_LINE_PATTERN = re.compile(r'^(#+)\s+(.*)')
+
+class StreamingHTMLParser(HTMLParser):
+    """
+    Event-based parser that forwards events to a MarkdownEmitter while the
+    document is fed in chunks. Text split across chunks is joined again before
+    it reaches the emitter, so words and 'meth' markers are never cut in half.
+    """
+
+    def __init__(self, emitter):
+        super().__init__(convert_charrefs=True)
+        self.emitter = emitter
+        self._text = []
+        self._text_size = 0
+
+    def _flush_text(self):
+        if self._text:
+            self.emitter.text("".join(self._text))
+            self._text = []
+            self._text_size = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        self.emitter.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        self.emitter.end(tag)
+
+    def handle_data(self, data):
+        self._text.append(data)
+        self._text_size += len(data)
+        if self._text_size > STREAM_CHUNK_SIZE:
+            # Long run of text: pass on everything up to the last word boundary
+            text = "".join(self._text)
+            match = LAST_WHITESPACE_PATTERN.search(text)
+            if match:
+                self.emitter.text(text[:match.end()])
+                text = text[match.end():]
+            self._text = [text]
+            self._text_size = len(text)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        self.emitter.close()
+
+def convert_html_stream(chunks, write, keep_links=True, keep_images=True, keep_emphasis=True):
+    """
+    Converts HTML arriving as an iterable of text chunks, passing Markdown to
+    write() as it is produced.
+    """
+    parser = StreamingHTMLParser(MarkdownEmitter(write, keep_links, keep_images, keep_emphasis))
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+
+def iter_source_chunks(source, session=None, limiter=None):
+    """
+    Yields the HTML of a local file or URL in chunks, without reading it whole.
+    For URLs, the per-host slot is held until the body has been consumed.
+    """
+    path = local_path_for(source)
+    if path is not None:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    if not is_valid_url(source):
+        raise ValueError(f"Invalid URL or missing file: {source}")
+    session = session or requests
+    slot = limiter.for_url(source) if limiter else contextlib.nullcontext()
+    with slot:
+        response = session.get(source, timeout=15, stream=True)
+        try:
+            response.raise_for_status()
+            # Without a declared charset, iter_content would yield bytes
+            response.encoding = response.encoding or "utf-8"
+            yield from response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True)
+        finally:
+            response.close()
+
+def stream_source_to_file(source, output_path, settings, session=None, limiter=None):
+    """
+    Streams one source into a Markdown file with bounded memory (see above).
+    The result is written under a temporary name and renamed into place.
+    """
+    directory = os.path.dirname(output_path) or "."
+    temp_paths = []
+
+    def temp_file():
+        fd, path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".md")
+        temp_paths.append(path)
+        return os.fdopen(fd, "w", encoding="utf-8"), path
+
+    try:
+        body, body_path = temp_file()
+        with body:
+            convert_html_stream(
+                iter_source_chunks(source, session, limiter),
+                body.write,
+                keep_links=settings["keep_links"],
+                keep_images=settings["keep_images"],
+                keep_emphasis=settings["keep_emphasis"]
+            )
+
+        final_path = body_path
+        if settings["generate_toc"]:
+            headings = []
+            with open(body_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    match = HEADING_LINE_PATTERN.match(line)
+                    if match:
+                        headings.append(match.groups())
+            if headings:
+                out, final_path = temp_file()
+                with out, open(body_path, "r", encoding="utf-8") as f:
+                    out.write(build_table_of_contents(headings))
+                    shutil.copyfileobj(f, out, STREAM_CHUNK_SIZE)
+
+        os.replace(final_path, output_path)
+        temp_paths.remove(final_path)
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+    return output_path
+
 def generate_filename_from_url(url):
     """
     Generates a filename based on the domain and current timestamp.
@@ -239,21 +857,31 @@ def generate_table_of_contents(markdown_text):
     if not headings:
         return markdown_text  # No headings to build a TOC
 
+    # Insert TOC near the top. Here we place it after the first line (if the first line is a title).
+    # If you want it absolutely at the top, you can just do: return toc_string + markdown_text
+    return build_table_of_contents(headings) + markdown_text
+
+def heading_anchor(title):
+    """
+    Slug for a heading link, in the style GitHub uses: lowercase, spaces->-, punctuation removed.
+    """
+    return re.sub(r'[^\w\s-]', '', title.lower()).replace(' ', '-')
+
+def build_table_of_contents(headings):
+    """
+    Builds the TOC block from (hashes, title) pairs found in the Markdown.
+    """
     toc_lines = []
     toc_lines.append("## Table of Contents\n")
     for heading in headings:
         level = len(heading[0])  # Number of '#' characters
         title = heading[1].strip()
 
-        # Create a slug for the link (same style GitHub uses: lowercase, spaces->-, remove punctuation)
-        anchor = re.sub(r'[^\w\s-]', '', title.lower()).replace(' ', '-')
+        anchor = heading_anchor(title)
         indent = "  " * (level - 1)
         toc_lines.append(f"{indent}- [{title}](#{anchor})")
 
-    toc_string = "\n".join(toc_lines) + "\n\n"
-    # Insert TOC near the top. Here we place it after the first line (if the first line is a title).
-    # If you want it absolutely at the top, you can just do: return toc_string + markdown_text
-    return toc_string + markdown_text
+    return "\n".join(toc_lines) + "\n\n"
 
 def generate_doc_header(title):
     """
@@ -357,7 +985,536 @@ def run_cli():
             console.print("[bold cyan]Goodbye![/bold cyan]")
             break
 
+# ------------------------------
+# Batch mode
+# ------------------------------
+def read_source_list(list_file):
+    """
+    Reads URLs / local HTML file paths from a list file, one per line.
+    Blank lines and lines starting with '#' are ignored.
+    """
+    with open(list_file, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def create_session(pool_size=10):
+    """
+    Creates a requests Session whose connection pool is shared by all fetch
+    threads, so connections to the same host are reused.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class HostLimiter:
+    """
+    Caps the number of concurrent requests per host.
+    """
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def for_url(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+def local_path_for(source):
+    """
+    Returns the filesystem path if the source is a local file (plain path or
+    file:// URL), otherwise None.
+    """
+    parsed = urlparse(source)
+    if parsed.scheme == "file":
+        return unquote(parsed.path)
+    if not parsed.scheme and os.path.exists(source):
+        return source
+    return None
+
+def fetch_source(source, session, limiter):
+    """
+    Returns the HTML for a source: read from disk for local files (no network),
+    fetched over the pooled session for URLs.
+    """
+    path = local_path_for(source)
+    if path is not None:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    if not is_valid_url(source):
+        raise ValueError(f"Invalid URL or missing file: {source}")
+    with limiter.for_url(source):
+        response = session.get(source, timeout=15)
+        response.raise_for_status()
+        return response.text
+
+def batch_output_name(source):
+    """
+    Deterministic output filename for a batch source, so re-runs overwrite
+    the previous output instead of piling up timestamped copies. A short hash
+    of the full source keeps sources that read alike (same basename in two
+    directories, URLs differing only in the query) from overwriting each other.
+    Example: https://docs.python.org/3/library/os.html -> docs.python.org_3_library_os-6910a14a.md
+    """
+    path = local_path_for(source)
+    if path is not None:
+        path = os.path.abspath(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        key = path
+    else:
+        parsed = urlparse(source)
+        page = os.path.splitext(parsed.path.strip("/"))[0] or "index"
+        stem = f"{parsed.netloc}_{page}"
+        key = source
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^\w.-]+", "_", stem).strip("_") + f"-{digest}.md"
+
+def write_atomic(path, content):
+    """
+    Writes content to a temporary file in the same directory and renames it into
+    place, so readers never see a partially written file.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".md")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def convert_job(html_content, settings):
+    """
+    Conversion step of the batch pipeline; runs in a worker process.
+    """
+    markdown_content = convert_html_to_markdown(
+        html_content,
+        keep_links=settings["keep_links"],
+        keep_images=settings["keep_images"],
+        keep_emphasis=settings["keep_emphasis"]
+    )
+    if settings["generate_toc"]:
+        markdown_content = generate_table_of_contents(markdown_content)
+    return markdown_content
+
+def run_batch(sources, output_dir, settings, workers=None, fetch_concurrency=8, per_host=2, stream=False):
+    """
+    Converts many sources without prompts. Sources are fetched concurrently
+    (pooled session, per-host limit), converted on a process pool as soon as
+    they arrive, and written with atomic renames as each conversion finishes.
+    Fetching pauses while 2 x workers pages are waiting to be converted, so
+    memory does not grow with the number of sources. Returns a summary dict.
+
+    With stream=True, each page is converted while it downloads, on the fetch
+    threads, so memory stays bounded even for huge pages (no process pool).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    session = create_session(pool_size=fetch_concurrency)
+    limiter = HostLimiter(per_host)
+    summary = {"converted": 0, "failed": 0, "failures": []}
+    started = time.perf_counter()
+
+    if stream:
+        with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers:
+            jobs = {
+                fetchers.submit(stream_source_to_file, source,
+                                os.path.join(output_dir, batch_output_name(source)),
+                                settings, session, limiter): source
+                for source in sources
+            }
+            for future in as_completed(jobs):
+                source = jobs[future]
+                try:
+                    output_path = future.result()
+                    summary["converted"] += 1
+                    console.print(f"[green]✔[/green] {source} -> {output_path}")
+                except Exception as e:
+                    summary["failed"] += 1
+                    summary["failures"].append((source, str(e)))
+        session.close()
+        summary["elapsed"] = time.perf_counter() - started
+        return summary
+
+    workers = workers or os.cpu_count() or 1
+    # Fetched pages wait in memory until a converter takes them; stop fetching while this many are queued
+    max_queued_conversions = 2 * workers
+    pending_sources = iter(sources)
+    sources_left = True
+    with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers) as converters:
+        fetches = {}
+        conversions = {}
+        while True:
+            while sources_left and len(fetches) < fetch_concurrency and len(conversions) < max_queued_conversions:
+                source = next(pending_sources, None)
+                if source is None:
+                    sources_left = False
+                    break
+                fetches[fetchers.submit(fetch_source, source, session, limiter)] = source
+            if not fetches and not conversions:
+                break
+            # Fetches and conversions are handled in completion order, and each
+            # page is written as soon as it is converted
+            done, _ = wait([*fetches, *conversions], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    source = fetches.pop(future)
+                    try:
+                        conversions[converters.submit(convert_job, future.result(), settings)] = source
+                    except Exception as e:
+                        summary["failed"] += 1
+                        summary["failures"].append((source, str(e)))
+                    continue
+                source = conversions.pop(future)
+                try:
+                    output_path = os.path.join(output_dir, batch_output_name(source))
+                    write_atomic(output_path, future.result())
+                    summary["converted"] += 1
+                    console.print(f"[green]✔[/green] {source} -> {output_path}")
+                except Exception as e:
+                    summary["failed"] += 1
+                    summary["failures"].append((source, str(e)))
+
+    session.close()
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
+
+def print_batch_summary(summary):
+    elapsed = summary["elapsed"]
+    counts = [("Converted", "converted"), ("Unchanged", "unchanged"), ("Duplicates", "duplicates"),
+              ("Skipped", "skipped"), ("Failed", "failed")]
+    total = sum(summary.get(key, 0) for _, key in counts)
+    console.print(Panel.fit(
+        "  ".join(f"{label}: {summary[key]}" for label, key in counts if key in summary) + "\n"
+        f"Elapsed: {elapsed:.2f}s  ({total / elapsed if elapsed else 0:.1f} pages/s)",
+        title="Batch summary",
+        style="bold cyan"
+    ))
+    for source, error in summary["failures"]:
+        console.print(f"[red]✘ {source}: {error}[/red]")
+
+# ------------------------------
+# Crawl mode
+# ------------------------------
+CRAWL_STATE_FILENAME = ".crawl_state.json"
+SITE_TOC_FILENAME = "_site_toc.md"
+PAGE_EXTENSIONS = {"", ".html", ".htm", ".xhtml", ".shtml", ".php", ".asp", ".aspx"}
+
+def normalize_crawl_url(url):
+    """
+    Canonical form used to identify a page: lowercase scheme/host, no fragment
+    or query string, '/' for an empty path.
+    """
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", "", "", ""))
+
+def crawl_local_path(url):
+    """
+    Mirror path of a page under the output directory.
+    Example: https://docs.example.com/guide/ -> guide/index.md, /api/os.html -> api/os.md
+    """
+    path = unquote(urlparse(url).path)
+    if not path or path.endswith("/"):
+        path += "index"
+    segments = [re.sub(r"[^\w.-]+", "_", segment) for segment in path.strip("/").split("/") if segment]
+    segments[-1] = os.path.splitext(segments[-1])[0] or "index"
+    return "/".join(segments) + ".md"
+
+class SiteCrawler:
+    """
+    Mirrors one site into Markdown, following links within the start URL's host.
+
+    - A FIFO frontier of normalized URLs is fetched concurrently over the pooled
+      session, with the per-host limit.
+    - ETag / Last-Modified are kept per URL in a state file in the output
+      directory, so re-runs send conditional requests. Unchanged pages (304, or
+      the same content hash) are not converted again, and their stored links
+      keep the crawl going.
+    - Pages with the same content hash (e.g. /guide/ and /guide/index.html) are
+      written once. Links to the duplicate are pointed at the first copy.
+    - Links to crawlable pages are rewritten to relative .md paths while each
+      page is converted. Headings are stored per page, so the site table of
+      contents is rebuilt from the state without re-reading unchanged pages.
+    """
+
+    def __init__(self, start_url, output_dir, settings, max_pages=500, fetch_concurrency=8, per_host=2):
+        self.start_url = normalize_crawl_url(start_url)
+        self.host = urlparse(self.start_url).netloc
+        self.output_dir = output_dir
+        self.settings = settings
+        self.max_pages = max_pages
+        self.fetch_concurrency = fetch_concurrency
+        self.session = create_session(pool_size=fetch_concurrency)
+        self.limiter = HostLimiter(per_host)
+        self.state_path = os.path.join(output_dir, CRAWL_STATE_FILENAME)
+        self.pages = self.load_state()
+        self.aliases = {}
+        self.summary = {"converted": 0, "unchanged": 0, "duplicates": 0, "skipped": 0, "failed": 0, "failures": []}
+
+    # ---- State ----
+    def load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("pages", {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_state(self):
+        write_atomic(self.state_path, json.dumps({"start_url": self.start_url, "pages": self.pages}, indent=1))
+
+    # ---- Links ----
+    def in_scope(self, url):
+        parsed = urlparse(url)
+        return (parsed.scheme in ("http", "https") and parsed.netloc.lower() == self.host
+                and os.path.splitext(parsed.path)[1].lower() in PAGE_EXTENSIONS)
+
+    def link_rewriter(self, page_url, links):
+        """
+        Returns the emitter callback for one page: it records in-scope links in
+        `links` and rewrites them to the relative path of their .md mirror.
+        Other links are made absolute.
+        """
+        page_dir = os.path.dirname(crawl_local_path(page_url))
+
+        def rewrite(href):
+            target = urljoin(page_url, href.strip())
+            if not self.in_scope(target):
+                return target if urlparse(target).scheme in ("http", "https") else href
+            canonical = normalize_crawl_url(target)
+            links.append(canonical)
+            fragment = urlparse(target).fragment
+            relative = os.path.relpath(crawl_local_path(canonical), page_dir or ".")
+            return relative + (f"#{fragment}" if fragment else "")
+        return rewrite
+
+    # ---- Fetching ----
+    def fetch(self, url):
+        """
+        Fetches and converts one page (runs on a fetch thread). Returns a result
+        dict; nothing is written here.
+        """
+        previous = self.pages.get(url, {})
+        headers = {}
+        if previous.get("path") and os.path.exists(os.path.join(self.output_dir, previous["path"])):
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        with self.limiter.for_url(url):
+            response = self.session.get(url, headers=headers, timeout=15)
+        if response.status_code == 304:
+            return {"status": "unchanged"}
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return {"status": "skipped"}
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        result = {
+            "status": "fetched",
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "hash": content_hash,
+        }
+        if content_hash == previous.get("hash") and previous.get("path"):
+            result["status"] = "unchanged"
+            return result
+
+        links = []
+        markdown_content = convert_html_to_markdown(
+            response.text,
+            keep_links=self.settings["keep_links"],
+            keep_images=self.settings["keep_images"],
+            keep_emphasis=self.settings["keep_emphasis"],
+            link_rewriter=self.link_rewriter(url, links)
+        )
+        result["links"] = list(dict.fromkeys(links))
+        result["headings"] = [[len(match.group(1)), match.group(2).strip()]
+                              for match in re.finditer(r'^(#+)\s+(.*)', markdown_content, flags=re.MULTILINE)]
+        if self.settings["generate_toc"]:
+            markdown_content = generate_table_of_contents(markdown_content)
+        result["markdown"] = markdown_content
+        return result
+
+    # ---- Coordination (main thread only) ----
+    def record(self, url, result):
+        """
+        Applies a fetch result to the output directory and the state. Returns
+        the page's outgoing in-scope links.
+        """
+        page = self.pages.setdefault(url, {})
+        for key in ("etag", "last_modified"):
+            if key in result:
+                page[key] = result[key]
+
+        if result["status"] == "skipped":
+            self.summary["skipped"] += 1
+            return []
+        self.visited.add(url)
+        if result["status"] == "unchanged":
+            self.summary["unchanged"] += 1
+            return page.get("links", [])
+
+        canonical = self.hash_index.get(result["hash"])
+        if canonical and canonical != url:
+            # Same content already written under another URL
+            self.summary["duplicates"] += 1
+            self.aliases[url] = canonical
+            page.pop("path", None)
+            page.pop("headings", None)
+            page.update(hash=result["hash"], links=result["links"], alias_of=canonical)
+            return result["links"]
+
+        path = crawl_local_path(url)
+        full_path = os.path.join(self.output_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        write_atomic(full_path, result["markdown"])
+        page.pop("alias_of", None)
+        page.update(path=path, hash=result["hash"], links=result["links"], headings=result["headings"])
+        self.hash_index[result["hash"]] = url
+        self.summary["converted"] += 1
+        console.print(f"[green]✔[/green] {url} -> {full_path}")
+        return result["links"]
+
+    def relink_aliases(self):
+        """
+        Points links to duplicate pages at the copy that was written. Only pages
+        that link to a duplicate are touched.
+        """
+        if not self.aliases:
+            return
+        for page in self.pages.values():
+            targets = [link for link in page.get("links", []) if link in self.aliases]
+            if not page.get("path") or not targets:
+                continue
+            full_path = os.path.join(self.output_dir, page["path"])
+            page_dir = os.path.dirname(page["path"]) or "."
+            with open(full_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            updated = content
+            for link in targets:
+                old = os.path.relpath(crawl_local_path(link), page_dir)
+                new = os.path.relpath(crawl_local_path(self.aliases[link]), page_dir)
+                updated = re.sub(r"\]\(" + re.escape(old) + r"(?=[)#])", lambda _: "](" + new, updated)
+            if updated != content:
+                write_atomic(full_path, updated)
+
+    def write_site_toc(self):
+        """
+        Writes the site-wide table of contents from the headings stored per page.
+        """
+        lines = ["# Site Contents", ""]
+        pages = [self.pages[url] for url in self.visited if self.pages[url].get("path")]
+        for page in sorted(pages, key=lambda p: p["path"]):
+            headings = page.get("headings") or []
+            title = next((text for level, text in headings if level == 1),
+                         headings[0][1] if headings else page["path"])
+            lines.append(f"- [{title}]({page['path']})")
+            for level, text in headings:
+                if level == 2:
+                    lines.append(f"  - [{text}]({page['path']}#{heading_anchor(text)})")
+        write_atomic(os.path.join(self.output_dir, SITE_TOC_FILENAME), "\n".join(lines) + "\n")
+
+    def run(self):
+        """
+        Crawls breadth-first from the start URL until the frontier is empty or
+        max_pages pages were requested. Returns a summary dict.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.visited = set()
+        self.hash_index = {page["hash"]: url for url, page in self.pages.items() if page.get("path") and page.get("hash")}
+        frontier = deque([self.start_url])
+        queued = {self.start_url}
+        requested = 0
+        in_flight = {}
+        started = time.perf_counter()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as fetchers:
+                while frontier or in_flight:
+                    while frontier and len(in_flight) < self.fetch_concurrency and requested < self.max_pages:
+                        url = frontier.popleft()
+                        in_flight[fetchers.submit(self.fetch, url)] = url
+                        requested += 1
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = in_flight.pop(future)
+                        try:
+                            links = self.record(url, future.result())
+                        except Exception as e:
+                            self.summary["failed"] += 1
+                            self.summary["failures"].append((url, str(e)))
+                            continue
+                        for link in links:
+                            if link not in queued:
+                                queued.add(link)
+                                frontier.append(link)
+        finally:
+            self.relink_aliases()
+            self.write_site_toc()
+            self.save_state()
+            self.session.close()
+
+        self.summary["elapsed"] = time.perf_counter() - started
+        return self.summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert HTML pages to Markdown.")
+    parser.add_argument("--batch", metavar="FILE", help="Non-interactive: convert every URL/local file listed in FILE")
+    parser.add_argument("--crawl", metavar="URL", help="Non-interactive: mirror the site under URL (same host) into Markdown")
+    parser.add_argument("--max-pages", type=int, default=500, help="Maximum pages requested per crawl")
+    parser.add_argument("--output-dir", default="output", help="Directory for converted files (batch and crawl mode)")
+    parser.add_argument("--workers", type=int, default=None, help="Conversion processes (default: CPU count)")
+    parser.add_argument("--fetch-concurrency", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent downloads per host")
+    parser.add_argument("--stream", action="store_true", help="Convert pages while they download, with bounded memory")
+    parser.add_argument("--no-images", action="store_true", help="Remove images")
+    parser.add_argument("--no-links", action="store_true", help="Remove links")
+    parser.add_argument("--no-emphasis", action="store_true", help="Ignore bold/italic")
+    parser.add_argument("--toc", action="store_true", help="Generate a table of contents")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    settings = {
+        "keep_images": not args.no_images,
+        "keep_links": not args.no_links,
+        "keep_emphasis": not args.no_emphasis,
+        "generate_toc": args.toc
+    }
+    if args.crawl:
+        crawler = SiteCrawler(
+            args.crawl,
+            args.output_dir,
+            settings,
+            max_pages=args.max_pages,
+            fetch_concurrency=args.fetch_concurrency,
+            per_host=args.per_host
+        )
+        summary = crawler.run()
+        print_batch_summary(summary)
+        sys.exit(1 if summary["failed"] else 0)
+
+    if args.batch:
+        summary = run_batch(
+            read_source_list(args.batch),
+            args.output_dir,
+            settings,
+            workers=args.workers,
+            fetch_concurrency=args.fetch_concurrency,
+            per_host=args.per_host,
+            stream=args.stream
+        )
+        print_batch_summary(summary)
+        sys.exit(1 if summary["failed"] else 0)
+
     print_banner()
     run_cli()
 
@@ -0,0 +1,4 @@
+import os
+
+# Settings require an API key; tests never call the model
+os.environ.setdefault("OPENAI_API_KEY", "test")
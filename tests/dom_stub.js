@@ -0,0 +1,267 @@
+// Minimal DOM for running page_extraction_service.EXTRACTION_SCRIPT under node.
+//
+// Reads {tree, script, args} as JSON on stdin, builds the page from `tree`
+// (parsed from fixture HTML by tests/test_page_extraction_service.py), runs
+// the script with `args` plus a done callback, and prints the result as JSON.
+//
+// Only what the script and the fixtures use is implemented: the selectors in
+// EXPAND_SELECTORS, `:scope >`, closest(), innerText, dataset and a
+// MutationObserver for childList/characterData. Page behaviour is declared on
+// the fixture elements instead of in page scripts:
+//   data-reveal-ms   button: after the delay, its parent shows parent.dataset.full
+//   data-append-ms   button: after the delay, the section's <template> rows are
+//                    appended to its <ul> and the button is marked expanded
+//   data-load-ms     element: after the delay, it is replaced by its <template>
+//   data-tick-ms     element: its text changes at this interval, forever
+
+const BLOCK = new Set(["body", "main", "header", "footer", "nav", "section", "div", "ul", "li", "h1", "h2", "p"]);
+const HIDDEN = new Set(["head", "script", "style", "template"]);
+
+const observers = [];
+
+function notify(target, type) {
+  for (const observer of observers) {
+    if (!observer.target || !observer.options[type]) continue;
+    for (let node = target; node; node = node.parentElement) {
+      if (node === observer.target) {
+        observer.queue(target, type);
+        break;
+      }
+    }
+  }
+}
+
+class Text {
+  constructor(data) {
+    this.data = data;
+    this.parentElement = null;
+  }
+
+  clone() {
+    return new Text(this.data);
+  }
+}
+
+class Element {
+  constructor(tag, attrs) {
+    this.tagName = tag;
+    this.attrs = Object.assign({}, attrs);
+    this.childNodes = [];
+    this.parentElement = null;
+    const element = this;
+    this.dataset = new Proxy({}, {
+      get: (_, key) => element.attrs["data-" + kebab(key)],
+      set: (_, key, value) => { element.attrs["data-" + kebab(key)] = String(value); return true; },
+      has: (_, key) => ("data-" + kebab(key)) in element.attrs,
+    });
+  }
+
+  get id() { return this.attrs.id || ""; }
+  get children() { return this.childNodes.filter(node => node instanceof Element); }
+  get classList() {
+    const classes = (this.attrs.class || "").split(/\s+/);
+    return {contains: name => classes.includes(name)};
+  }
+
+  getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; }
+  setAttribute(name, value) { this.attrs[name] = String(value); }
+
+  appendChild(node) {
+    node.parentElement = this;
+    this.childNodes.push(node);
+    notify(this, "childList");
+    return node;
+  }
+
+  replaceWith(...nodes) {
+    const parent = this.parentElement;
+    const index = parent.childNodes.indexOf(this);
+    for (const node of nodes) node.parentElement = parent;
+    parent.childNodes.splice(index, 1, ...nodes);
+    this.parentElement = null;
+    notify(parent, "childList");
+  }
+
+  set textContent(text) {
+    this.childNodes = [];
+    this.appendChild(new Text(text));
+  }
+
+  clone() {
+    const copy = new Element(this.tagName, this.attrs);
+    for (const node of this.childNodes) {
+      const child = node.clone();
+      child.parentElement = copy;
+      copy.childNodes.push(child);
+    }
+    return copy;
+  }
+
+  // A template's rows are inert content, not part of the document
+  get content() { return this.childNodes; }
+
+  descendants() {
+    const found = [];
+    if (this.tagName === "template") return found;
+    for (const child of this.children) found.push(child, ...child.descendants());
+    return found;
+  }
+
+  matches(selector) {
+    return selector.split(",").some(part => matchesCompound(this, part.trim()));
+  }
+
+  closest(selector) {
+    for (let node = this; node; node = node.parentElement) {
+      if (node.matches(selector)) return node;
+    }
+    return null;
+  }
+
+  querySelectorAll(selector) {
+    const scoped = selector.match(/^:scope\s*>\s*(.+)$/);
+    if (scoped) return this.children.filter(child => child.matches(scoped[1]));
+    return this.descendants().filter(element => element.matches(selector));
+  }
+
+  querySelector(selector) {
+    return this.querySelectorAll(selector)[0] || null;
+  }
+
+  get innerText() {
+    const out = [];
+    (function walk(node) {
+      if (node instanceof Text) {
+        out.push(node.data.replace(/\s+/g, " "));
+        return;
+      }
+      if (HIDDEN.has(node.tagName)) return;
+      // Chrome lays out the absolutely positioned screen-reader copy on its own line
+      const block = BLOCK.has(node.tagName) || node.classList.contains("visually-hidden");
+      if (block) out.push("\n");
+      node.childNodes.forEach(walk);
+      if (block) out.push("\n");
+    })(this);
+    return out.join("").split("\n").map(line => line.trim()).filter(Boolean).join("\n");
+  }
+
+  click() {
+    const delay = name => Number(this.attrs[name]);
+    if ("data-reveal-ms" in this.attrs) {
+      const container = this.parentElement;
+      setTimeout(() => { container.textContent = container.dataset.full; }, delay("data-reveal-ms"));
+    } else if ("data-append-ms" in this.attrs) {
+      setTimeout(() => {
+        const section = this.closest("section");
+        const list = section.querySelector("ul");
+        for (const row of templateOf(section).content) list.appendChild(row.clone());
+        this.setAttribute("aria-expanded", "true");
+      }, delay("data-append-ms"));
+    }
+  }
+}
+
+function templateOf(element) {
+  return element.children.find(child => child.tagName === "template");
+}
+
+function kebab(key) {
+  return key.replace(/[A-Z]/g, letter => "-" + letter.toLowerCase());
+}
+
+function matchesCompound(element, selector) {
+  const parsed = selector.match(/^([a-z0-9]+)?((?:\.[\w-]+|\[[^\]]+\])*)$/i);
+  if (!parsed) throw new Error("Unsupported selector: " + selector);
+  if (parsed[1] && parsed[1].toLowerCase() !== element.tagName) return false;
+  for (const part of parsed[2].match(/\.[\w-]+|\[[^\]]+\]/g) || []) {
+    if (part[0] === ".") {
+      if (!element.classList.contains(part.slice(1))) return false;
+      continue;
+    }
+    const attr = part.match(/^\[([\w-]+)(?:(\*?=)'([^']*)'(\s+i)?)?\]$/);
+    if (!attr) throw new Error("Unsupported selector: " + selector);
+    const value = element.getAttribute(attr[1]);
+    if (value === null) return false;
+    if (!attr[2]) continue;
+    const [actual, expected] = attr[4] ? [value.toLowerCase(), attr[3].toLowerCase()] : [value, attr[3]];
+    if (attr[2] === "=" ? actual !== expected : !actual.includes(expected)) return false;
+  }
+  return true;
+}
+
+function build(tree) {
+  if (typeof tree === "string") return new Text(tree);
+  const element = new Element(tree.tag, tree.attrs);
+  for (const child of tree.children) {
+    const node = build(child);
+    node.parentElement = element;
+    element.childNodes.push(node);
+  }
+  return element;
+}
+
+function startBehaviours(root) {
+  for (const element of root.descendants()) {
+    if ("data-load-ms" in element.attrs) {
+      setTimeout(() => {
+        element.replaceWith(...templateOf(element).content.map(node => node.clone()));
+      }, Number(element.attrs["data-load-ms"]));
+    }
+    if ("data-tick-ms" in element.attrs) {
+      let ticks = 0;
+      const timer = setInterval(() => { element.textContent = `${++ticks}m ago`; },
+        Number(element.attrs["data-tick-ms"]));
+      timer.unref();
+    }
+  }
+}
+
+global.MutationObserver = class {
+  constructor(callback) {
+    this.callback = callback;
+    this.records = [];
+    this.target = null;
+  }
+
+  observe(target, options) {
+    this.target = target;
+    this.options = options;
+    observers.push(this);
+  }
+
+  disconnect() {
+    this.target = null;
+    this.records = [];
+  }
+
+  queue(target, type) {
+    if (!this.records.length) {
+      queueMicrotask(() => {
+        const records = this.records;
+        this.records = [];
+        if (this.target && records.length) this.callback(records);
+      });
+    }
+    this.records.push({type: type, target: target});
+  }
+};
+
+let input = "";
+process.stdin.on("data", chunk => { input += chunk; });
+process.stdin.on("end", () => {
+  const {tree, script, args} = JSON.parse(input);
+  const html = build(tree);
+  const body = html.querySelector("body");
+  global.document = {
+    title: (html.querySelector("title") || {innerText: ""}).innerText,
+    body: body,
+    querySelector: selector => html.querySelector(selector),
+    querySelectorAll: selector => html.querySelectorAll(selector),
+  };
+  global.location = {href: "file:///fixture.html"};
+  startBehaviours(html);
+  new Function(script)(...args, result => {
+    process.stdout.write(JSON.stringify(result));
+    process.exit(0);
+  });
+});
@@ -0,0 +1,92 @@
+"""
+Offline model endpoint for exercising `ModelCallScheduler` without an API key.
+
+`RateLimitStub` enforces a requests/tokens budget per window, answers with
+`x-ratelimit-*` headers like the OpenAI API, and raises 429s (with
+`retry-after-ms`) when the budget is exhausted or at random.
+"""
+
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+
+class StubRateLimitError(Exception):
+    """429 raised by `RateLimitStub`, shaped like an OpenAI status error."""
+
+    def __init__(self, message: str, headers: Dict[str, str]):
+        super().__init__(message)
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+class RateLimitStub:
+    """
+    Offline model endpoint with a requests/tokens budget per window.
+
+    Calling the stub returns a raw-response-like object (`.headers`, `.parse()`)
+    or raises `StubRateLimitError` when the budget is exhausted. Additional 429s
+    are injected at random with probability ``inject_429_rate``, or for the
+    first ``fail_first`` calls; they carry ``retry_after_ms`` as `retry-after-ms`
+    (no header when None).
+    """
+
+    def __init__(self, requests_per_window: int = 10, tokens_per_window: int = 10000,
+                 window: float = 1.0, inject_429_rate: float = 0.0,
+                 latency: float = 0.0, result: Any = "ok", seed: Optional[int] = None,
+                 fail_first: int = 0, retry_after_ms: Optional[int] = 50):
+        self.requests_per_window = requests_per_window
+        self.tokens_per_window = tokens_per_window
+        self.window = window
+        self.inject_429_rate = inject_429_rate
+        self.latency = latency
+        self.result = result
+        self.fail_first = fail_first
+        self.retry_after_ms = retry_after_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._tokens = 0
+        self.served = 0
+        self.rejected = 0
+        self.call_times = []
+
+    def _headers(self, now: float) -> Dict[str, str]:
+        reset = max(0.0, self._window_start + self.window - now)
+        return {
+            "x-ratelimit-limit-requests": str(self.requests_per_window),
+            "x-ratelimit-limit-tokens": str(self.tokens_per_window),
+            "x-ratelimit-remaining-requests": str(max(0, self.requests_per_window - self._requests)),
+            "x-ratelimit-remaining-tokens": str(max(0, self.tokens_per_window - self._tokens)),
+            "x-ratelimit-reset-requests": f"{reset * 1000:.0f}ms",
+            "x-ratelimit-reset-tokens": f"{reset * 1000:.0f}ms",
+        }
+
+    def __call__(self, tokens: int = 100):
+        with self._lock:
+            now = time.monotonic()
+            self.call_times.append(now)
+            if now - self._window_start >= self.window:
+                self._window_start, self._requests, self._tokens = now, 0, 0
+            over_budget = (self._requests >= self.requests_per_window
+                           or self._tokens + tokens > self.tokens_per_window)
+            injected = len(self.call_times) <= self.fail_first or self._random.random() < self.inject_429_rate
+            if over_budget or injected:
+                self.rejected += 1
+                headers = self._headers(now)
+                if over_budget:
+                    headers["retry-after-ms"] = headers["x-ratelimit-reset-requests"][:-2]
+                elif self.retry_after_ms is not None:
+                    headers["retry-after-ms"] = str(self.retry_after_ms)
+                raise StubRateLimitError("Rate limit reached (stub)", headers)
+            self._requests += 1
+            self._tokens += tokens
+            self.served += 1
+            headers = self._headers(now)
+        if self.latency:
+            time.sleep(self.latency)
+        result = self.result
+        return SimpleNamespace(headers=headers, parse=lambda: result)
@@ -0,0 +1,65 @@
+import json
+from collections import Counter
+
+from app.services.batch_structuring_service import LocalBatchClient, structure_profiles_batch
+from benchmarks.fixtures import synthetic_profile
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def responder_for(behaviour):
+    """
+    Answers the n-th request for a custom_id with ``behaviour[custom_id][n]``
+    (the last outcome repeats; "ok" when absent), recording the calls.
+    """
+    calls = Counter()
+
+    def respond(custom_id, body):
+        outcomes = behaviour.get(custom_id, ["ok"])
+        outcome = outcomes[min(calls[custom_id], len(outcomes) - 1)]
+        calls[custom_id] += 1
+        if outcome == "ok":
+            return json.dumps(synthetic_profile(1))
+        if outcome == "invalid":
+            return '{"name": "truncated'
+        raise HTTPError(outcome)
+
+    return respond, calls
+
+
+def structure(behaviour, ids):
+    respond, calls = responder_for(behaviour)
+    profiles, errors = structure_profiles_batch({custom_id: "raw" for custom_id in ids},
+                                                client=LocalBatchClient(respond), poll_interval=0)
+    return profiles, errors, calls
+
+
+def test_transient_failures_are_resubmitted():
+    profiles, errors, calls = structure({"rate_limited": [429, "ok"], "server_error": [500, 503, "ok"]},
+                                        ["fine", "rate_limited", "server_error"])
+
+    assert sorted(profiles) == ["fine", "rate_limited", "server_error"]
+    assert errors == {}
+    assert calls == {"fine": 1, "rate_limited": 2, "server_error": 3}
+
+
+def test_permanent_failures_are_final_at_once():
+    profiles, errors, calls = structure({"bad_request": [400], "invalid": ["invalid"]},
+                                        ["fine", "bad_request", "invalid"])
+
+    assert list(profiles) == ["fine"]
+    assert errors["bad_request"].startswith("HTTP 400")
+    assert errors["invalid"].startswith("Invalid structured output")
+    assert calls == {"fine": 1, "bad_request": 1, "invalid": 1}
+
+
+def test_transient_failures_give_up_after_max_attempts():
+    profiles, errors, calls = structure({"down": [500]}, ["down"])
+
+    assert profiles == {}
+    assert errors["down"].startswith("HTTP 500")
+    assert calls == {"down": 3}
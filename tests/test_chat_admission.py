@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import dependencies
+from app.api.routes import chat
+from app.core.config import get_settings
+from app.models.chat import ChatMessage, ChatResponse
+from app.services.admission_service import AdmissionController
+
+EXTRACT = "Please extract https://www.linkedin.com/in/jane-doe/"
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(max_tool_turns=1, max_tool_queue=0, max_wait=0.1)
+    monkeypatch.setattr(chat, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(dependencies, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(get_settings(), "RESPONSE_CACHE_ENABLED", False)
+    return controller
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    calls = []
+
+    async def completion(messages):
+        calls.append(messages)
+        return ChatResponse(message=ChatMessage(role="assistant", content="Sure."))
+
+    monkeypatch.setattr(chat, "get_chat_completion", completion)
+    return calls
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    return TestClient(app)
+
+
+def post(client, text):
+    return client.post("/api/chat", json={"messages": [{"role": "user", "content": text}]})
+
+
+def test_extraction_turn_is_shed_before_the_first_completion(client, controller, completions):
+    # Every browser slot is taken and nothing may queue
+    asyncio.run(controller.tool_turns.acquire())
+
+    response = post(client, EXTRACT)
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert completions == []
+    # Turns that will not start an extraction are still answered
+    assert post(client, "How does the extraction work?").status_code == 200
+    assert len(completions) == 1
+
+
+def test_reserved_tool_slot_is_released_without_tool_calls(client, controller, completions):
+    assert post(client, EXTRACT).status_code == 200
+
+    assert len(completions) == 1
+    assert controller.tool_turns.in_flight == 0
+    assert controller.tool_turns.stats["admitted"] == 1
+
+
+def test_may_call_tools_looks_at_the_latest_user_message():
+    url = ChatMessage(role="user", content=EXTRACT)
+    later = ChatMessage(role="user", content="Thanks!")
+    answer = ChatMessage(role="assistant", content="Done.")
+
+    assert chat.may_call_tools([url])
+    assert chat.may_call_tools([url, answer])
+    assert not chat.may_call_tools([url, answer, later])
@@ -0,0 +1,58 @@
+import io
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import profiles
+from app.core.config import get_settings
+from app.services.download_service import iter_zip
+from app.services.profile_store_service import person_key, save_profile
+from benchmarks.fixtures import synthetic_profile
+
+
+def test_render_error_becomes_an_error_entry(monkeypatch):
+    monkeypatch.setattr(get_settings(), "PDF_UNICODE_FONT", None)
+    # Without a Unicode font, CJK text cannot be set in the PDF fonts
+    entries = [("ok.pdf", synthetic_profile(1)), ("cjk.pdf", dict(synthetic_profile(2), name="山田太郎")),
+               ("last.pdf", synthetic_profile(3))]
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(entries, "pdf"))))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == ["ok.pdf", "cjk.pdf.error.txt", "last.pdf"]
+    assert "U+5C71" in archive.read("cjk.pdf.error.txt").decode("utf-8")
+    assert archive.read("last.pdf").startswith(b"%PDF")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The store lives under ./output/profiles
+    monkeypatch.chdir(tmp_path)
+    app = FastAPI()
+    app.include_router(profiles.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_archive_defaults_to_the_latest_version_of_each_person(client):
+    url = "https://www.linkedin.com/in/jane-doe/"
+    first = synthetic_profile(1)
+    save_profile(first, person=person_key(first, url))
+    latest = save_profile(dict(first, headline="Staff Engineer"), person=person_key(first, url))
+    other = save_profile(synthetic_profile(2))
+
+    response = client.get("/api/profiles/archive?format=md")
+
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert sorted(name[-11:-3] for name in names) == sorted([latest[:8], other[:8]])
+
+
+def test_archive_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ARCHIVE_MAX_PROFILES", 2)
+    ids = [save_profile(synthetic_profile(i)) for i in range(3)]
+
+    assert client.get(f"/api/profiles/archive?ids={','.join(ids[:2])}&format=md").status_code == 200
+    assert client.get(f"/api/profiles/archive?ids={','.join(ids)}&format=md").status_code == 400
+    assert client.get("/api/profiles/archive?format=md").status_code == 400
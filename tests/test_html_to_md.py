@@ -0,0 +1,205 @@
+import hashlib
+import http.server
+import os
+import sys
+import threading
+import tracemalloc
+
+import pytest
+
+from benchmarks.fixtures import documentation_page
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "other_tools"))
+import html_to_md  # noqa: E402
+
+SETTINGS = {"keep_links": True, "keep_images": True, "keep_emphasis": True, "generate_toc": False}
+
+
+@pytest.fixture(scope="module")
+def large_page(tmp_path_factory):
+    """A ~3 MB generated documentation page on disk, and its tree-engine Markdown."""
+    html = documentation_page(2000)
+    path = tmp_path_factory.mktemp("pages") / "large.html"
+    path.write_text(html, encoding="utf-8")
+    return str(path), html_to_md.convert_html_to_markdown(html)
+
+
+def test_stream_output_matches_tree_output(large_page, tmp_path):
+    path, tree = large_page
+    output = tmp_path / "large.md"
+
+    html_to_md.stream_source_to_file(path, str(output), SETTINGS)
+
+    assert output.read_text(encoding="utf-8") == tree + "\n"
+
+
+def test_stream_toc_matches_tree_toc(large_page, tmp_path):
+    path, tree = large_page
+    output = tmp_path / "large.md"
+
+    html_to_md.stream_source_to_file(path, str(output), dict(SETTINGS, generate_toc=True))
+
+    assert output.read_text(encoding="utf-8") == html_to_md.generate_table_of_contents(tree) + "\n"
+
+
+def test_stream_memory_does_not_grow_with_the_page(tmp_path):
+    peaks = {}
+    for sections in (200, 2000):
+        path = tmp_path / f"page_{sections}.html"
+        path.write_text(documentation_page(sections), encoding="utf-8")
+        tracemalloc.start()
+        try:
+            html_to_md.stream_source_to_file(str(path), str(tmp_path / f"page_{sections}.md"), SETTINGS)
+            peaks[sections] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Ten times the page, about the same peak: ~3 MB of HTML converts in well under 1 MB
+    assert peaks[2000] < 1024 * 1024
+    assert peaks[2000] < peaks[200] * 1.5
+
+
+
+def test_batch_writes_each_page_as_it_is_converted(tmp_path, monkeypatch):
+    sources = []
+    for index in range(40):
+        path = tmp_path / f"page_{index}.html"
+        path.write_text(documentation_page(5, seed=index), encoding="utf-8")
+        sources.append(str(path))
+    output_dir = tmp_path / "out"
+    held = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    fetch_source, write_atomic = html_to_md.fetch_source, html_to_md.write_atomic
+
+    def counting_fetch(*args):
+        html = fetch_source(*args)
+        with lock:
+            held["now"] += 1
+            held["max"] = max(held["max"], held["now"])
+        return html
+
+    def counting_write(*args):
+        write_atomic(*args)
+        with lock:
+            held["now"] -= 1
+
+    monkeypatch.setattr(html_to_md, "fetch_source", counting_fetch)
+    monkeypatch.setattr(html_to_md, "write_atomic", counting_write)
+
+    summary = html_to_md.run_batch(sources, str(output_dir), SETTINGS, workers=1, fetch_concurrency=4)
+
+    assert (summary["converted"], summary["failed"]) == (40, 0)
+    for source in sources:
+        with open(source, encoding="utf-8") as f:
+            expected = html_to_md.convert_job(f.read(), SETTINGS)
+        assert (output_dir / html_to_md.batch_output_name(source)).read_text(encoding="utf-8") == expected
+    # Fetched-but-unwritten pages stay within the fetch slots plus the conversion queue
+    assert held["max"] <= 2 * 4 + 2 * 1
+
+# ------------------------------
+# Crawl mode against a local server
+# ------------------------------
+INTRO = b'<html><body><h1>Intro</h1><p>Start with the <a href="../api.html">API</a>.</p></body></html>'
+SITE = {
+    "/": b'<html><body><h1>Home</h1><ul><li><a href="guide/intro.html">Intro</a></li>'
+         b'<li><a href="latest.html">Latest</a></li><li><a href="api.html">API</a></li></ul></body></html>',
+    "/guide/intro.html": INTRO,
+    # Same bytes as the intro under a second URL
+    "/latest.html": INTRO,
+    "/api.html": b'<html><body><h1>API</h1><p>See the <a href="latest.html#setup">latest guide</a>.</p></body></html>',
+}
+
+
+class SiteHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        body = server.pages.get(self.path)
+        if body is None:
+            status = 404
+        elif server.etags and self.headers.get("If-None-Match") == f'"{hashlib.sha256(body).hexdigest()}"':
+            status = 304
+        else:
+            status = 200
+        server.log.append((self.path, status))
+        self.send_response(status)
+        if status == 200:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if server.etags:
+                self.send_header("ETag", f'"{hashlib.sha256(body).hexdigest()}"')
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    server.pages = dict(SITE)
+    server.etags = True
+    server.log = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def crawl(server, output_dir):
+    # One fetch at a time, so the first copy of the duplicate page is always /guide/intro.html
+    crawler = html_to_md.SiteCrawler(f"http://127.0.0.1:{server.server_port}/", str(output_dir), SETTINGS,
+                                     fetch_concurrency=1)
+    server.log.clear()
+    return crawler.run()
+
+
+def test_crawl_writes_duplicates_once_and_relinks_them(site, tmp_path):
+    summary = crawl(site, tmp_path)
+
+    assert (summary["converted"], summary["duplicates"], summary["failed"]) == (3, 1, 0)
+    assert sorted(str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*.md")) == [
+        "_site_toc.md", "api.md", "guide/intro.md", "index.md"]
+    # Links to the duplicate point at the copy that was written
+    api = (tmp_path / "api.md").read_text(encoding="utf-8")
+    assert "](guide/intro.md#setup)" in api and "latest.md" not in api
+    index = (tmp_path / "index.md").read_text(encoding="utf-8")
+    assert "](guide/intro.md)" in index and "latest.md" not in index
+    assert "](../api.md)" in (tmp_path / "guide" / "intro.md").read_text(encoding="utf-8")
+
+
+def test_recrawl_revalidates_with_etags(site, tmp_path):
+    crawl(site, tmp_path)
+    written = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*.md") if path.name != "_site_toc.md"}
+
+    summary = crawl(site, tmp_path)
+
+    assert (summary["converted"], summary["unchanged"], summary["duplicates"]) == (0, 3, 1)
+    # Written pages are revalidated; the duplicate was never written, so it has nothing to revalidate
+    assert sorted(site.log) == [("/", 304), ("/api.html", 304), ("/guide/intro.html", 304), ("/latest.html", 200)]
+    assert {path: path.stat().st_mtime_ns for path in written} == written
+
+    site.pages["/api.html"] = b"<html><body><h1>API</h1><p>Now with examples.</p></body></html>"
+    summary = crawl(site, tmp_path)
+
+    assert (summary["converted"], summary["unchanged"]) == (1, 2)
+    assert "Now with examples." in (tmp_path / "api.md").read_text(encoding="utf-8")
+
+
+def test_recrawl_without_etags_skips_unchanged_content(site, tmp_path):
+    site.etags = False
+    crawl(site, tmp_path)
+    written = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*.md") if path.name != "_site_toc.md"}
+
+    summary = crawl(site, tmp_path)
+
+    # Every page is downloaded again, but the same content hash means nothing is converted
+    assert all(status == 200 for _, status in site.log)
+    assert (summary["converted"], summary["unchanged"], summary["duplicates"]) == (0, 3, 1)
+    assert {path: path.stat().st_mtime_ns for path in written} == written
@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+from app.services import linkedin_service
+from app.services.linkedin_service import LinkedInProfile, save_structured_profile
+from benchmarks.fixtures import synthetic_profile
+
+
+def test_index_failure_still_renders_the_resume(tmp_path, monkeypatch):
+    # The store lives under ./output/profiles
+    monkeypatch.chdir(tmp_path)
+
+    def index_profile(*args):
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(linkedin_service, "index_profile", index_profile)
+
+    files = save_structured_profile(LinkedInProfile.model_validate(synthetic_profile(1)), str(tmp_path / "out"))
+
+    assert [os.path.splitext(path)[1] for path in files] == [".md", ".html", ".docx"]
+    assert all(os.path.getsize(path) for path in files)
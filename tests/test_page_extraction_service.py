@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import subprocess
+from html.parser import HTMLParser
+
+import pytest
+
+from app.services.page_extraction_service import extract_profile_sections, sections_to_text
+
+NODE = shutil.which("node")
+DOM_STUB = os.path.join(os.path.dirname(__file__), "dom_stub.js")
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is required to run the extraction script")
+
+VOID = {"meta", "link", "br", "img", "input", "hr"}
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = {"tag": "#root", "attrs": {}, "children": []}
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        element = {"tag": tag, "attrs": {name: value or "" for name, value in attrs}, "children": []}
+        self.stack[-1]["children"].append(element)
+        if tag not in VOID:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        while len(self.stack) > 1:
+            if self.stack.pop()["tag"] == tag:
+                break
+
+    def handle_data(self, data):
+        self.stack[-1]["children"].append(data)
+
+
+def page_tree(page: str) -> dict:
+    builder = _TreeBuilder()
+    builder.feed(page)
+    builder.close()
+    return next(child for child in builder.root["children"] if isinstance(child, dict) and child["tag"] == "html")
+
+
+class NodeDriver:
+    """Stands in for a WebDriver: runs async scripts against a fixture page in tests/dom_stub.js."""
+
+    def __init__(self, page: str):
+        self.tree = page_tree(page)
+        self.script_timeout = 30
+
+    def set_script_timeout(self, seconds: float) -> None:
+        self.script_timeout = seconds
+
+    def execute_async_script(self, script: str, *args):
+        completed = subprocess.run(
+            [NODE, DOM_STUB], input=json.dumps({"tree": self.tree, "script": script, "args": args}),
+            capture_output=True, text=True, timeout=self.script_timeout, check=True,
+        )
+        return json.loads(completed.stdout)
+
+
+def dual(text: str) -> str:
+    return f'<span aria-hidden="true">{text}</span><span class="visually-hidden">{text}</span>'
+
+
+def page(main: str, outside: str = "") -> str:
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Jane Doe | LinkedIn</title></head>"
+            f"<body><header><nav><a>Home</a> <a>Jobs</a></nav></header><main>{main}</main>{outside}"
+            f"<footer><a>Privacy &amp; Terms</a></footer></body></html>")
+
+
+ABOUT = "Builds search systems. " * 8
+OLD_ROLE = "Migrated the billing platform to a new ledger and cut month-end close from five days to one."
+
+PROFILE = page(
+    '<section><div><h1>Jane Doe</h1><div>Staff Engineer</div><span>Berlin</span></div></section>'
+    '<section><div id="about"></div><div><h2>' + dual("About") + "</h2></div>"
+    f'<div data-full="{ABOUT}"><span aria-hidden="true">{ABOUT[:40]}…</span>'
+    '<button class="inline-show-more-text__button" aria-expanded="false" data-reveal-ms="50">…see more</button>'
+    "</div></section>"
+    '<section><div id="experience"></div><div><h2>' + dual("Experience") + "</h2></div><ul>"
+    "<li><div>" + dual("Staff Engineer") + "</div><div>" + dual("Acme") + "</div></li></ul>"
+    "<template><li><div>" + dual("Engineer") + "</div><div>" + dual("Beta") + "</div>"
+    f'<div data-full="{OLD_ROLE}"><span aria-hidden="true">{OLD_ROLE[:30]}…</span>'
+    '<button class="inline-show-more-text__button" aria-expanded="false" data-reveal-ms="50">…see more</button>'
+    "</div></li></template>"
+    '<button class="pvs-list__footer-button" aria-expanded="false" data-append-ms="100">Show all 2 experiences</button>'
+    "</section>"
+    '<div data-load-ms="150"><template><section><div id="languages"></div><div><h2>' + dual("Languages")
+    + "</h2></div><ul><li>" + dual("German") + "</li></ul></section></template></div>"
+)
+
+
+def test_expands_see_more_and_show_all():
+    result = extract_profile_sections(NodeDriver(PROFILE), quiet_ms=200, timeout=10)
+
+    sections = result["sections"]
+    assert list(sections) == ["top_card", "about", "experience", "languages"]
+    assert sections["top_card"]["text"] == "Jane Doe\nStaff Engineer\nBerlin"
+    assert sections["about"]["text"] == ABOUT.strip()
+    # The "see more" inside the revealed role needs a second round
+    assert sections["experience"]["items"] == ["Staff Engineer\nAcme", f"Engineer\nBeta\n{OLD_ROLE}"]
+    assert sections["languages"]["items"] == ["German"]
+    assert result["stats"]["rounds"] == 2
+    assert result["stats"]["clicked"] == 3
+    assert result["stats"]["quietCapped"] == 0
+    assert "## Experience\nStaff Engineer\nAcme" in sections_to_text(result)
+
+
+def test_live_widget_caps_each_quiet_wait():
+    live = page('<section><div><h1>Jane Doe</h1><span data-tick-ms="50">now</span></div></section>'
+                '<section><div id="about"></div><div><h2>About</h2></div>'
+                f'<div data-full="{ABOUT}"><span>{ABOUT[:40]}…</span>'
+                '<button class="inline-show-more-text__button" aria-expanded="false" data-reveal-ms="10">'
+                "…see more</button></div></section>")
+
+    result = extract_profile_sections(NodeDriver(live), quiet_ms=200, quiet_max_ms=400, timeout=10)
+
+    stats = result["stats"]
+    # One capped wait before expanding and one after, instead of running to the timeout
+    assert stats["quietCapped"] == 2
+    assert not stats["timedOut"]
+    assert 800 <= stats["waitedMs"] < 2000
+    assert result["sections"]["about"]["text"] == ABOUT.strip()
+
+
+def test_changes_outside_main_are_not_waited_for():
+    busy = page('<section><div><h1>Jane Doe</h1></div></section>',
+                outside='<aside><span data-tick-ms="50">Messaging</span></aside>')
+
+    result = extract_profile_sections(NodeDriver(busy), quiet_ms=200, quiet_max_ms=2000, timeout=10)
+
+    assert result["stats"]["quietCapped"] == 0
+    assert result["stats"]["waitedMs"] < 1000
+
+
+def test_falls_back_to_page_text_without_sections():
+    plain = page("<div><h1>Jane Doe</h1><p>Staff Engineer at Acme</p><p>See more</p></div>")
+
+    result = extract_profile_sections(NodeDriver(plain), quiet_ms=100, timeout=10)
+
+    assert result["sections"] == {}
+    assert result["text"] == "Home Jobs\nJane Doe\nStaff Engineer at Acme\nPrivacy & Terms"
+    assert sections_to_text(result) == result["text"]
@@ -0,0 +1,37 @@
+from app.services.profile_index_service import index_profile, index_profiles, search_profiles
+from app.services.profile_store_service import person_key, save_profile
+from benchmarks.fixtures import synthetic_profile
+
+
+def test_same_name_people_are_indexed_separately(tmp_path):
+    db_path = str(tmp_path / "search.sqlite3")
+    for seed, company in ((1, "Acme"), (2, "Beta")):
+        data = synthetic_profile(seed)
+        data["name"] = "John Smith"
+        data["experience"][0]["company"] = company
+        person = person_key(data)
+        index_profile(save_profile(data, str(tmp_path), person=person), data, person, db_path=db_path)
+
+    assert search_profiles("john", db_path=db_path)["total"] == 2
+
+
+def test_every_match_is_ranked_and_paginated(tmp_path):
+    db_path = str(tmp_path / "search.sqlite3")
+    profiles = []
+    for i in range(60):
+        data = synthetic_profile(i)
+        data["about"] = "Builds zephyrine pipelines."
+        profiles.append((f"{i:016x}", data, None))
+    # The best match is the one indexed first
+    profiles[0][1]["name"] = "Zephyrine Expert"
+    index_profiles(profiles, db_path)
+
+    first = search_profiles("zephyrine", page_size=7, db_path=db_path)
+    assert first["total"] == 60
+    assert first["results"][0]["profile_id"] == profiles[0][0]
+
+    seen = []
+    for page in range(1, 10):
+        seen.extend(result["profile_id"] for result in
+                    search_profiles("zephyrine", page=page, page_size=7, db_path=db_path)["results"])
+    assert sorted(seen) == sorted(profile_id for profile_id, _, _ in profiles)
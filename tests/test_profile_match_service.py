@@ -0,0 +1,35 @@
+from app.services.profile_match_service import match_profiles
+from app.services.profile_store_service import person_key, save_profile
+from benchmarks.fixtures import synthetic_profile
+
+
+def _save(store_dir, data, profile_url=None):
+    return save_profile(data, str(store_dir), person=person_key(data, profile_url))
+
+
+def test_same_name_profiles_are_both_ranked(tmp_path):
+    first = synthetic_profile(1)
+    second = synthetic_profile(2)
+    for data, company in ((first, "Acme"), (second, "Beta")):
+        data["name"] = "John Smith"
+        data["skills"] = ["Python", "Kubernetes"]
+        data["experience"][0]["company"] = company
+    ids = {_save(tmp_path, first), _save(tmp_path, second)}
+
+    results = match_profiles("Python engineer with Kubernetes", store_dir=str(tmp_path))
+
+    assert results["profiles_considered"] == 2
+    assert {result["profile_id"] for result in results["results"]} == ids
+
+
+def test_only_latest_version_of_a_person_is_ranked(tmp_path):
+    url = "https://www.linkedin.com/in/john-smith/"
+    old = synthetic_profile(1)
+    old["skills"] = ["Python"]
+    new = dict(old, skills=["Python", "Kubernetes"])
+    _save(tmp_path, old, url)
+    latest = _save(tmp_path, new, url)
+
+    results = match_profiles("Python engineer", store_dir=str(tmp_path))
+
+    assert [result["profile_id"] for result in results["results"]] == [latest]
@@ -0,0 +1,42 @@
+import multiprocessing
+
+from app.services.profile_store_service import iter_latest_versions, person_key, save_profile, _read_versions, _versions_path
+from benchmarks.fixtures import synthetic_profile
+
+URL = "https://www.linkedin.com/in/john-smith/"
+
+
+def test_person_key_uses_only_the_profile_url():
+    data = synthetic_profile(1)
+    assert person_key(data, URL) == "url:in/john-smith"
+    assert person_key(data) is None
+
+
+def test_latest_version_per_person(tmp_path):
+    first = synthetic_profile(1)
+    second = dict(first, headline="Staff Engineer")
+    save_profile(first, str(tmp_path), person=person_key(first, URL))
+    latest = save_profile(second, str(tmp_path), person=person_key(second, URL))
+    other = save_profile(synthetic_profile(2), str(tmp_path))
+
+    assert sorted(profile_id for _, profile_id in iter_latest_versions(str(tmp_path))) == sorted([latest, other])
+
+
+def _save_versions(store_dir: str, worker: int, count: int) -> None:
+    base = synthetic_profile(1)
+    for i in range(count):
+        save_profile(dict(base, headline=f"Version {worker}-{i}"), store_dir, person=person_key(base, URL))
+
+
+def test_concurrent_saves_of_one_person_keep_every_version(tmp_path):
+    workers, count = 4, 25
+    processes = [multiprocessing.Process(target=_save_versions, args=(str(tmp_path), worker, count))
+                 for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    versions = _read_versions(_versions_path(str(tmp_path), "url:in/john-smith"))["versions"]
+    assert len(set(versions)) == workers * count
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.rate_limit_service import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, ModelCallScheduler
+from tests.rate_limit_stub import RateLimitStub, StubRateLimitError
+
+
+def unlimited_stub(**kwargs) -> RateLimitStub:
+    return RateLimitStub(requests_per_window=10 ** 6, tokens_per_window=10 ** 9, **kwargs)
+
+
+def test_retry_after_is_honored():
+    stub = unlimited_stub(fail_first=1, retry_after_ms=300)
+    scheduler = ModelCallScheduler(base_delay=0.01)
+
+    assert scheduler.call(lambda: stub(100)) == "ok"
+
+    assert stub.call_times[1] - stub.call_times[0] >= 0.3
+    assert scheduler.stats["rate_limited"] == 1
+    assert scheduler.stats["retries"] == 1
+
+
+def test_backoff_without_retry_after(monkeypatch):
+    stub = unlimited_stub(fail_first=3, retry_after_ms=None)
+    scheduler = ModelCallScheduler(base_delay=0.02, max_delay=1.0)
+    delays = []
+    backoff = scheduler._backoff
+
+    def recorded(attempt, error):
+        delays.append((attempt, backoff(attempt, error)))
+        return delays[-1][1]
+
+    monkeypatch.setattr(scheduler, "_backoff", recorded)
+
+    assert scheduler.call(lambda: stub(100)) == "ok"
+
+    assert [attempt for attempt, _ in delays] == [0, 1, 2]
+    assert all(0 <= delay <= 0.02 * 2 ** attempt for attempt, delay in delays)
+    assert scheduler.stats == {"calls": 1, "retries": 3, "rate_limited": 3, "failed": 0}
+
+
+def test_gives_up_after_max_retries():
+    stub = unlimited_stub(fail_first=10, retry_after_ms=1)
+    scheduler = ModelCallScheduler(max_retries=2, base_delay=0.001)
+
+    with pytest.raises(StubRateLimitError):
+        scheduler.call(lambda: stub(100))
+
+    assert stub.rejected == 3
+    assert scheduler.stats["failed"] == 1
+
+
+def test_interactive_calls_go_before_background_ones():
+    stub = unlimited_stub(latency=0.1)
+    scheduler = ModelCallScheduler(max_concurrency=1)
+    order = []
+    lock = threading.Lock()
+
+    def call(label: str, priority: int) -> None:
+        scheduler.call(lambda: stub(100), priority=priority)
+        with lock:
+            order.append(label)
+
+    threads = [threading.Thread(target=call, args=("B0", PRIORITY_BACKGROUND))]
+    threads[0].start()
+    time.sleep(0.03)
+    for label, priority in [("B1", PRIORITY_BACKGROUND), ("B2", PRIORITY_BACKGROUND),
+                            ("I1", PRIORITY_INTERACTIVE), ("I2", PRIORITY_INTERACTIVE)]:
+        thread = threading.Thread(target=call, args=(label, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["B0", "I1", "I2", "B1", "B2"]
+
+
+def test_async_calls_queue_without_holding_threads():
+    stub = unlimited_stub(latency=0.02)
+    scheduler = ModelCallScheduler(max_concurrency=1)
+
+    async def run():
+        calls = [asyncio.create_task(scheduler.acall(lambda: stub(100))) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        busy = [thread for thread in threading.enumerate() if thread.name.startswith("asyncio_")]
+        results = await asyncio.gather(*calls)
+        return busy, results
+
+    busy, results = asyncio.run(run())
+
+    assert results == ["ok"] * 20
+    # One call in flight at a time, so at most one executor thread was ever needed
+    assert len(busy) <= 1
+
+
+def test_async_retry_after_and_cancellation():
+    stub = unlimited_stub(fail_first=1, retry_after_ms=200, latency=0.05)
+    scheduler = ModelCallScheduler(max_concurrency=1, base_delay=0.01)
+
+    async def run():
+        first = asyncio.create_task(scheduler.acall(lambda: stub(100)))
+        queued = [asyncio.create_task(scheduler.acall(lambda: stub(100))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        queued[1].cancel()
+        return await asyncio.gather(first, *queued, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert results[0] == "ok" and results[1] == "ok" and results[3] == "ok"
+    assert isinstance(results[2], asyncio.CancelledError)
+    assert stub.call_times[1] - stub.call_times[0] >= 0.2
+    assert scheduler.queue_depth() == 0 and scheduler._in_flight == 0